@@ -4,6 +4,7 @@ from pydantic import BaseModel
 from typing import List, Dict, Any
 from ..database import get_db
 from ..services.ai_database_search import AIDatabaseSearchService
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -42,7 +43,8 @@ async def ai_database_search(
         
         logger.info(f"开始AI数据库搜索: {request.query}")
         
-        result = ai_db_search_service.ai_search_database(db, request.query.strip())
+        # OpenAI同步调用（含限流等待）在线程中执行，不阻塞事件循环
+        result = await asyncio.to_thread(ai_db_search_service.ai_search_database, db, request.query.strip())
         
         # 限制结果数量
         if len(result["poses"]) > request.max_results:
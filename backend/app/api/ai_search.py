@@ -2,15 +2,21 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Dict, List
 from ..services.ai_search_service import AISearchService
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# 建议添加依赖注入，而不是全局实例
+# 全局服务实例，首次请求时初始化；复用其中OpenAI客户端的连接池
+_ai_search_service = None
+
 def get_ai_search_service():
-    return AISearchService()
+    global _ai_search_service
+    if _ai_search_service is None:
+        _ai_search_service = AISearchService()
+    return _ai_search_service
 
 class AISearchRequest(BaseModel):
     query: str
@@ -35,7 +41,8 @@ async def ai_search_optimization(
         
         logger.info(f"开始AI搜索优化: {request.query}")
         
-        result = ai_service.optimize_search_query(request.query.strip())
+        # OpenAI同步调用（含限流等待）在线程中执行，不阻塞事件循环
+        result = await asyncio.to_thread(ai_service.optimize_search_query, request.query.strip())
         
         logger.info(f"AI优化完成: {request.query} -> {result['optimized_query']}")
         
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends
-from app.services.enhanced_vector_search_service import EnhancedVectorSearchService
+from app.services.enhanced_vector_search_service import EnhancedVectorSearchService, EMBED_MODEL
 from app.api.enhanced_vector_search import get_enhanced_service
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -15,8 +16,9 @@ async def debug_vector_status(
         "service_available": service.is_available(),
         "has_index": hasattr(service, 'index') and service.index is not None,
         "has_id_map": hasattr(service, 'id_map') and service.id_map is not None,
-        "id_map_size": len(service.id_map) if hasattr(service, 'id_map') and service.id_map else 0,
-        "embedding_model": "text-embedding-ada-002"
+        "id_map_size": len(service.id_map) if getattr(service, 'id_map', None) is not None else 0,
+        "embedding_model": EMBED_MODEL,
+        "embedding_cache": service.embedding_cache.stats() if service.embedding_cache else None
     }
 
 @router.post("/debug/raw-search")
@@ -35,26 +37,34 @@ async def debug_raw_search(
             return {"error": "Failed to generate embedding"}
         
         # 原始faiss搜索
-        distances, indices = service.index.search(query_vec.reshape(1, -1), 50)
+        distances, indices = service._search_index(query_vec, 50)
         
-        results = []
-        for i, (idx, dist) in enumerate(zip(indices[0], distances[0])):
-            if idx >= 0:
-                pose_id = service.id_map.get(str(idx), f"unknown_{idx}")
-                similarity = service._distance_to_similarity(dist)
-                results.append({
-                    "rank": i,
-                    "faiss_idx": int(idx),
-                    "pose_id": pose_id,
-                    "distance": float(dist),
-                    "similarity": float(similarity)
-                })
+        # 向量化过滤无效候选并批量计算相似度
+        valid = indices[0] >= 0
+        ranks = np.flatnonzero(valid)[:10]
+        faiss_idxs = indices[0][ranks]
+        dists = distances[0][ranks]
+        sims = service._distance_to_similarity_vec(dists)
+        pose_ids = service._lookup_pose_ids(faiss_idxs)
+        
+        results = [
+            {
+                "rank": rank,
+                "faiss_idx": idx,
+                "pose_id": pose_id if pose_id >= 0 else f"unknown_{idx}",
+                "distance": dist,
+                "similarity": sim
+            }
+            for rank, idx, pose_id, dist, sim in zip(
+                ranks.tolist(), faiss_idxs.tolist(), pose_ids.tolist(), dists.tolist(), sims.tolist()
+            )
+        ]
         
         return {
             "query": query,
             "embedding_shape": query_vec.shape,
-            "total_candidates": len([i for i in indices[0] if i >= 0]),
-            "results": results[:10]
+            "total_candidates": int(valid.sum()),
+            "results": results
         }
         
     except Exception as e:
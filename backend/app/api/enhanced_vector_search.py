@@ -1,31 +1,128 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Tuple, Dict, Any, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, bindparam
 import time
+import asyncio
+import bisect
+from datetime import datetime
+import json
 import logging
 import os
+import re
+import numpy as np
 
-from ..services.enhanced_vector_search_service import EnhancedVectorSearchService
+from ..services.enhanced_vector_search_service import EnhancedVectorSearchService, EMBED_MODEL
 from ..services.enhanced_ai_analyzer import EnhancedAIAnalyzer
-from ..database import get_db
+from ..services.cross_encoder_reranker import ENABLE_CE_RERANK, cross_encoder_rerank
+from ..utils.embedding_cache import EmbeddingCache
+from ..utils.redis_client import get_raw_redis
+from ..utils.result_cache import cache_result
+from ..utils.search_executor import run_search
+from ..config import settings
+from ..database import get_async_db
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+# 搜索结果数据量较大，统一使用orjson序列化响应
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # 获取向量索引路径
 INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "backend/vector_index/faiss.index")
 ID_MAP_PATH = os.getenv("VECTOR_ID_MAP_PATH", "backend/vector_index/id_map.json")
+EMBEDDINGS_PATH = os.getenv("VECTOR_EMBEDDINGS_PATH", "backend/vector_index/embeddings.npy")
+
+# 姿势详情查询语句，模块加载时预编译；ids 使用 expanding 参数生成 IN (?, ?, ...)
+# 空值默认值在SQL中完成，每行结果按位置与对应的键元组组成字典；{t} 为表别名前缀
+_POSE_FIELDS = (
+    ("id", "{t}id"), ("oss_url", "{t}oss_url"), ("thumbnail_url", "{t}thumbnail_url"),
+    ("title", "COALESCE({t}title, '')"), ("description", "COALESCE({t}description, '')"),
+    ("scene_category", "{t}scene_category"), ("angle", "{t}angle"),
+    ("shooting_tips", "{t}shooting_tips"), ("ai_tags", "COALESCE({t}ai_tags, '')"),
+    ("view_count", "COALESCE({t}view_count, 0)"), ("created_at", "{t}created_at"),
+)
+_POSE_KEYS = tuple(key for key, _ in _POSE_FIELDS)
+# 精简列：不生成匹配原因时无需读取大文本字段，未查询的列由响应模型补默认值
+_BRIEF_KEYS = ("id", "oss_url", "thumbnail_url", "title", "scene_category", "angle", "view_count", "created_at")
+_POSE_BRIEF_FIELDS = tuple(field for field in _POSE_FIELDS if field[0] in _BRIEF_KEYS)
+# ID数量超过该值时改用 JSON_TABLE 连接，避免超长 IN 列表按基数反复生成执行计划
+_JOIN_IDS_THRESHOLD = 64
+
+
+def _select_columns(fields, table: str = "") -> str:
+    return ", ".join(expr.format(t=table) for _, expr in fields)
+
+
+def _build_pose_fetch_stmt(fields, extra_conditions: str = ""):
+    return text(
+        f"SELECT {_select_columns(fields)} FROM poses WHERE id IN :ids AND status = 'active'{extra_conditions}"
+    ).bindparams(bindparam("ids", expanding=True))
+
+
+def _build_pose_join_stmt(fields, extra_conditions: str = ""):
+    """ID列表以JSON数组传入，展开为带序号的临时表与poses连接，结果按向量检索顺序返回"""
+    return text(
+        f"SELECT {_select_columns(fields, 'p.')} FROM JSON_TABLE(:ids_json, '$[*]' "
+        f"COLUMNS (ord FOR ORDINALITY, id BIGINT PATH '$')) AS v "
+        f"JOIN poses p ON p.id = v.id WHERE p.status = 'active'{extra_conditions} ORDER BY v.ord"
+    )
+
+
+def _filter_conditions(category: bool, angle: bool) -> str:
+    return (" AND scene_category = :category" if category else "") + (" AND angle = :angle" if angle else "")
+
+
+# 所有 (连接方式, 列, 分类过滤, 角度过滤) 组合的语句在模块加载时一次性构建
+_POSE_FETCH_STMTS = {
+    (join_ids, brief, category, angle): builder(
+        _POSE_BRIEF_FIELDS if brief else _POSE_FIELDS,
+        _filter_conditions(category, angle)
+    )
+    for join_ids, builder in ((False, _build_pose_fetch_stmt), (True, _build_pose_join_stmt))
+    for brief in (False, True)
+    for category in (False, True)
+    for angle in (False, True)
+}
+
+
+async def _fetch_pose_rows(
+    db: AsyncSession,
+    pose_ids: List[int],
+    brief: bool = False,
+    category: Optional[str] = None,
+    angle: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """按ID批量查询姿势详情并转换为字典，ID较多时使用 JSON_TABLE 连接代替 IN 列表"""
+    join_ids = len(pose_ids) > _JOIN_IDS_THRESHOLD
+    stmt = _POSE_FETCH_STMTS[(join_ids, brief, bool(category), bool(angle))]
+    
+    params: Dict[str, Any] = {"ids_json": json.dumps(pose_ids)} if join_ids else {"ids": pose_ids}
+    if category:
+        params["category"] = category
+    if angle:
+        params["angle"] = angle
+    
+    keys = _BRIEF_KEYS if brief else _POSE_KEYS
+    return [dict(zip(keys, row)) for row in (await db.execute(stmt, params)).all()]
+
 
 # 全局服务实例，启动时初始化
 _enhanced_vector_service = None
 _enhanced_ai_analyzer = None
 
 def get_enhanced_service():
+    """进程内唯一的向量搜索服务实例，应用启动时加载并预热（见 main.startup_event）"""
     global _enhanced_vector_service
     if _enhanced_vector_service is None:
-        _enhanced_vector_service = EnhancedVectorSearchService(INDEX_PATH, ID_MAP_PATH)
+        _enhanced_vector_service = EnhancedVectorSearchService(INDEX_PATH, ID_MAP_PATH, EMBEDDINGS_PATH)
+        # 所有搜索端点共享同一个查询向量缓存
+        _enhanced_vector_service.embedding_cache = EmbeddingCache(
+            model=EMBED_MODEL,
+            maxsize=settings.embedding_cache_size,
+            redis_client=get_raw_redis(),
+            ttl=settings.embedding_cache_ttl,
+        )
     return _enhanced_vector_service
 
 def get_enhanced_analyzer():
@@ -62,7 +159,7 @@ class PoseWithScore(BaseModel):
     shooting_tips: str | None = None
     ai_tags: str | None = None
     view_count: int | None = 0
-    created_at: str | None = None
+    created_at: datetime | None = None  # 序列化时由Pydantic输出ISO格式
     score: float
     match_reason: str | None = None  # 匹配原因说明
 
@@ -177,10 +274,139 @@ async def analyze_query(
         )
 
 
-@router.post("/search/vector/enhanced", response_model=VectorSearchResponse)
+def _run_basic(service: EnhancedVectorSearchService, request: VectorSearchRequest,
+               enhanced_query: str) -> Tuple[List[Tuple[int, float]], str]:
+    return service.search(enhanced_query, top_k=request.target_count), "标准向量搜索"
+
+
+def _run_dynamic(service: EnhancedVectorSearchService, request: VectorSearchRequest,
+                 enhanced_query: str) -> Tuple[List[Tuple[int, float]], str]:
+    results = service.search_with_dynamic_threshold(
+        query=enhanced_query,
+        target_count=request.target_count,
+        min_similarity=0.01
+    )
+    return results, "动态阈值搜索"
+
+
+def _run_multi_tier(service: EnhancedVectorSearchService, request: VectorSearchRequest,
+                    enhanced_query: str) -> Tuple[List[Tuple[int, float]], str]:
+    return service.multi_tier_search(enhanced_query, request.target_count), "多层次搜索"
+
+
+# 搜索模式 -> 首选检索策略，未列出的模式使用基础向量搜索
+_MODE_DISPATCH = {
+    "dynamic": _run_dynamic,
+    "multi_tier": _run_multi_tier,
+}
+
+
+def _run_search_strategies(
+    enhanced_service: EnhancedVectorSearchService,
+    request: VectorSearchRequest,
+    enhanced_query: str
+) -> Tuple[List[Tuple[int, float]], str]:
+    """按搜索模式执行向量检索，结果不足时逐级降级（同步阻塞）"""
+    primary = _MODE_DISPATCH.get(request.search_mode, _run_basic)
+    
+    # 策略1: 用户指定的搜索模式
+    ids_scores, search_method = primary(enhanced_service, request, enhanced_query)
+    
+    # 策略2: 如果结果不足，尝试基础搜索
+    if len(ids_scores) < 3 and primary is not _run_basic:
+        logger.info(f"{search_method}结果不足({len(ids_scores)}个)，尝试基础搜索")
+        basic_results, _ = _run_basic(enhanced_service, request, enhanced_query)
+        if len(basic_results) > len(ids_scores):
+            ids_scores = basic_results
+            search_method = "基础向量搜索(降级)"
+    
+    # 策略3: 如果仍然结果不足，尝试多层次搜索
+    if len(ids_scores) < 3 and primary is not _run_multi_tier:
+        logger.info(f"基础搜索结果仍不足({len(ids_scores)}个)，尝试多层次搜索")
+        multi_results, _ = _run_multi_tier(enhanced_service, request, enhanced_query)
+        if len(multi_results) > len(ids_scores):
+            ids_scores = multi_results
+            search_method = "多层次搜索(降级)"
+    
+    # 策略4: 最后的降级 - 尝试关键词分解搜索
+    if len(ids_scores) < 1:
+        logger.warning(f"所有向量搜索策略都未找到结果，尝试关键词分解")
+        keywords = enhanced_query.split()
+        for keyword in keywords:
+            if len(keyword) > 1:
+                keyword_results = enhanced_service.search(keyword, top_k=5)
+                ids_scores.extend(keyword_results)
+        
+        if ids_scores:
+            unique_results = {}
+            for pose_id, score in ids_scores:
+                if pose_id not in unique_results or score > unique_results[pose_id]:
+                    unique_results[pose_id] = score
+            ids_scores = list(unique_results.items())
+            ids_scores.sort(key=lambda x: x[1], reverse=True)
+            ids_scores = ids_scores[:request.target_count]
+            search_method = "关键词分解搜索(降级)"
+
+    return ids_scores, search_method
+
+
+# 混合检索：向量召回与全文检索各取候选，按倒数排名融合(RRF)
+HYBRID_CANDIDATES = 200
+RRF_K = 60
+
+_FULLTEXT_RECALL_STMT = text("""
+    SELECT id FROM poses
+    WHERE status = 'active'
+      AND MATCH(title, description, ai_tags) AGAINST (:query IN NATURAL LANGUAGE MODE)
+    ORDER BY MATCH(title, description, ai_tags) AGAINST (:query IN NATURAL LANGUAGE MODE) DESC
+    LIMIT :limit
+""")
+
+
+async def _fulltext_recall(db: AsyncSession, query: str, limit: int) -> List[int]:
+    """全文索引召回，返回按相关度排序的姿势ID；全文索引不可用时返回空列表"""
+    try:
+        result = await db.execute(_FULLTEXT_RECALL_STMT, {"query": query, "limit": limit})
+        return result.scalars().all()
+    except Exception as e:
+        logger.warning(f"全文检索失败，混合搜索仅使用向量结果: {e}")
+        # 回滚失败的事务，后续的详情查询仍可使用同一会话
+        await db.rollback()
+        return []
+
+
+def _rrf_fuse(rankings: List[List[int]], limit: int) -> List[Tuple[int, float]]:
+    """倒数排名融合，分数归一化到[0, 1]（在所有排名中均居首位时为1）"""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, pose_id in enumerate(ranking, start=1):
+            fused[pose_id] = fused.get(pose_id, 0.0) + 1.0 / (RRF_K + rank)
+    
+    max_score = len(rankings) / (RRF_K + 1)
+    top = sorted(fused.items(), key=lambda x: x[1], reverse=True)[:limit]
+    return [(pose_id, score / max_score) for pose_id, score in top]
+
+
+async def _hybrid_search(
+    db: AsyncSession,
+    enhanced_service: EnhancedVectorSearchService,
+    query: str,
+    enhanced_query: str,
+    limit: int
+) -> List[Tuple[int, float]]:
+    """并行执行向量召回和全文召回，再做RRF融合"""
+    vector_results, fulltext_ids = await asyncio.gather(
+        run_search(enhanced_service.search, enhanced_query, HYBRID_CANDIDATES),
+        _fulltext_recall(db, query, HYBRID_CANDIDATES),
+    )
+    vector_ids = [pid for pid, _ in vector_results]
+    return _rrf_fuse([vector_ids, fulltext_ids], limit)
+
+
+@router.post("/search/vector/enhanced", response_model=VectorSearchResponse, response_model_exclude_none=True)
 async def enhanced_vector_search(
     request: VectorSearchRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     enhanced_service: EnhancedVectorSearchService = Depends(get_enhanced_service),
     analyzer: EnhancedAIAnalyzer = Depends(get_enhanced_analyzer)
 ):
@@ -214,55 +440,23 @@ async def enhanced_vector_search(
             except Exception as e:
                 logger.warning(f"查询分析失败，使用原始查询: {e}")
         
-        # 多重搜索策略 - 降级搜索
         ids_scores = []
-        search_method = "标准向量搜索"
-        
-        # 策略1: 尝试用户指定的搜索模式
-        if request.search_mode == "dynamic":
-            ids_scores = enhanced_service.search_with_dynamic_threshold(
-                query=enhanced_query,
-                target_count=request.target_count,
-                min_similarity=0.01
+        if request.search_mode == "hybrid":
+            ids_scores = await _hybrid_search(
+                db, enhanced_service, request.query, enhanced_query, request.target_count
             )
-            search_method = "动态阈值搜索"
-        
-        # 策略2: 如果结果不足，尝试基础搜索
-        if len(ids_scores) < 3:
-            logger.info(f"动态搜索结果不足({len(ids_scores)}个)，尝试基础搜索")
-            basic_results = enhanced_service.search(enhanced_query, top_k=request.target_count)
-            if len(basic_results) > len(ids_scores):
-                ids_scores = basic_results
-                search_method = "基础向量搜索(降级)"
-        
-        # 策略3: 如果仍然结果不足，尝试多层次搜索
-        if len(ids_scores) < 3:
-            logger.info(f"基础搜索结果仍不足({len(ids_scores)}个)，尝试多层次搜索")
-            multi_results = enhanced_service.multi_tier_search(enhanced_query, request.target_count)
-            if len(multi_results) > len(ids_scores):
-                ids_scores = multi_results
-                search_method = "多层次搜索(降级)"
+            search_method = "混合检索(向量+全文)"
         
-        # 策略4: 最后的降级 - 尝试关键词分解搜索
-        if len(ids_scores) < 1:
-            logger.warning(f"所有向量搜索策略都未找到结果，尝试关键词分解")
-            keywords = enhanced_query.split()
-            for keyword in keywords:
-                if len(keyword) > 1:
-                    keyword_results = enhanced_service.search(keyword, top_k=5)
-                    ids_scores.extend(keyword_results)
-            
-            if ids_scores:
-                unique_results = {}
-                for pose_id, score in ids_scores:
-                    if pose_id not in unique_results or score > unique_results[pose_id]:
-                        unique_results[pose_id] = score
-                ids_scores = list(unique_results.items())
-                ids_scores.sort(key=lambda x: x[1], reverse=True)
-                ids_scores = ids_scores[:request.target_count]
-                search_method = "关键词分解搜索(降级)"
-
-        pose_ids = [pid for pid, _ in ids_scores]
+        # 多重搜索策略 - 降级搜索；嵌入请求和FAISS检索均为阻塞调用，放到线程中执行避免阻塞事件循环
+        if not ids_scores:
+            ids_scores, search_method = await run_search(
+                _run_search_strategies, enhanced_service, request, enhanced_query
+            )
+
+        # 各检索策略可能返回重复的姿势，按ID保留首次出现（排名最高）的分数
+        score_by_id = dict(reversed(ids_scores))
+        pose_ids = list(dict.fromkeys(pid for pid, _ in ids_scores))
+        ids_scores = [(pid, score_by_id[pid]) for pid in pose_ids]
 
         if not pose_ids:
             return VectorSearchResponse(
@@ -280,68 +474,39 @@ async def enhanced_vector_search(
                 enhanced_info={"query_analysis": query_analysis}
             )
 
-        # 构建数据库查询，添加过滤条件
-        where_conditions = ["id IN :ids", "status = 'active'"]
-        params = {"ids": tuple(pose_ids)}
-        
-        if request.category_filter:
-            where_conditions.append("scene_category = :category")
-            params["category"] = request.category_filter
-            
-        if request.angle_filter:
-            where_conditions.append("angle = :angle")
-            params["angle"] = request.angle_filter
-        
-        where_clause = " AND ".join(where_conditions)
-        
-        result = db.execute(
-            text(
-                f"""
-                SELECT id, oss_url, thumbnail_url, title, description,
-                       scene_category, angle, shooting_tips, ai_tags,
-                       view_count, created_at
-                FROM poses
-                WHERE {where_clause}
-                """
-            ),
-            params,
-        ).fetchall()
-
-        pose_dict: Dict[int, Dict[str, Any]] = {}
-        for row in result:
-            pose_dict[row[0]] = {
-                "id": row[0],
-                "oss_url": row[1],
-                "thumbnail_url": row[2],
-                "title": row[3] or "",
-                "description": row[4] or "",
-                "scene_category": row[5],
-                "angle": row[6],
-                "shooting_tips": row[7],
-                "ai_tags": row[8] or "",
-                "view_count": row[9] or 0,
-                "created_at": row[10].isoformat() if row[10] else None,
-            }
+        # 查询姿势详情并应用过滤条件；不生成匹配原因时只查询精简列
+        result = await _fetch_pose_rows(
+            db, pose_ids, brief=not request.use_enhanced,
+            category=request.category_filter, angle=request.angle_filter
+        )
+        pose_dict = {pose["id"]: pose for pose in result}
 
         # 第三步：智能重排序和匹配原因生成
+        query_pattern = _compile_query_pattern(enhanced_query) if request.use_enhanced else None
         poses = []
         for pid, score in ids_scores:
             data = pose_dict.get(pid)
             if data:
                 # 生成匹配原因
-                match_reason = _generate_match_reason(
-                    data, enhanced_query, score, query_analysis
-                )
+                match_reason = None
+                if request.use_enhanced:
+                    match_reason = _generate_match_reason(
+                        data, query_pattern, score, query_analysis
+                    )
                 
                 poses.append({
                     **data, 
-                    "score": score,
+                    "score": float(score),
                     "match_reason": match_reason
                 })
 
         # 如果启用了增强功能，进行智能重排序
+        # 开启交叉编码器时优先使用模型打分，不可用时回退到启发式重排序
         if request.use_enhanced and len(poses) > 1:
-            poses = _intelligent_rerank(poses, enhanced_query, query_analysis)
+            reranked = None
+            if ENABLE_CE_RERANK:
+                reranked = await run_search(cross_encoder_rerank, request.query, poses)
+            poses = reranked if reranked is not None else _intelligent_rerank(poses, enhanced_query, query_analysis)
 
         query_time = int((time.time() - start) * 1000)
         
@@ -389,10 +554,11 @@ async def enhanced_vector_search(
         raise HTTPException(status_code=500, detail=f"增强向量搜索失败: {str(e)}")
 
 
-@router.post("/search/vector", response_model=VectorSearchResponse)
+@router.post("/search/vector", response_model=VectorSearchResponse, response_model_exclude_none=True)
+@cache_result("vsearch", should_cache=lambda r: r.service_available)
 async def vector_search_compatibility(
     request: VectorSearchRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """向量搜索兼容性接口 - 自动使用增强版功能"""
     try:
@@ -418,43 +584,50 @@ async def vector_search_compatibility(
         )
 
 
+def _compile_query_pattern(query: str) -> Optional[re.Pattern]:
+    """将查询词编译为一个正则交替式，每条文本只需扫描一次即可判断是否命中任一查询词"""
+    words = set(query.lower().split())
+    if not words:
+        return None
+    return re.compile("|".join(re.escape(w) for w in sorted(words, key=len, reverse=True)))
+
+
+# 匹配原因模板：相似度分档标签，以及意图/文本匹配片段
+_SCORE_BAND_THRESHOLDS = (0.4, 0.6, 0.8)
+_SCORE_BAND_LABELS = ("弱相关", "部分相关", "较为相关", "高度相关")
+_TEXT_MATCH_LABELS = ("", " · 标题匹配", " · 标签匹配")
+
+
 def _generate_match_reason(
     pose_data: Dict[str, Any], 
-    query: str, 
+    query_pattern: Optional[re.Pattern], 
     score: float, 
     analysis: Dict[str, Any]
 ) -> str:
     """生成匹配原因说明"""
-    reasons = []
-    
-    # 基于相似度分数
-    if score > 0.8:
-        reasons.append("高度相关")
-    elif score > 0.6:
-        reasons.append("较为相关")
-    elif score > 0.4:
-        reasons.append("部分相关")
-    else:
-        reasons.append("弱相关")
+    # 基于相似度分数（分数大于阈值才进入更高一档）
+    band = _SCORE_BAND_LABELS[bisect.bisect_left(_SCORE_BAND_THRESHOLDS, score)]
     
     # 基于分析结果
+    intent_part = ""
     if analysis:
         intent = analysis.get("intent", "")
         if intent == "场景搜索" and pose_data.get("scene_category"):
-            reasons.append(f"场景匹配: {pose_data['scene_category']}")
+            intent_part = f" · 场景匹配: {pose_data['scene_category']}"
         elif intent == "姿势搜索" and pose_data.get("angle"):
-            reasons.append(f"角度匹配: {pose_data['angle']}")
+            intent_part = f" · 角度匹配: {pose_data['angle']}"
         elif intent == "风格搜索" and pose_data.get("ai_tags"):
-            reasons.append("风格标签匹配")
+            intent_part = " · 风格标签匹配"
     
     # 基于文本匹配
-    query_lower = query.lower()
-    if pose_data.get("title") and any(word in pose_data["title"].lower() for word in query_lower.split()):
-        reasons.append("标题匹配")
-    elif pose_data.get("ai_tags") and any(word in pose_data["ai_tags"].lower() for word in query_lower.split()):
-        reasons.append("标签匹配")
+    text_match = 0
+    if query_pattern is not None:
+        if pose_data.get("title") and query_pattern.search(pose_data["title"].lower()):
+            text_match = 1
+        elif pose_data.get("ai_tags") and query_pattern.search(pose_data["ai_tags"].lower()):
+            text_match = 2
     
-    return " · ".join(reasons) if reasons else "语义匹配"
+    return f"{band}{intent_part}{_TEXT_MATCH_LABELS[text_match]}"
 
 
 def _intelligent_rerank(
@@ -465,27 +638,23 @@ def _intelligent_rerank(
     """智能重排序"""
     # 简化版重排序逻辑
     # 可以根据查询意图、用户偏好等进行更复杂的排序
+    # 各项分数一次性组装为数组后向量化计算，避免排序时逐元素调用Python闭包
+    base_scores = np.fromiter((p["score"] for p in poses), dtype=np.float64, count=len(poses))
+    view_counts = np.fromiter((p.get("view_count") or 0 for p in poses), dtype=np.float64, count=len(poses))
     
-    def rerank_score(pose):
-        base_score = pose["score"]
-        
-        # 根据查看次数调整
-        view_boost = min(0.1, pose.get("view_count", 0) / 1000)
-        
-        # 根据查询意图调整
-        intent_boost = 0.0
-        if analysis.get("intent") == "场景搜索":
-            if pose.get("scene_category"):
-                intent_boost = 0.05
-        elif analysis.get("intent") == "姿势搜索":
-            if pose.get("angle"):
-                intent_boost = 0.05
-        
-        return base_score + view_boost + intent_boost
+    # 根据查看次数调整
+    final_scores = base_scores + np.minimum(0.1, view_counts / 1000)
+    
+    # 根据查询意图调整
+    intent = analysis.get("intent")
+    intent_field = {"场景搜索": "scene_category", "姿势搜索": "angle"}.get(intent)
+    if intent_field:
+        intent_match = np.fromiter((bool(p.get(intent_field)) for p in poses), dtype=bool, count=len(poses))
+        final_scores += np.where(intent_match, 0.05, 0.0)
     
-    # 按重排序分数排序
-    poses.sort(key=rerank_score, reverse=True)
-    return poses
+    # 按重排序分数排序（稳定排序，同分保持原有顺序）
+    order = np.argsort(-final_scores, kind="stable")
+    return [poses[i] for i in order.tolist()]
 
 
 # 向后兼容的路由别名
@@ -496,10 +665,10 @@ async def vector_search_status():
 
 # 在现有的路由中添加新端点：
 
-@router.post("/search/vector/paginated", response_model=VectorSearchResponse)
+@router.post("/search/vector/paginated", response_model=VectorSearchResponse, response_model_exclude_none=True)
 async def paginated_vector_search(
     request: VectorSearchRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     enhanced_service: EnhancedVectorSearchService = Depends(get_enhanced_service),
 ):
     """专门的分页向量搜索端点"""
@@ -518,7 +687,8 @@ async def paginated_vector_search(
         start = time.time()
         
         # 强制使用分页搜索
-        search_result = enhanced_service.search_with_pagination(
+        search_result = await run_search(
+            enhanced_service.search_with_pagination,
             query=request.query,
             page=request.page,
             page_size=min(request.page_size, 50),  # 限制最大页大小
@@ -526,7 +696,10 @@ async def paginated_vector_search(
         )
         
         ids_scores = search_result['results']
-        pose_ids = [pid for pid, _ in ids_scores]
+        # 各检索策略可能返回重复的姿势，按ID保留首次出现（排名最高）的分数
+        score_by_id = dict(reversed(ids_scores))
+        pose_ids = list(dict.fromkeys(pid for pid, _ in ids_scores))
+        ids_scores = [(pid, score_by_id[pid]) for pid in pose_ids]
 
         if not pose_ids:
             return VectorSearchResponse(
@@ -543,38 +716,14 @@ async def paginated_vector_search(
             )
 
         # 查询数据库获取pose详情
-        result = db.execute(
-            text(
-                """
-                SELECT id, oss_url, thumbnail_url, title, description,
-                       scene_category, angle, shooting_tips, ai_tags,
-                       view_count, created_at
-                FROM poses
-                WHERE id IN :ids AND status = 'active'
-                """
-            ),
-            {"ids": tuple(pose_ids)},
-        ).fetchall()
-
-        pose_dict = {row[0]: {
-            "id": row[0],
-            "oss_url": row[1],
-            "thumbnail_url": row[2],
-            "title": row[3] or "",
-            "description": row[4] or "",
-            "scene_category": row[5],
-            "angle": row[6],
-            "shooting_tips": row[7],
-            "ai_tags": row[8],
-            "view_count": row[9] or 0,
-            "created_at": row[10].isoformat() if row[10] else None,
-        } for row in result}
+        result = await _fetch_pose_rows(db, pose_ids)
+        pose_dict = {pose["id"]: pose for pose in result}
 
         poses = []
         for pid, score in ids_scores:
             data = pose_dict.get(pid)
             if data:
-                poses.append({**data, "score": score})
+                poses.append({**data, "score": float(score)})
 
         query_time = int((time.time() - start) * 1000)
         
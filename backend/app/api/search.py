@@ -1,21 +1,18 @@
 from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from pydantic import BaseModel
 from ..database import get_db
 from ..services.enhanced_search_service import EnhancedSearchService
 from ..schemas.pose import PoseResponse
-import redis
-import os
+from ..utils.redis_client import get_raw_redis
+from ..utils.result_cache import cache_result, cached_json
 
-router = APIRouter(prefix="/api/search/v2", tags=["Enhanced Search"])
+router = APIRouter(prefix="/api/search/v2", tags=["Enhanced Search"], default_response_class=ORJSONResponse)
 
-# Redis 连接
-redis_client = None
-if os.getenv("REDIS_URL"):
-    redis_client = redis.from_url(os.getenv("REDIS_URL"))
-
-enhanced_search_service = EnhancedSearchService(redis_client=redis_client)
+# 与其他模块共享同一个Redis连接池
+enhanced_search_service = EnhancedSearchService(redis_client=get_raw_redis())
 
 class EnhancedSearchResponse(BaseModel):
     poses: List[PoseResponse]
@@ -50,7 +47,7 @@ async def enhanced_search(
     - 多重搜索策略
     - 智能排序
     """
-    poses, total, search_info = enhanced_search_service.search_poses_enhanced(
+    poses, total, search_info = await enhanced_search_service.search_poses_enhanced(
         db=db,
         query=q,
         category=category,
@@ -61,7 +58,7 @@ async def enhanced_search(
     )
     
     return EnhancedSearchResponse(
-        poses=[PoseResponse.from_orm(pose) for pose in poses],
+        poses=[dict(pose) for pose in poses],
         total=total,
         page=page,
         per_page=per_page,
@@ -69,6 +66,7 @@ async def enhanced_search(
     )
 
 @router.get("/suggestions", response_model=List[SearchSuggestion])
+@cache_result("suggest")
 async def get_smart_suggestions(
     prefix: str = Query(..., min_length=1, description="搜索前缀"),
     limit: int = Query(10, ge=1, le=20, description="建议数量"),
@@ -92,7 +90,10 @@ async def get_search_analytics(
     db: Session = Depends(get_db)
 ):
     """搜索分析数据"""
-    return enhanced_search_service.get_search_analytics(db, days)
+    return await cached_json(
+        f"stats:{days}d", 60,
+        lambda: enhanced_search_service.get_search_analytics(db, days)
+    )
 
 @router.post("/feedback")
 async def search_feedback(
@@ -1,7 +1,12 @@
 import os
+from functools import cached_property, lru_cache
+from dotenv import load_dotenv
 from pydantic_settings import BaseSettings  # 修改这行
 from typing import Optional, List
 
+# 全进程只解析一次 .env；其余模块通过 os.getenv 读取的开关也依赖这里加载的环境变量
+load_dotenv()
+
 class Settings(BaseSettings):
     # 数据库配置
     db_host: str
@@ -10,9 +15,15 @@ class Settings(BaseSettings):
     db_pass: str
     db_name: str
     
-    @property
+    @cached_property
     def database_url(self) -> str:
-        return f"mysql://{self.db_user}:{self.db_pass}@{self.db_host}:{self.db_port}/{self.db_name}"
+        return f"mysql+pymysql://{self.db_user}:{self.db_pass}@{self.db_host}:{self.db_port}/{self.db_name}?charset=utf8mb4"
+    
+    # 数据库连接池配置
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_recycle: int = 1800  # 早于MySQL wait_timeout回收空闲连接
+    db_pool_timeout: int = 5     # 连接池耗尽时最多等待的秒数
     
     # Redis配置
     redis_host: str
@@ -44,12 +55,26 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4-vision-preview"
     openai_max_tokens: int = 1500
     openai_temperature: float = 0.3
+    # 搜索结果排序和查询优化等简单任务使用的小模型
+    openai_rank_model: str = "gpt-4o-mini"
+    # 搜索相关调用的最大输出令牌数，限流按该值预扣TPM额度，应略高于实际输出长度
+    openai_intent_max_tokens: int = 400  # 搜索意图分析
+    openai_optimize_max_tokens: int = 300  # 查询优化
+    openai_rank_tokens_per_item: int = 64  # 相关性排序，每个候选的预算（另加200，最多1000）
+    # 账号的每分钟请求数/令牌数额度，调用前主动限流；0 表示不限制
+    openai_rpm: int = 0
+    openai_tpm: int = 0
+    # AI数据库搜索结果不超过该数量时跳过AI相关性排序，直接按浏览量/时间排序
+    min_ai_rank_size: int = 3
+    # 全文检索最高相关度达到该值时直接按相关度排序，不再调用AI排序
+    fulltext_rank_threshold: float = 5.0
     
     # 处理配置
     batch_size: int = 5
     max_retries: int = 3
     processing_delay: int = 2
     max_concurrent_requests: int = 3
+    max_image_download_size: int = 20971520  # 20MB，base64方式分析时下载图片的上限
     
     # 日志配置
     log_level: str = "INFO"
@@ -78,9 +103,16 @@ class Settings(BaseSettings):
     # 缓存配置
     cache_expire_time: int = 3600  # 1小时
     search_cache_expire_time: int = 300  # 5分钟
+    embedding_cache_size: int = 4096  # 进程内查询向量缓存条数
+    embedding_cache_ttl: int = 86400  # Redis查询向量缓存 24小时
     
     class Config:
-        env_file = ".env"
         case_sensitive = False
 
-settings = Settings()
\ No newline at end of file
+
+@lru_cache()
+def get_settings() -> Settings:
+    return Settings()
+
+
+settings = get_settings()
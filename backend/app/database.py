@@ -1,35 +1,49 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
+from .config import settings
 
-# 加载环境变量
-load_dotenv()
+# 数据库URL由配置统一构建
+DATABASE_URL = settings.database_url
 
-# 数据库配置 - 从环境变量读取
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "3306")
-DB_USER = os.getenv("DB_USER", "root")
-DB_PASSWORD = os.getenv("DB_PASS", "")  # 注意这里使用 DB_PASS
-DB_NAME = os.getenv("DB_NAME", "pose_gallery")
+print(f"数据库连接URL (隐藏密码): mysql+pymysql://{settings.db_user}:***@{settings.db_host}:{settings.db_port}/{settings.db_name}")
 
-# 构建数据库URL - 确保密码被正确包含
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
-
-print(f"数据库连接URL (隐藏密码): mysql+pymysql://{DB_USER}:***@{DB_HOST}:{DB_PORT}/{DB_NAME}")
+# 连接池参数，同步与异步引擎共用
+POOL_OPTIONS = dict(
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,  # 连接回收时间
+    pool_timeout=settings.db_pool_timeout,
+    pool_pre_ping=True,  # 自动重连
+    pool_use_lifo=True,  # 优先复用最近归还的连接，空闲多余的连接可按 pool_recycle 自然回收
+    query_cache_size=1200,  # 编译语句缓存条数，覆盖所有预构建的查询变体
+)
+CONNECT_ARGS = {"charset": "utf8mb4", "init_command": "SET SESSION wait_timeout=3600"}
 
 # 创建数据库引擎
 engine = create_engine(
     DATABASE_URL,
     echo=False,  # 改为 False 减少日志
-    pool_pre_ping=True,  # 自动重连
-    pool_recycle=3600,   # 连接回收时间
+    connect_args=CONNECT_ARGS,
+    **POOL_OPTIONS,
 )
 
 # 创建会话
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步引擎（aiomysql），供 async 接口直接 await 数据库查询而不阻塞事件循环
+ASYNC_DATABASE_URL = DATABASE_URL.replace("mysql+pymysql://", "mysql+aiomysql://", 1)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    connect_args=CONNECT_ARGS,
+    **POOL_OPTIONS,
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
 # 创建基类
 Base = declarative_base()
 
@@ -42,4 +56,14 @@ def get_db():
         db.rollback()
         raise e
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# 获取异步数据库会话
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            raise e
@@ -1,12 +1,23 @@
-from fastapi import FastAPI, Depends, Query, HTTPException
+from fastapi import FastAPI, Depends, Query, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import text, desc, or_, func
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, desc, or_, func, bindparam
 from typing import Optional
+from datetime import datetime
 import os
+import re
+import base64
+import binascii
 import asyncio
 import logging
-from .database import get_db, engine
+from .database import get_async_db, engine, async_engine, SessionLocal, AsyncSessionLocal
+from .utils.suggestion_trie import load_suggestion_trie
+from .utils.result_cache import cache_result, cached_json, invalidate_on_change
+from .utils.http_cache import cacheable_json
+from .utils.search_history_writer import start_history_writer, stop_history_writer
+from .models.pose import Pose
 from .api import ai_search
 from .api import ai_database_search  # 新增
 from .api import enhanced_vector_search  # 使用增强版
@@ -21,7 +32,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Pose Gallery API",
     description="摄影姿势图库API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS配置 - 放宽限制，因为通过前端代理
@@ -33,35 +45,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 压缩较大的响应（姿势列表等），压缩后的响应带 Vary: Accept-Encoding，CDN按编码分别缓存
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # 注册外部路由模块
 app.include_router(ai_search.router, prefix="/api/v1", tags=["ai-search"])
 app.include_router(ai_database_search.router, prefix="/api/v1", tags=["ai-database-search"])  # 新增
 app.include_router(enhanced_vector_search.router, prefix="/api/v1", tags=["enhanced-vector-search"])  # 使用增强版
 app.include_router(debug_router, prefix="/api", tags=["debug"])
 # 其余代码保持不变...
+# 场景分类统计缓存，姿势数据变更时失效
+SCENES_CACHE_KEY = "scene:list"
+invalidate_on_change(Pose, SCENES_CACHE_KEY)
+
+# 搜索建议前缀树，启动时构建；构建失败时回退到数据库查询
+suggestion_trie = None
+
 # 改进的启动事件处理
 @app.on_event("startup")
 async def startup_event():
+    global suggestion_trie
     try:
-        # 使用同步方式测试数据库连接，避免异步问题
-        def test_db_connection():
-            try:
-                with engine.connect() as connection:
-                    result = connection.execute(text("SELECT 1"))
-                    result.fetchone()
-                return True
-            except Exception as e:
-                logger.error(f"数据库连接失败: {e}")
-                return False
+        # 通过异步引擎测试数据库连接
+        try:
+            async with async_engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+            db_connected = True
+        except Exception as e:
+            logger.error(f"数据库连接失败: {e}")
+            db_connected = False
         
-        # 在线程池中执行数据库连接测试
         loop = asyncio.get_event_loop()
-        db_connected = await loop.run_in_executor(None, test_db_connection)
         
         if db_connected:
             logger.info("✅ 数据库连接成功")
+            start_history_writer()
+            
+            def build_suggestion_trie():
+                db = SessionLocal()
+                try:
+                    return load_suggestion_trie(db)
+                finally:
+                    db.close()
+            
+            try:
+                suggestion_trie = await loop.run_in_executor(None, build_suggestion_trie)
+                logger.info(f"搜索建议前缀树构建完成: {suggestion_trie.size} 个词条")
+            except Exception as e:
+                logger.warning(f"搜索建议前缀树构建失败，使用数据库查询: {e}")
         else:
             logger.warning("❌ 数据库连接失败，将使用模拟数据运行")
+        
+        # 向量索引在启动时加载并预热，请求路径上不再承担索引加载开销
+        def load_vector_service():
+            service = enhanced_vector_search.get_enhanced_service()
+            service.warmup()
+            return service
+        
+        app.state.vector_service = await loop.run_in_executor(None, load_vector_service)
             
     except Exception as e:
         logger.error(f"启动事件处理失败: {e}")
@@ -72,8 +113,10 @@ async def shutdown_event():
     logger.info("应用正在关闭...")
     # 这里可以添加清理逻辑
     try:
-        # 关闭数据库连接池
+        # 写完队列中剩余的搜索历史后再关闭数据库连接池
+        await stop_history_writer()
         engine.dispose()
+        await async_engine.dispose()
         logger.info("数据库连接池已关闭")
     except Exception as e:
         logger.error(f"关闭时出现错误: {e}")
@@ -86,21 +129,249 @@ async def root():
         "docs": "/docs"
     }
 
+# 健康检查的数据库探测结果缓存时间（秒），高频探针不必每次占用真实连接
+HEALTH_PING_INTERVAL = 30
+_db_health = {"status": None, "checked_at": 0.0}
+
+
+async def _database_status() -> str:
+    loop = asyncio.get_running_loop()
+    if _db_health["status"] is None or loop.time() - _db_health["checked_at"] >= HEALTH_PING_INTERVAL:
+        try:
+            async with async_engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+            _db_health["status"] = "connected"
+        except Exception:
+            _db_health["status"] = "disconnected"
+        _db_health["checked_at"] = loop.time()
+    return _db_health["status"]
+
+
 @app.get("/health")
 async def health_check():
-    # 测试数据库连接状态
+    # 数据库状态按间隔探测，连接池状态直接读取
+    pool = async_engine.pool
+    return {
+        "status": "healthy",
+        "database": await _database_status(),
+        "pool": {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow()
+        }
+    }
+
+# 全文索引 ft_poses（ngram分词）覆盖的列，MATCH 的列必须与索引完全一致
+_FULLTEXT_MATCH = "MATCH(title, description, ai_tags)"
+# ngram_token_size 默认为2，短于该长度的词无法命中全文索引
+FT_MIN_TOKEN_SIZE = 2
+_FULLTEXT_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+
+def _boolean_fulltext_query(q: str) -> Optional[str]:
+    """将查询词转换为布尔模式表达式（每个词都必须命中）；没有可用的词时返回None"""
+    terms = [t for t in _FULLTEXT_OPERATORS.sub(" ", q).split() if len(t) >= FT_MIN_TOKEN_SIZE]
+    if not terms:
+        return None
+    return " ".join(f"+{t}*" for t in terms)
+
+
+# 姿势列表语句按 (搜索方式, 分类过滤, 角度过滤, 排序) 在模块加载时一次性构建，
+# 请求间复用同一 text() 对象以命中 SQLAlchemy 编译缓存
+# 空值默认值和时间格式化在SQL中完成，每行结果按位置与 _POSE_LIST_KEYS 对应。
+# 计算列不设与原列同名的别名，以免 ORDER BY created_at / view_count 解析到表达式而无法走索引
+_POSE_LIST_COLUMNS = (
+    "id, oss_url, thumbnail_url, COALESCE(title, ''), COALESCE(description, ''), "
+    "scene_category, angle, shooting_tips, COALESCE(ai_tags, ''), COALESCE(view_count, 0), "
+    "DATE_FORMAT(created_at, '%Y-%m-%dT%H:%i:%s')"
+)
+_POSE_LIST_KEYS = (
+    'id', 'oss_url', 'thumbnail_url', 'title', 'description', 'scene_category', 'angle',
+    'shooting_tips', 'ai_tags', 'view_count', 'created_at'
+)
+# 排序列（均为 NOT NULL，见 migrations/add_pose_sort_not_null.sql）；
+# id 作为并列值的次序，使 (排序列, id) 可作为翻页游标
+_SORT_COLUMNS = {
+    'latest': 'created_at',
+    'popular': 'view_count',
+    'view_count': 'view_count'
+}
+# 结果行在 _POSE_LIST_KEYS 之后附带未格式化的排序列原值（用于生成游标），按页码翻页时再附带总数
+_SORT_VALUE_INDEX = len(_POSE_LIST_KEYS)
+_TOTAL_INDEX = _SORT_VALUE_INDEX + 1
+
+
+def _pose_list_where(search: Optional[str], category: bool, angle: bool) -> str:
+    conditions = ["status = 'active'"]
+    if search == "fulltext":
+        conditions.append(f"{_FULLTEXT_MATCH} AGAINST (:ft_query IN BOOLEAN MODE)")
+    elif search == "like":
+        conditions.append("(title LIKE :search_term OR description LIKE :search_term OR ai_tags LIKE :search_term)")
+    if category:
+        conditions.append("scene_category = :category")
+    if angle:
+        conditions.append("angle = :angle")
+    return " AND ".join(conditions)
+
+
+_FILTER_VARIANTS = [
+    (search, category, angle)
+    for search in (None, "fulltext", "like")
+    for category in (False, True)
+    for angle in (False, True)
+]
+
+# 按页码翻页时总数通过窗口函数随分页数据一并返回，省去单独的 COUNT 查询；
+# 按游标翻页（seek）时从 (排序列, id) 索引位置直接向后读取，不扫描前面的行，
+# 多取一行用于判断是否还有下一页。
+# 游标条件写成展开的 OR 形式而不是行构造器比较 (col, id) < (v, id)，后者MySQL无法转换为索引范围扫描
+_POSE_LIST_STMTS = {
+    (*variant, sort_column, False): text(f"""
+        SELECT {_POSE_LIST_COLUMNS}, {sort_column}, COUNT(*) OVER () AS total
+        FROM poses
+        WHERE {_pose_list_where(*variant)}
+        ORDER BY {sort_column} DESC, id DESC
+        LIMIT :limit OFFSET :offset
+    """)
+    for variant in _FILTER_VARIANTS
+    for sort_column in set(_SORT_COLUMNS.values())
+}
+_POSE_LIST_STMTS.update({
+    (*variant, sort_column, True): text(f"""
+        SELECT {_POSE_LIST_COLUMNS}, {sort_column}
+        FROM poses
+        WHERE {_pose_list_where(*variant)}
+          AND ({sort_column} < :cursor_value OR ({sort_column} = :cursor_value AND id < :cursor_id))
+        ORDER BY {sort_column} DESC, id DESC
+        LIMIT :limit
+    """)
+    for variant in _FILTER_VARIANTS
+    for sort_column in set(_SORT_COLUMNS.values())
+})
+_POSE_COUNT_STMTS = {
+    variant: text(f"SELECT COUNT(*) FROM poses WHERE {_pose_list_where(*variant)}")
+    for variant in _FILTER_VARIANTS
+}
+
+# 一页姿势的标签用一条 IN 查询批量加载（等同 selectinload），避免逐条查询
+_POSE_TAGS_STMT = text("""
+    SELECT pt.pose_id, t.name
+    FROM pose_tags pt
+    JOIN tags t ON t.id = pt.tag_id
+    WHERE pt.pose_id IN :ids
+    ORDER BY pt.confidence DESC
+""").bindparams(bindparam("ids", expanding=True))
+
+
+async def _attach_tags(db: AsyncSession, poses: list):
+    tags_by_pose = {pose['id']: [] for pose in poses}
+    if tags_by_pose:
+        for pose_id, name in await db.execute(_POSE_TAGS_STMT, {'ids': list(tags_by_pose)}):
+            tags_by_pose[pose_id].append(name)
+    for pose in poses:
+        pose['tags'] = tags_by_pose[pose['id']]
+
+
+def _encode_cursor(row, sort_column: str, total: int) -> str:
+    """游标包含最后一行排序列的原值、id 以及总数（后续页不再统计总数）"""
+    value = row[_SORT_VALUE_INDEX]
+    if sort_column == 'created_at':
+        value = value.isoformat()
+    raw = f"{value}|{row[0]}|{total}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str, sort_column: str) -> tuple:
     try:
-        with engine.connect() as connection:
-            connection.execute(text("SELECT 1"))
-        db_status = "connected"
-    except Exception:
-        db_status = "disconnected"
+        value, pose_id, total = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        if sort_column == 'view_count':
+            value = int(value)
+        else:
+            value = datetime.fromisoformat(value)
+        return value, int(pose_id), int(total)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+
+
+async def _query_poses(
+    db: AsyncSession,
+    q: Optional[str],
+    category: Optional[str],
+    angle: Optional[str],
+    sort: str,
+    page: int,
+    per_page: int,
+    cursor: Optional[str] = None,
+    include_tags: bool = False,
+) -> dict:
+    """查询一页姿势及总数；传入 cursor 时按游标翻页，否则按页码翻页"""
+    params = {}
+    
+    # 搜索条件：走全文索引，查询词过短无法分词时才回退到 LIKE
+    search = None
+    if q and q.strip():
+        ft_query = _boolean_fulltext_query(q)
+        if ft_query:
+            search = "fulltext"
+            params['ft_query'] = ft_query
+        else:
+            search = "like"
+            params['search_term'] = f"%{q.strip()}%"
+    
+    # 分类筛选
+    if category:
+        params['category'] = category
+    
+    # 角度筛选
+    if angle:
+        params['angle'] = angle
+    
+    variant = (search, bool(category), bool(angle))
+    sort_column = _SORT_COLUMNS.get(sort, 'created_at')
+    
+    if cursor:
+        cursor_value, cursor_id, total = _decode_cursor(cursor, sort_column)
+        results = (await db.execute(
+            _POSE_LIST_STMTS[(*variant, sort_column, True)],
+            {**params, 'cursor_value': cursor_value, 'cursor_id': cursor_id, 'limit': per_page + 1}
+        )).fetchall()
+        has_more = len(results) > per_page
+        del results[per_page:]
+    else:
+        # 分页
+        offset = (page - 1) * per_page
+        
+        results = (await db.execute(
+            _POSE_LIST_STMTS[(*variant, sort_column, False)],
+            {**params, 'limit': per_page, 'offset': offset}
+        )).fetchall()
+        
+        if results:
+            total = results[0][_TOTAL_INDEX]
+        elif offset > 0:
+            # 页码超出范围时当前页没有行，总数需要单独统计
+            total = (await db.execute(_POSE_COUNT_STMTS[variant], params)).scalar() or 0
+        else:
+            total = 0
+        has_more = offset + len(results) < total
+    
+    # 转换结果（末尾的排序原值和 total 列不在 _POSE_LIST_KEYS 中，zip 时自然丢弃）
+    poses = [dict(zip(_POSE_LIST_KEYS, row)) for row in results]
+    if include_tags:
+        await _attach_tags(db, poses)
     
     return {
-        "status": "healthy",
-        "database": db_status
+        "poses": poses,
+        "total": total,
+        # 游标翻页时页码没有意义，不回显默认值
+        "page": None if cursor else page,
+        "per_page": per_page,
+        "hasMore": has_more,
+        "next_cursor": _encode_cursor(results[-1], sort_column, total) if has_more else None
     }
 
+
 @app.get("/api/v1/poses")
 async def get_poses(
     q: Optional[str] = None,
@@ -109,101 +380,17 @@ async def get_poses(
     sort: str = "latest",
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_tags: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """获取姿势列表"""
+    """获取姿势列表；下一页传入上一页返回的 next_cursor，page 参数保留兼容；
+    include_tags=true 时每个姿势附带关联标签名"""
     try:
-        # 构建基础查询条件
-        conditions = ["status = 'active'"]
-        params = {}
-        
-        # 搜索条件
-        if q and q.strip():
-            conditions.append("""
-                (title LIKE :search_term 
-                OR description LIKE :search_term 
-                OR ai_tags LIKE :search_term)
-            """)
-            params['search_term'] = f"%{q.strip()}%"
-        
-        # 分类筛选
-        if category:
-            conditions.append("scene_category = :category")
-            params['category'] = category
-        
-        # 角度筛选
-        if angle:
-            conditions.append("angle = :angle")
-            params['angle'] = angle
-        
-        # 排序
-        sort_mapping = {
-            'latest': 'created_at DESC',
-            'popular': 'view_count DESC',
-            'view_count': 'view_count DESC'
-        }
-        order_by = sort_mapping.get(sort, 'created_at DESC')
-        
-        # 分页
-        offset = (page - 1) * per_page
-        
-        # 构建查询
-        where_clause = " AND ".join(conditions)
-        
-        # 获取总数
-        count_sql = f"""
-            SELECT COUNT(*) as total
-            FROM poses 
-            WHERE {where_clause}
-        """
-        
-        count_result = db.execute(text(count_sql), params).fetchone()
-        total = count_result[0] if count_result else 0
-        
-        # 获取数据
-        data_sql = f"""
-            SELECT 
-                id, oss_url, thumbnail_url, title, description,
-                scene_category, angle, shooting_tips, ai_tags,
-                view_count, created_at
-            FROM poses 
-            WHERE {where_clause}
-            ORDER BY {order_by}
-            LIMIT :limit OFFSET :offset
-        """
-        
-        params.update({
-            'limit': per_page,
-            'offset': offset
-        })
-        
-        results = db.execute(text(data_sql), params).fetchall()
-        
-        # 转换结果
-        poses = []
-        for row in results:
-            pose_data = {
-                'id': row[0],
-                'oss_url': row[1],
-                'thumbnail_url': row[2],
-                'title': row[3] or '',
-                'description': row[4] or '',
-                'scene_category': row[5],
-                'angle': row[6],
-                'shooting_tips': row[7],
-                'ai_tags': row[8] or '',
-                'view_count': row[9] or 0,
-                'created_at': row[10].isoformat() if row[10] else None
-            }
-            poses.append(pose_data)
-        
-        return {
-            "poses": poses,
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "hasMore": offset + len(poses) < total
-        }
+        return await _query_poses(db, q, category, angle, sort, page, per_page, cursor, include_tags)
+    
+    except HTTPException:
+        raise
         
     except Exception as e:
         print(f"数据库查询错误: {e}")
@@ -248,48 +435,55 @@ async def get_poses(
                 }
             ],
             "total": 3,
-            "page": page,
+            "page": None if cursor else page,
             "per_page": per_page,
             "hasMore": False
         }
 
+# 场景图标映射：分类名包含关键词即使用对应图标
+SCENE_ICONS = {
+    "室内": "🏠", "咖啡馆": "☕", "街头": "🏙️", 
+    "户外": "🌿", "人像": "👤", "情侣": "💕",
+    "商务": "💼", "创意": "🎨"
+}
+DEFAULT_SCENE_ICON = "📸"
+_SCENE_ICON_RE = re.compile("|".join(map(re.escape, SCENE_ICONS)))
+
+_SCENE_COUNTS_STMT = text("""
+    SELECT scene_slug, scene_category, COUNT(*) as count 
+    FROM poses 
+    WHERE status = 'active' AND scene_category IS NOT NULL
+    GROUP BY scene_category, scene_slug
+    ORDER BY count DESC
+""")
+
+async def _load_scenes(db: AsyncSession) -> dict:
+    """查询每个分类的姿势数量"""
+    result = await db.execute(_SCENE_COUNTS_STMT)
+    
+    scenes = []
+    for slug, category, count in result:
+        m = _SCENE_ICON_RE.search(category)
+        icon = SCENE_ICONS[m.group()] if m else DEFAULT_SCENE_ICON
+        
+        scenes.append({
+            "id": slug,
+            "name": category,
+            "count": count,
+            "icon": icon
+        })
+    
+    return {"scenes": scenes}
+
+
 @app.get("/api/v1/scenes")
-async def get_scenes(db: Session = Depends(get_db)):
+async def get_scenes(request: Request, db: AsyncSession = Depends(get_async_db)):
     """获取场景分类统计"""
     try:
-        # 查询每个分类的数量
-        result = db.execute(text("""
-            SELECT scene_category, COUNT(*) as count 
-            FROM poses 
-            WHERE status = 'active' AND scene_category IS NOT NULL
-            GROUP BY scene_category
-            ORDER BY count DESC
-        """))
-        
-        scenes = []
-        # 图标映射
-        icon_mapping = {
-            "室内": "🏠", "咖啡馆": "☕", "街头": "🏙️", 
-            "户外": "🌿", "人像": "👤", "情侣": "💕",
-            "商务": "💼", "创意": "🎨"
-        }
-        
-        for row in result:
-            category = row[0]
-            icon = "📸"  # 默认图标
-            for key, value in icon_mapping.items():
-                if key in category:
-                    icon = value
-                    break
-                    
-            scenes.append({
-                "id": category.lower().replace(' ', '_').replace('拍摄', '').replace('摄影', ''),
-                "name": category,
-                "count": row[1],
-                "icon": icon
-            })
-        
-        return {"scenes": scenes}
+        # 分类统计变化不频繁，缓存10分钟，姿势数据写入时清除
+        # 响应同时带 ETag / Cache-Control，浏览器和CDN在5分钟内无需回源
+        scenes = await cached_json(SCENES_CACHE_KEY, 600, lambda: _load_scenes(db))
+        return cacheable_json(request, scenes, max_age=300)
         
     except Exception as e:
         print(f"数据库查询错误: {e}")
@@ -307,42 +501,110 @@ async def get_scenes(db: Session = Depends(get_db)):
             ]
         }
 
+# 标题建议只匹配标题和标签（ngram索引 ft_title_tags），描述中的命中对标题建议没有意义；
+# 两个汉字的查询词即可命中索引，只有单字查询才回退到 LIKE
+_SUGGEST_FULLTEXT_MATCH = "MATCH(title, ai_tags)"
+_TITLE_SUGGEST_FULLTEXT_STMT = text(f"""
+    SELECT DISTINCT title 
+    FROM poses 
+    WHERE status = 'active' 
+    AND {_SUGGEST_FULLTEXT_MATCH} AGAINST (:ft_query IN BOOLEAN MODE)
+    AND title IS NOT NULL
+    LIMIT 10
+""")
+_TITLE_SUGGEST_LIKE_STMT = text("""
+    SELECT DISTINCT title 
+    FROM poses 
+    WHERE status = 'active' 
+    AND title LIKE :prefix 
+    AND title IS NOT NULL
+    LIMIT 10
+""")
+
+
+async def _query_title_suggestions(db: AsyncSession, q: str):
+    """从标题中匹配建议（前缀树不可用时使用），优先走全文索引"""
+    ft_query = _boolean_fulltext_query(q)
+    if ft_query:
+        result = await db.execute(_TITLE_SUGGEST_FULLTEXT_STMT, {"ft_query": ft_query})
+    else:
+        result = await db.execute(_TITLE_SUGGEST_LIKE_STMT, {"prefix": f"%{q}%"})
+    return [row[0] for row in result if row[0]]
+
+async def _query_suggestions(db: AsyncSession, q: str) -> list:
+    """前缀树（或全文索引）建议，不足时补充固定建议"""
+    if suggestion_trie is not None:
+        # 从启动时构建的前缀树获取建议（标题、标签、热门搜索词）
+        suggestions = suggestion_trie.suggest(q, 10)
+    else:
+        suggestions = await _query_title_suggestions(db, q)
+    
+    # 如果建议不够，添加一些固定建议
+    if len(suggestions) < 5:
+        fixed_suggestions = [
+            '室内人像', '咖啡馆拍照', '街头摄影', '情侣写真',
+            '商务头像', '自然光人像', '创意构图', '半身照',
+            '全身照', '侧面角度', '逆光摄影', '优雅姿势'
+        ]
+        
+        for suggestion in fixed_suggestions:
+            if q.lower() in suggestion.lower() and suggestion not in suggestions:
+                suggestions.append(suggestion)
+                if len(suggestions) >= 8:
+                    break
+    
+    return suggestions
+
+@cache_result("sugg", ttl=300)
+async def _cached_suggestions(q: str, db: AsyncSession):
+    """搜索建议缓存5分钟；查询出错时异常直接抛出，回退结果不会写入缓存"""
+    return await _query_suggestions(db, q)
+
+
 @app.get("/api/v1/search/suggestions")
 async def get_suggestions(
     q: str = Query(..., description="搜索关键词"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取搜索建议"""
     try:
-        # 从标题和标签中获取建议
-        result = db.execute(text("""
-            SELECT DISTINCT title 
-            FROM poses 
-            WHERE status = 'active' 
-            AND title LIKE :prefix 
-            AND title IS NOT NULL
-            LIMIT 10
-        """), {"prefix": f"%{q}%"})
-        
-        suggestions = [row[0] for row in result if row[0]]
-        
-        # 如果建议不够，添加一些固定建议
-        if len(suggestions) < 5:
-            fixed_suggestions = [
-                '室内人像', '咖啡馆拍照', '街头摄影', '情侣写真',
-                '商务头像', '自然光人像', '创意构图', '半身照',
-                '全身照', '侧面角度', '逆光摄影', '优雅姿势'
-            ]
-            
-            for suggestion in fixed_suggestions:
-                if q.lower() in suggestion.lower() and suggestion not in suggestions:
-                    suggestions.append(suggestion)
-                    if len(suggestions) >= 8:
-                        break
-        
-        return suggestions
+        return await _cached_suggestions(q=q, db=db)
         
     except Exception as e:
-        print(f"搜索建议查询错误: {e}")
+        logger.warning(f"搜索建议查询错误: {e}")
         # 返回固定建议
-        return ['室内人像', '咖啡馆拍照', '街头摄影', '情侣写真']
\ No newline at end of file
+        return ['室内人像', '咖啡馆拍照', '街头摄影', '情侣写真']
+
+
+async def _with_session(fn, *args):
+    """为并发查询各自打开独立的异步会话（同一会话不能并发执行语句）"""
+    async with AsyncSessionLocal() as db:
+        return await fn(db, *args)
+
+
+@app.get("/api/v1/landing")
+async def get_landing(
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    sort: str = "latest",
+    per_page: int = Query(20, ge=1, le=100)
+):
+    """首页数据：姿势首屏、场景分类和搜索建议并发查询，一次请求返回"""
+    async def no_suggestions():
+        return []
+    
+    try:
+        poses, scenes, suggestions = await asyncio.gather(
+            _with_session(_query_poses, q, category, None, sort, 1, per_page),
+            cached_json(SCENES_CACHE_KEY, 600, lambda: _with_session(_load_scenes)),
+            _with_session(_query_suggestions, q) if q and q.strip() else no_suggestions(),
+        )
+    except Exception as e:
+        logger.error(f"首页数据查询失败: {e}")
+        raise HTTPException(status_code=500, detail="首页数据加载失败")
+    
+    return {
+        "poses": poses,
+        "scenes": scenes["scenes"],
+        "suggestions": suggestions
+    }
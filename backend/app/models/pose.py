@@ -1,10 +1,27 @@
-from sqlalchemy import Column, Integer, String, Text, JSON, TIMESTAMP, Enum, DECIMAL
+from sqlalchemy import Column, Integer, String, Text, JSON, TIMESTAMP, Enum, DECIMAL, Index, Computed
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
 
 class Pose(Base):
     __tablename__ = "poses"
+    __table_args__ = (
+        # 全文索引（ngram分词），见 migrations/add_fulltext_ngram_index.sql
+        Index(
+            "ft_poses", "title", "description", "ai_tags",
+            mysql_prefix="FULLTEXT", mysql_with_parser="ngram",
+        ),
+        # 搜索建议使用的标题+标签全文索引
+        Index(
+            "ft_title_tags", "title", "ai_tags",
+            mysql_prefix="FULLTEXT", mysql_with_parser="ngram",
+        ),
+        # 场景统计（status过滤 + 按scene_category分组）只需扫描该索引
+        Index("idx_status_category", "status", "scene_category", "scene_slug"),
+        # 姿势列表按 (排序列, id) 游标翻页
+        Index("idx_status_created_id", "status", "created_at", "id"),
+        Index("idx_status_views_id", "status", "view_count", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     oss_key = Column(String(255), unique=True, nullable=False)
@@ -13,6 +30,10 @@ class Pose(Base):
     title = Column(String(200))
     description = Column(Text)
     scene_category = Column(String(50))
+    # 场景分类ID，由数据库在写入时生成，见 migrations/add_scene_slug.sql
+    scene_slug = Column(String(64), Computed(
+        "LOWER(REPLACE(REPLACE(REPLACE(scene_category, ' ', '_'), '拍摄', ''), '摄影', ''))", persisted=True
+    ))
     angle = Column(String(50))
     props = Column(JSON)
     shooting_tips = Column(Text)
@@ -25,11 +46,11 @@ class Pose(Base):
     error_message = Column(Text)
     
     # 统计字段
-    view_count = Column(Integer, default=0)
+    view_count = Column(Integer, nullable=False, default=0)
     search_count = Column(Integer, default=0)
     
     # 时间字段
-    created_at = Column(TIMESTAMP, default=func.now())
+    created_at = Column(TIMESTAMP, nullable=False, default=func.now())
     updated_at = Column(TIMESTAMP, default=func.now(), onupdate=func.now())
     
     # 状态字段
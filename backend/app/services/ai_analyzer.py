@@ -1,72 +1,507 @@
 import openai
-from openai import OpenAI
-import json
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+import functools
+import asyncio
+import orjson
 import logging
+from types import MappingProxyType
 from typing import Dict, List, Optional
 from ..config import settings
+from ..utils.redis_client import get_raw_redis
+from ..utils.rate_limiter import openai_limiter, estimate_tokens
+from ..utils.ttl_cache import TTLCache
 import time
 import re
 import requests
+from requests.adapters import HTTPAdapter
+import httpx
+from urllib.parse import urlparse
 from PIL import Image
 import io
 import base64
+import hashlib
 
 logger = logging.getLogger(__name__)
 
+# 场景分类映射
+SCENE_MAPPING = MappingProxyType({
+    '室内': '室内', '家居': '室内', '工作室': '室内',
+    '户外': '户外', '公园': '户外', '街道': '户外',
+    '咖啡厅': '咖啡厅', '咖啡馆': '咖啡厅', '茶室': '咖啡厅',
+    '商场': '商场', '购物中心': '商场',
+    '学校': '学校', '校园': '学校', '教室': '学校',
+    '办公室': '办公室', '工作场所': '办公室',
+    '海边': '海边', '海滩': '海边',
+    '森林': '森林', '树林': '森林',
+    '城市': '城市', '都市': '城市'
+})
+
+# 角度映射
+ANGLE_MAPPING = MappingProxyType({
+    '正面': '正面', '正脸': '正面',
+    '侧面': '侧面', '侧身': '侧面',
+    '背面': '背面', '背影': '背面',
+    '俯视': '俯视', '俯拍': '俯视',
+    '仰视': '仰视', '仰拍': '仰视',
+    '斜角': '斜角', '倾斜': '斜角'
+})
+
+
+def _trusted_hosts() -> frozenset:
+    """站点自有OSS域名，这些图片无需预先验证可访问性"""
+    hosts = {f"{settings.oss_bucket}.{settings.oss_endpoint}"}
+    if settings.oss_custom_domain:
+        domain = settings.oss_custom_domain
+        hosts.add(urlparse(domain if "//" in domain else f"//{domain}").netloc)
+    return frozenset(hosts)
+
+
+TRUSTED_HOSTS = _trusted_hosts()
+# 安装了 h2 时对 OpenAI 使用 HTTP/2 多路复用，否则使用 HTTP/1.1 长连接
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+# 同步路径下载/验证图片的连接池，重复访问OSS时复用TLS连接
+_http_session = requests.Session()
+for _prefix in ("https://", "http://"):
+    _http_session.mount(_prefix, HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0))
+# OpenAI 连接池，保持长连接以免每次请求重新握手
+OPENAI_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+# 同一图片的分析结果缓存时间（秒）
+ANALYSIS_CACHE_TTL = 30 * 86400
+# 外部图片URL验证结果的缓存时间（秒）和条目上限
+VALIDATION_TTL = 300
+VALIDATION_CACHE_SIZE = 4096
+_validation_cache = TTLCache(VALIDATION_CACHE_SIZE, VALIDATION_TTL)
+
+
+def _is_trusted_url(image_url: str) -> bool:
+    return urlparse(image_url).netloc in TRUSTED_HOSTS
+
+
+# 字符串形式的标签/道具列表的分隔符，兼容中文逗号和顿号
+_TAG_SPLIT = re.compile(r"\s*[,，、]+\s*")
+
+# 图片分析提示词
+_ANALYSIS_PROMPT = """
+请仔细分析这张摄影姿势图片，按照以下JSON格式返回分析结果：
+
+{
+    "title": "简洁的标题",
+    "description": "详细的姿势描述",
+    "scene_category": "场景分类",
+    "angle": "拍摄角度", 
+    "tags": ["标签1", "标签2", "标签3"],
+    "props": ["道具1", "道具2"],
+    "shooting_tips": "拍摄建议和技巧",
+    "confidence": 0.95
+}
+
+**分析要求：**
+
+1. **title**: 3-8个字的简洁标题，如"森系少女写真"、"咖啡厅慵懒时光"
+
+2. **description**: 50-100字的详细描述，包括人物状态、动作、表情等
+
+3. **scene_category**: 必须从以下选项中选择一个：
+   - 室内、户外、咖啡厅、商场、学校、办公室、海边、森林、城市、其他
+
+4. **angle**: 必须从以下选项中选择一个：
+   - 正面、侧面、背面、俯视、仰视、斜角
+
+5. **tags**: 5-10个中文关键词，包括情绪、动作、风格、服装等
+
+6. **props**: 画面中的道具和物品
+
+7. **shooting_tips**: 实用的拍摄建议
+
+8. **confidence**: 分析结果的置信度(0.0-1.0)
+
+请确保返回的是有效的JSON格式。
+"""
+
+# base64方式发送前把图片缩到该边长以内，减少上传字节和内存占用
+BASE64_MAX_SIDE = 1024
+_DOWNLOAD_CHUNK = 65536
+
+
+def _image_data_url(buf: io.BytesIO) -> str:
+    """缩小图片并重新编码为JPEG，返回 data URL"""
+    buf.seek(0)
+    with Image.open(buf) as img:
+        img.thumbnail((BASE64_MAX_SIDE, BASE64_MAX_SIDE), Image.LANCZOS)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        out = io.BytesIO()
+        img.save(out, "JPEG", quality=85)
+    return "data:image/jpeg;base64," + base64.b64encode(out.getbuffer()).decode('ascii')
+
+
+def read_json_stream(stream) -> str:
+    """读取流式回复，顶层JSON对象一闭合就关闭流并返回JSON文本，不再等待流结束"""
+    parts = []
+    depth = 0
+    in_string = escaped = False
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            for i, ch in enumerate(delta):
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif ch == "\\":
+                        escaped = True
+                    elif ch == '"':
+                        in_string = False
+                elif ch == '"':
+                    in_string = True
+                elif ch == "{":
+                    depth += 1
+                elif ch == "}":
+                    depth -= 1
+                    if depth == 0:
+                        parts.append(delta[:i + 1])
+                        return "".join(parts)
+            parts.append(delta)
+    finally:
+        stream.close()
+    return "".join(parts)
+
+
 class AIAnalyzer:
     """AI图片分析服务 - 修复版本"""
     
     def __init__(self):
         self.client = OpenAI(
             api_key=settings.openai_api_key,
-            timeout=60.0  # 增加超时时间
+            timeout=60.0,  # 增加超时时间
+            http_client=DefaultHttpxClient(http2=HTTP2_AVAILABLE, limits=OPENAI_LIMITS)
+        )
+        # 异步客户端供服务端并发分析使用，不阻塞事件循环
+        self.async_client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            timeout=60.0,
+            http_client=DefaultAsyncHttpxClient(http2=HTTP2_AVAILABLE, limits=OPENAI_LIMITS)
+        )
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100),
+            timeout=5.0,
+            follow_redirects=True
         )
         self.model = settings.openai_model
         self.max_tokens = settings.openai_max_tokens
         self.temperature = settings.openai_temperature
     
-    def analyze_pose_image(self, image_url: str, retry_count: int = 0) -> Optional[Dict]:
-        """分析姿势图片"""
+    def _build_messages(self, image_url: str) -> List[Dict]:
+        """构建包含提示词和图片（URL或data URI）的消息"""
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text", 
+                        "text": _ANALYSIS_PROMPT
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": image_url,
+                            "detail": "high"
+                        }
+                    }
+                ]
+            }
+        ]
+    
+    @staticmethod
+    def _analysis_cache_key(image_url: str) -> str:
+        return "ai:" + hashlib.sha1(image_url.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _content_cache_key(kind: str, digest: str) -> str:
+        return f"ai:{kind}:{digest}"
+    
+    def _read_cache(self, client, key: str) -> Optional[Dict]:
         try:
-            # 验证图片URL可访问性
-            if not self._validate_image_url(image_url):
-                logger.error(f"图片URL不可访问: {image_url}")
-                # 尝试使用备用方法
-                return self._analyze_with_base64(image_url, retry_count)
+            cached = client.get(key)
+            if cached:
+                return orjson.loads(cached)
+        except Exception as e:
+            logger.warning(f"读取AI分析缓存失败: {e}")
+        return None
+    
+    def _etag_cache_key(self, etag: Optional[str]) -> Optional[str]:
+        """OSS对象的ETag由内容计算，作为缓存键时重新上传或改名的同一图片也能命中
+
+        ETag取自调用方已有的OSS列举结果或对象元数据，不为此单独发起HEAD请求。
+        """
+        etag = (etag or "").strip('"')
+        return self._content_cache_key("etag", etag) if etag else None
+    
+    def _get_cached_analysis(self, image_url: str, content_key: Optional[str] = None) -> Optional[Dict]:
+        """读取缓存的分析结果：先按URL，再按内容缓存键查找；Redis不可用时返回None"""
+        client = get_raw_redis()
+        if client is None:
+            return None
+        cached = self._read_cache(client, self._analysis_cache_key(image_url))
+        if cached is None and content_key:
+            cached = self._read_cache(client, content_key)
+            if cached is not None:
+                self._store_cached_analysis(image_url, cached)
+        if cached is not None:
+            logger.info(f"命中AI分析缓存: {image_url}")
+        return cached
+    
+    def _store_cached_analysis(self, image_url: str, analysis: Dict, content_key: Optional[str] = None):
+        """按URL缓存分析结果，已知图片内容标识时同时按内容缓存"""
+        client = get_raw_redis()
+        if client is None:
+            return
+        try:
+            value = orjson.dumps(analysis)
+            pipe = client.pipeline(transaction=False)
+            pipe.set(self._analysis_cache_key(image_url), value, ex=ANALYSIS_CACHE_TTL)
+            if content_key:
+                pipe.set(content_key, value, ex=ANALYSIS_CACHE_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"写入AI分析缓存失败: {e}")
+    
+    def _cached_by_content(self, image_url: str, buf: io.BytesIO) -> tuple:
+        """按下载到的图片内容（SHA-256）查找缓存，返回 (缓存结果或None, 内容缓存键)"""
+        with buf.getbuffer() as view:
+            content_key = self._content_cache_key("sha256", hashlib.sha256(view).hexdigest())
+        client = get_raw_redis()
+        cached = self._read_cache(client, content_key) if client is not None else None
+        if cached is not None:
+            logger.info(f"命中AI分析缓存（图片内容）: {image_url}")
+            self._store_cached_analysis(image_url, cached)
+        return cached, content_key
+    
+    def _estimate_tokens(self) -> int:
+        return estimate_tokens(_ANALYSIS_PROMPT, self.max_tokens)
+    
+    async def analyze_pose_image_async(self, image_url: str, retry_count: int = 0,
+                                       etag: Optional[str] = None) -> Optional[Dict]:
+        """分析姿势图片（异步版本），多张图片可通过 asyncio.gather 并发分析
+
+        etag 为OSS列举结果中的对象ETag，传入时分析结果同时按图片内容缓存。
+        """
+        content_key = self._etag_cache_key(etag)
+        if retry_count == 0:
+            # Redis为同步客户端，放到线程中执行
+            cached = await asyncio.to_thread(self._get_cached_analysis, image_url, content_key)
+            if cached is not None:
+                return cached
+        
+        try:
+            # 不预先验证URL，直接请求OpenAI；图片无法访问时由 invalid_image_url 错误转入base64方式
+            logger.info(f"开始AI分析图片: {image_url}")
+            
+            await openai_limiter.acquire(self._estimate_tokens())
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(image_url),
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                response_format={"type": "json_object"}
+            )
+            
+            analysis = self._parse_analysis_result(response.choices[0].message.content)
+            
+            if analysis:
+                self._store_cached_analysis(image_url, analysis, content_key)
+                logger.info(f"AI分析成功: {analysis.get('title', 'Unknown')}")
+                return analysis
+            else:
+                logger.error(f"AI分析结果解析失败")
+                return None
+                
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"AI分析失败 {image_url}: {error_msg}")
+            
+            if "invalid_image_url" in error_msg.lower():
+                logger.info("尝试使用base64编码方式...")
+                return await self._analyze_with_base64_async(image_url, retry_count)
+            
+            # 其他请求错误重试也不会成功，直接失败
+            if isinstance(e, openai.BadRequestError):
+                return None
             
-            prompt = self._build_analysis_prompt()
+            if retry_count < settings.max_retries:
+                wait_time = settings.processing_delay * (2 ** retry_count)  # 指数退避
+                logger.info(f"开始第 {retry_count + 1} 次重试，等待 {wait_time} 秒...")
+                await asyncio.sleep(wait_time)
+                return await self.analyze_pose_image_async(image_url, retry_count + 1, etag)
             
+            return None
+    
+    async def analyze_pose_images(self, image_urls: List[str], concurrency: Optional[int] = None,
+                                  etags: Optional[List[Optional[str]]] = None) -> List[Optional[Dict]]:
+        """并发分析多张图片，结果与 image_urls 一一对应（失败为None）
+
+        同时进行的请求数默认取 settings.max_concurrent_requests，按账号的 RPM/TPM 额度调整。
+        etags 与 image_urls 一一对应（可选）。
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.max_concurrent_requests)
+        etags = etags or [None] * len(image_urls)
+        
+        async def analyze(image_url: str, etag: Optional[str]) -> Optional[Dict]:
+            async with semaphore:
+                return await self.analyze_pose_image_async(image_url, etag=etag)
+        
+        return await asyncio.gather(*(analyze(url, etag) for url, etag in zip(image_urls, etags)))
+    
+    async def analyze_pose_images_batch(self, image_urls: List[str], batch_size: int = 8,
+                                        concurrency: Optional[int] = None,
+                                        etags: Optional[List[Optional[str]]] = None) -> List[Optional[Dict]]:
+        """每次请求打包分析 batch_size 张图片，提示词只发送一次，请求数减少为约 1/batch_size
+
+        结果与 image_urls 一一对应；批量结果中缺失或无效的图片单独重新分析。etags 与 image_urls 一一对应（可选）。
+        """
+        etags = etags or [None] * len(image_urls)
+        content_keys = [self._etag_cache_key(etag) for etag in etags]
+        results: List[Optional[Dict]] = list(await asyncio.gather(*(
+            asyncio.to_thread(self._get_cached_analysis, image_url, content_key)
+            for image_url, content_key in zip(image_urls, content_keys)
+        )))
+        pending = [i for i, cached in enumerate(results) if cached is None]
+        
+        semaphore = asyncio.Semaphore(concurrency or settings.max_concurrent_requests)
+        
+        async def analyze_chunk(indexes: List[int]):
+            async with semaphore:
+                analyses = await self._analyze_batch_request(
+                    [image_urls[i] for i in indexes], [content_keys[i] for i in indexes]
+                )
+            for i, analysis in zip(indexes, analyses):
+                if analysis is None:
+                    analysis = await self.analyze_pose_image_async(image_urls[i], etag=etags[i])
+                results[i] = analysis
+        
+        await asyncio.gather(*(
+            analyze_chunk(pending[start:start + batch_size])
+            for start in range(0, len(pending), batch_size)
+        ))
+        return results
+    
+    async def _analyze_batch_request(self, image_urls: List[str],
+                                     content_keys: List[Optional[str]]) -> List[Optional[Dict]]:
+        """一次请求分析多张图片，返回与 image_urls 对应的结果（解析失败的位置为None）"""
+        k = len(image_urls)
+        prompt = self._build_batch_prompt(k)
+        content = [{"type": "text", "text": prompt}] + [
+            {"type": "image_url", "image_url": {"url": image_url, "detail": "high"}}
+            for image_url in image_urls
+        ]
+        
+        try:
+            await openai_limiter.acquire(estimate_tokens(prompt, self.max_tokens * k))
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": content}],
+                max_tokens=self.max_tokens * k,
+                temperature=self.temperature,
+                response_format={"type": "json_object"}
+            )
+            items = orjson.loads(response.choices[0].message.content.encode())["results"]
+        except Exception as e:
+            logger.error(f"批量AI分析失败 ({k} 张): {e}")
+            return [None] * k
+        
+        analyses = []
+        for i, image_url in enumerate(image_urls):
+            item = items[i] if i < len(items) and isinstance(items[i], dict) else None
+            analysis = self._validate_result(item) if item is not None else None
+            if analysis:
+                self._store_cached_analysis(image_url, analysis, content_keys[i])
+            analyses.append(analysis)
+        
+        logger.info(f"批量AI分析完成: {sum(a is not None for a in analyses)}/{k}")
+        return analyses
+    
+    async def _analyze_with_base64_async(self, image_url: str, retry_count: int = 0) -> Optional[Dict]:
+        """使用base64编码的方式分析图片（异步版本）"""
+        try:
+            buf = await self._download_image_async(image_url)
+            if buf is None:
+                return None
+            cached, content_key = self._cached_by_content(image_url, buf)
+            if cached is not None:
+                return cached
+            # 解码和缩放占用CPU，放到线程中执行
+            data_url = await asyncio.to_thread(_image_data_url, buf)
+            
+            logger.info(f"使用base64方式分析图片: {image_url}")
+            
+            await openai_limiter.acquire(self._estimate_tokens())
+            chat_response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(data_url),
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                response_format={"type": "json_object"}
+            )
+            
+            analysis = self._parse_analysis_result(chat_response.choices[0].message.content)
+            
+            if analysis:
+                self._store_cached_analysis(image_url, analysis, content_key)
+                logger.info(f"Base64方式AI分析成功: {analysis.get('title', 'Unknown')}")
+                return analysis
+            else:
+                logger.error(f"Base64方式AI分析结果解析失败")
+                return None
+                
+        except Exception as e:
+            logger.error(f"Base64方式分析失败: {e}")
+            
+            if retry_count < settings.max_retries:
+                wait_time = settings.processing_delay * (2 ** retry_count)
+                logger.info(f"Base64方式重试，等待 {wait_time} 秒...")
+                await asyncio.sleep(wait_time)
+                return await self._analyze_with_base64_async(image_url, retry_count + 1)
+            
+            return None
+    
+    def analyze_pose_image(self, image_url: str, retry_count: int = 0,
+                           etag: Optional[str] = None) -> Optional[Dict]:
+        """分析姿势图片；分析结果按URL和图片内容缓存在Redis中，重复处理时不再调用OpenAI
+
+        etag 为OSS列举结果中的对象ETag，传入时分析结果同时按图片内容缓存。
+        """
+        content_key = self._etag_cache_key(etag)
+        if retry_count == 0:
+            cached = self._get_cached_analysis(image_url, content_key)
+            if cached is not None:
+                return cached
+        
+        try:
+            # 不预先验证URL，直接请求OpenAI；图片无法访问时由 invalid_image_url 错误转入base64方式
             logger.info(f"开始AI分析图片: {image_url}")
             
             # 使用最新的API调用方式
+            openai_limiter.acquire_sync(self._estimate_tokens())
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text", 
-                                "text": prompt
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": image_url,
-                                    "detail": "high"
-                                }
-                            }
-                        ]
-                    }
-                ],
+                messages=self._build_messages(image_url),
                 max_tokens=self.max_tokens,
-                temperature=self.temperature
+                temperature=self.temperature,
+                response_format={"type": "json_object"}
             )
             
             result_text = response.choices[0].message.content
             analysis = self._parse_analysis_result(result_text)
             
             if analysis:
+                self._store_cached_analysis(image_url, analysis, content_key)
                 logger.info(f"AI分析成功: {analysis.get('title', 'Unknown')}")
                 return analysis
             else:
@@ -82,61 +517,48 @@ class AIAnalyzer:
                 logger.info("尝试使用base64编码方式...")
                 return self._analyze_with_base64(image_url, retry_count)
             
+            # 其他请求错误重试也不会成功，直接失败
+            if isinstance(e, openai.BadRequestError):
+                return None
+            
             # 重试机制
             if retry_count < settings.max_retries:
                 wait_time = settings.processing_delay * (2 ** retry_count)  # 指数退避
                 logger.info(f"开始第 {retry_count + 1} 次重试，等待 {wait_time} 秒...")
                 time.sleep(wait_time)
-                return self.analyze_pose_image(image_url, retry_count + 1)
+                return self.analyze_pose_image(image_url, retry_count + 1, etag)
             
             return None
     
     def _analyze_with_base64(self, image_url: str, retry_count: int = 0) -> Optional[Dict]:
         """使用base64编码的方式分析图片"""
         try:
-            # 下载图片并转换为base64
-            response = requests.get(image_url, timeout=30)
-            if response.status_code != 200:
-                logger.error(f"无法下载图片: {response.status_code}")
+            # 下载图片，缩小后转换为base64
+            buf = self._download_image(image_url)
+            if buf is None:
                 return None
-            
-            # 转换为base64
-            image_base64 = base64.b64encode(response.content).decode('utf-8')
-            content_type = response.headers.get('content-type', 'image/jpeg')
-            
-            prompt = self._build_analysis_prompt()
+            cached, content_key = self._cached_by_content(image_url, buf)
+            if cached is not None:
+                return cached
+            data_url = _image_data_url(buf)
             
             logger.info(f"使用base64方式分析图片: {image_url}")
             
             # 使用base64编码的图片
+            openai_limiter.acquire_sync(self._estimate_tokens())
             chat_response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text", 
-                                "text": prompt
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:{content_type};base64,{image_base64}",
-                                    "detail": "high"
-                                }
-                            }
-                        ]
-                    }
-                ],
+                messages=self._build_messages(data_url),
                 max_tokens=self.max_tokens,
-                temperature=self.temperature
+                temperature=self.temperature,
+                response_format={"type": "json_object"}
             )
             
             result_text = chat_response.choices[0].message.content
             analysis = self._parse_analysis_result(result_text)
             
             if analysis:
+                self._store_cached_analysis(image_url, analysis, content_key)
                 logger.info(f"Base64方式AI分析成功: {analysis.get('title', 'Unknown')}")
                 return analysis
             else:
@@ -155,20 +577,57 @@ class AIAnalyzer:
             
             return None
     
+    async def _download_image_async(self, image_url: str) -> Optional[io.BytesIO]:
+        """流式下载图片，超过 max_image_download_size 时放弃"""
+        buf = io.BytesIO()
+        async with self._http.stream("GET", image_url, timeout=30.0) as response:
+            if response.status_code != 200:
+                logger.error(f"无法下载图片: {response.status_code}")
+                return None
+            async for chunk in response.aiter_bytes(_DOWNLOAD_CHUNK):
+                buf.write(chunk)
+                if buf.tell() > settings.max_image_download_size:
+                    logger.error(f"图片超过 {settings.max_image_download_size} 字节，放弃分析: {image_url}")
+                    return None
+        return buf
+    
+    def _download_image(self, image_url: str) -> Optional[io.BytesIO]:
+        """流式下载图片，超过 max_image_download_size 时放弃"""
+        buf = io.BytesIO()
+        with _http_session.get(image_url, stream=True, timeout=30) as response:
+            if response.status_code != 200:
+                logger.error(f"无法下载图片: {response.status_code}")
+                return None
+            for chunk in response.iter_content(_DOWNLOAD_CHUNK):
+                buf.write(chunk)
+                if buf.tell() > settings.max_image_download_size:
+                    logger.error(f"图片超过 {settings.max_image_download_size} 字节，放弃分析: {image_url}")
+                    return None
+        return buf
+    
     def _validate_image_url(self, image_url: str) -> bool:
-        """验证图片URL是否可访问"""
+        """验证图片URL是否可访问（诊断用，分析流程不再预先验证）；自有OSS域名的图片直接视为可访问"""
+        if _is_trusted_url(image_url):
+            return True
+        ok = _validation_cache.get(image_url)
+        if ok is None:
+            ok = self._check_image_url(image_url)
+            _validation_cache.set(image_url, ok)
+        return ok
+    
+    def _check_image_url(self, image_url: str) -> bool:
         try:
             # 使用HEAD请求检查
-            response = requests.head(image_url, timeout=10, allow_redirects=True)
+            response = _http_session.head(image_url, timeout=10, allow_redirects=True)
             if response.status_code == 200:
                 content_type = response.headers.get('content-type', '')
                 return content_type.startswith('image/')
             
-            # 如果HEAD失败，尝试GET请求
-            response = requests.get(image_url, timeout=10, stream=True)
-            if response.status_code == 200:
-                content_type = response.headers.get('content-type', '')
-                return content_type.startswith('image/')
+            # 如果HEAD失败（不少CDN对HEAD返回403/405），尝试GET请求，只读取响应头后立即关闭
+            with _http_session.get(image_url, timeout=10, stream=True) as response:
+                if response.status_code == 200:
+                    content_type = response.headers.get('content-type', '')
+                    return content_type.startswith('image/')
                 
             return False
             
@@ -176,73 +635,34 @@ class AIAnalyzer:
             logger.warning(f"URL验证失败: {e}")
             return False
     
-    def _build_analysis_prompt(self) -> str:
-        """构建分析提示词"""
-        return """
-请仔细分析这张摄影姿势图片，按照以下JSON格式返回分析结果：
-
-{
-    "title": "简洁的标题",
-    "description": "详细的姿势描述",
-    "scene_category": "场景分类",
-    "angle": "拍摄角度", 
-    "tags": ["标签1", "标签2", "标签3"],
-    "props": ["道具1", "道具2"],
-    "shooting_tips": "拍摄建议和技巧",
-    "confidence": 0.95
-}
-
-**分析要求：**
-
-1. **title**: 3-8个字的简洁标题，如"森系少女写真"、"咖啡厅慵懒时光"
-
-2. **description**: 50-100字的详细描述，包括人物状态、动作、表情等
-
-3. **scene_category**: 必须从以下选项中选择一个：
-   - 室内、户外、咖啡厅、商场、学校、办公室、海边、森林、城市、其他
-
-4. **angle**: 必须从以下选项中选择一个：
-   - 正面、侧面、背面、俯视、仰视、斜角
-
-5. **tags**: 5-10个中文关键词，包括情绪、动作、风格、服装等
-
-6. **props**: 画面中的道具和物品
-
-7. **shooting_tips**: 实用的拍摄建议
-
-8. **confidence**: 分析结果的置信度(0.0-1.0)
-
-请确保返回的是有效的JSON格式。
-"""
+    def _build_batch_prompt(self, count: int) -> str:
+        """构建多张图片的分析提示词，结果按图片顺序放在 results 数组中"""
+        return _ANALYSIS_PROMPT.replace(
+            "请仔细分析这张摄影姿势图片，按照以下JSON格式返回分析结果：",
+            f"以下共有{count}张摄影姿势图片，请按图片顺序逐张分析，"
+            f"返回JSON对象 {{\"results\": [...]}}，results 为{count}个分析结果组成的数组，"
+            f"每个分析结果的格式如下：",
+            1
+        )
+    
+    def _validate_result(self, result: Dict) -> Optional[Dict]:
+        """验证必要字段并标准化，缺少字段时返回None"""
+        required_fields = ['title', 'description', 'scene_category', 'angle', 'tags']
+        for field in required_fields:
+            if field not in result:
+                logger.warning(f"缺少必要字段: {field}")
+                return None
+        
+        # 标准化字段
+        return self._normalize_result(result)
     
     def _parse_analysis_result(self, result_text: str) -> Optional[Dict]:
         """解析AI分析结果"""
         try:
-            # 提取JSON部分
-            if '```json' in result_text:
-                json_str = result_text.split('```json')[1].split('```')[0]
-            elif '```' in result_text:
-                json_str = result_text.split('```')[1]
-            else:
-                # 尝试直接解析
-                json_str = result_text
-            
-            # 清理和验证JSON
-            json_str = json_str.strip()
-            result = json.loads(json_str)
-            
-            # 验证必要字段
-            required_fields = ['title', 'description', 'scene_category', 'angle', 'tags']
-            for field in required_fields:
-                if field not in result:
-                    logger.warning(f"缺少必要字段: {field}")
-                    return None
+            # JSON模式下模型只返回JSON对象，无需剥离代码块
+            return self._validate_result(orjson.loads(result_text.encode()))
             
-            # 标准化字段
-            result = self._normalize_result(result)
-            return result
-            
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"JSON解析失败: {e}")
             logger.error(f"原始文本: {result_text[:500]}...")
             return None
@@ -252,49 +672,29 @@ class AIAnalyzer:
     
     def _normalize_result(self, result: Dict) -> Dict:
         """标准化分析结果"""
-        # 场景分类映射
-        scene_mapping = {
-            '室内': '室内', '家居': '室内', '工作室': '室内',
-            '户外': '户外', '公园': '户外', '街道': '户外',
-            '咖啡厅': '咖啡厅', '咖啡馆': '咖啡厅', '茶室': '咖啡厅',
-            '商场': '商场', '购物中心': '商场',
-            '学校': '学校', '校园': '学校', '教室': '学校',
-            '办公室': '办公室', '工作场所': '办公室',
-            '海边': '海边', '海滩': '海边',
-            '森林': '森林', '树林': '森林',
-            '城市': '城市', '都市': '城市'
-        }
-        
-        scene = result.get('scene_category', '其他')
-        result['scene_category'] = scene_mapping.get(scene, '其他')
-        
-        # 角度映射
-        angle_mapping = {
-            '正面': '正面', '正脸': '正面',
-            '侧面': '侧面', '侧身': '侧面',
-            '背面': '背面', '背影': '背面',
-            '俯视': '俯视', '俯拍': '俯视',
-            '仰视': '仰视', '仰拍': '仰视',
-            '斜角': '斜角', '倾斜': '斜角'
-        }
-        
-        angle = result.get('angle', '正面')
-        result['angle'] = angle_mapping.get(angle, '正面')
+        result['scene_category'] = SCENE_MAPPING.get(result.get('scene_category', '其他'), '其他')
+        result['angle'] = ANGLE_MAPPING.get(result.get('angle', '正面'), '正面')
         
         # 确保数组字段
         if isinstance(result.get('tags'), str):
-            result['tags'] = [tag.strip() for tag in result['tags'].split(',') if tag.strip()]
+            result['tags'] = [tag for tag in _TAG_SPLIT.split(result['tags'].strip()) if tag]
         
         if isinstance(result.get('props'), str):
-            result['props'] = [prop.strip() for prop in result['props'].split(',') if prop.strip()]
+            result['props'] = [prop for prop in _TAG_SPLIT.split(result['props'].strip()) if prop]
         
         # 设置默认值
         result.setdefault('props', [])
         result.setdefault('shooting_tips', '')
         result.setdefault('confidence', 0.8)
         
-        # 限制标签数量
+        # 限制标签数量（原地截断，不复制列表）
         if len(result.get('tags', [])) > 15:
-            result['tags'] = result['tags'][:15]
+            del result['tags'][15:]
         
-        return result
\ No newline at end of file
+        return result
+
+
+@functools.lru_cache(maxsize=1)
+def get_ai_analyzer() -> AIAnalyzer:
+    """进程内共享的分析器实例，各服务复用同一组 OpenAI 连接池"""
+    return AIAnalyzer()
@@ -1,23 +1,88 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import text, and_, or_
 from ..models.pose import Pose
 from ..models.tag import Tag, PoseTag
-from .ai_analyzer import AIAnalyzer
-import json
+from ..config import settings
+from .ai_analyzer import get_ai_analyzer, read_json_stream
+from ..utils.rate_limiter import openai_limiter, estimate_tokens
+from ..utils.ttl_cache import TTLCache
+import copy
 import logging
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# 意图分析结果按标准化查询缓存在进程内，过期后重新分析
+INTENT_CACHE_SIZE = 4096
+INTENT_CACHE_TTL = 3600
+_intent_cache = TTLCache(INTENT_CACHE_SIZE, INTENT_CACHE_TTL)
+
+# 全文索引预筛的候选数量，合并调用时一并交给AI排序
+CANDIDATE_LIMIT = 40
+
+# 相关度随候选一并返回，用于判断是否需要AI排序（同一 MATCH 表达式MySQL只计算一次）
+_CANDIDATE_STMT = text("""
+    SELECT id, MATCH(title, description, ai_tags) AGAINST(:query IN NATURAL LANGUAGE MODE) AS relevance
+    FROM poses
+    WHERE status = 'active'
+      AND MATCH(title, description, ai_tags) AGAINST(:query IN NATURAL LANGUAGE MODE)
+    ORDER BY relevance DESC
+    LIMIT :limit
+""")
+
+# 提示词中姿势列表每行的字段
+_POSE_INFO_FIELDS = "id|标题|场景|角度|标签|浏览量"
+
+# 搜索意图的JSON结构，意图分析和合并调用的提示词共用
+_INTENT_SCHEMA = """{
+    "intent_type": "specific_pose|scene_based|mood_based|style_based|mixed",
+    "scene_category": "室内|户外|咖啡厅|商场|学校|办公室|海边|森林|城市|其他|null",
+    "angle": "正面|侧面|背面|俯视|仰视|斜角|null", 
+    "mood_tags": ["情绪标签1", "情绪标签2"],
+    "pose_tags": ["姿势标签1", "姿势标签2"],
+    "style_tags": ["风格标签1", "风格标签2"],
+    "prop_tags": ["道具标签1", "道具标签2"],
+    "keywords": ["关键词1", "关键词2"],
+    "filters": {
+        "title_contains": ["标题包含词"],
+        "description_contains": ["描述包含词"]
+    },
+    "explanation": "搜索意图解释"
+}"""
+
 class AIDatabaseSearchService:
     """AI数据库搜索服务"""
     
     def __init__(self):
-        self.ai_analyzer = AIAnalyzer()
+        self.ai_analyzer = get_ai_analyzer()
     
     def ai_search_database(self, db: Session, user_query: str) -> Dict:
         """使用AI理解用户查询，生成精确的数据库查询"""
         try:
+            # 全文索引取候选后，一次AI调用同时完成意图分析和排序
+            candidates, top_relevance = self._fetch_candidates(db, user_query)
+            # 候选很少时AI排序意义不大，直接采用全文相关度顺序，省去AI调用
+            if candidates and len(candidates) <= settings.min_ai_rank_size:
+                return self._fulltext_result(user_query, candidates, "候选较少，按全文相关度排序")
+            # 全文相关度足够高时同样直接采用数据库排序
+            if candidates and top_relevance >= settings.fulltext_rank_threshold:
+                return self._fulltext_result(user_query, candidates, "全文相关度较高，按全文相关度排序")
+            if candidates:
+                combined = self._analyze_and_rank(user_query, candidates)
+                if combined is not None:
+                    search_intent = combined["intent"]
+                    ranked_poses = self._apply_ranking(candidates, combined)
+                    return {
+                        "poses": ranked_poses,
+                        "total": len(ranked_poses),
+                        "search_intent": search_intent,
+                        "sql_conditions": None,
+                        "ai_explanation": search_intent.get("explanation", "")
+                    }
+            
+            # 没有候选或合并调用失败时，分两次调用：意图分析 → 条件查询 → AI排序
             # 第一步：分析用户查询意图
             search_intent = self._analyze_search_intent(user_query)
             
@@ -25,10 +90,13 @@ class AIDatabaseSearchService:
             sql_conditions = self._generate_sql_conditions(search_intent)
             
             # 第三步：执行搜索
-            poses = self._execute_smart_search(db, sql_conditions)
+            poses, top_relevance = self._execute_smart_search(db, sql_conditions)
             
-            # 第四步：AI相关性排序
-            ranked_poses = self._ai_relevance_ranking(poses, user_query, search_intent)
+            # 第四步：全文相关度足够高时直接采用数据库排序，否则进行AI相关性排序
+            if top_relevance >= settings.fulltext_rank_threshold:
+                ranked_poses = [self._pose_to_dict(pose, "全文相关度排序") for pose in poses]
+            else:
+                ranked_poses = self._ai_relevance_ranking(poses, user_query, search_intent)
             
             return {
                 "poses": ranked_poses,
@@ -45,27 +113,31 @@ class AIDatabaseSearchService:
     
     def _analyze_search_intent(self, user_query: str) -> Dict:
         """分析用户搜索意图"""
+        key = user_query.strip().lower()
+        try:
+            intent = _intent_cache.get(key)
+            if intent is None:
+                intent = self._request_search_intent(user_query)
+                _intent_cache.set(key, intent)
+            # 缓存中的结果为共享对象，返回副本
+            return copy.deepcopy(intent)
+        except Exception as e:
+            logger.error(f"意图分析失败: {e}")
+            return {
+                "intent_type": "fallback",
+                "keywords": [user_query],
+                "explanation": "AI分析失败，使用关键词搜索"
+            }
+    
+    def _request_search_intent(self, user_query: str) -> Dict:
+        """调用AI分析搜索意图，失败时抛出异常（不缓存）"""
         prompt = f"""
 分析以下摄影姿势搜索查询，提取搜索意图和条件：
 
 用户查询："{user_query}"
 
 请以JSON格式返回分析结果：
-{{
-    "intent_type": "specific_pose|scene_based|mood_based|style_based|mixed",
-    "scene_category": "室内|户外|咖啡厅|商场|学校|办公室|海边|森林|城市|其他|null",
-    "angle": "正面|侧面|背面|俯视|仰视|斜角|null", 
-    "mood_tags": ["情绪标签1", "情绪标签2"],
-    "pose_tags": ["姿势标签1", "姿势标签2"],
-    "style_tags": ["风格标签1", "风格标签2"],
-    "prop_tags": ["道具标签1", "道具标签2"],
-    "keywords": ["关键词1", "关键词2"],
-    "filters": {{
-        "title_contains": ["标题包含词"],
-        "description_contains": ["描述包含词"]
-    }},
-    "explanation": "搜索意图解释"
-}}
+{_INTENT_SCHEMA}
 
 分析说明：
 1. 识别查询类型（具体姿势、场景、情绪、风格等）
@@ -77,57 +149,132 @@ class AIDatabaseSearchService:
 - "咖啡厅拍照姿势" → scene_category: "咖啡厅", pose_tags: ["拍照", "坐姿"]
 - "俏皮可爱的女生" → mood_tags: ["俏皮", "可爱"], keywords: ["女生"]
 - "侧面站立写真" → angle: "侧面", pose_tags: ["站立", "写真"]
+"""
+        
+        openai_limiter.acquire_sync(estimate_tokens(prompt, settings.openai_intent_max_tokens))
+        response = self.ai_analyzer.client.chat.completions.create(
+            model="gpt-4.1-2025-04-14",
+            messages=[
+                {"role": "system", "content": "你是专业的摄影搜索分析师，精通数据库查询优化。"},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=settings.openai_intent_max_tokens,
+            temperature=0.2,
+            response_format={"type": "json_object"},
+            stream=True
+        )
+        
+        # 流式读取，JSON对象闭合即可解析
+        result_text = read_json_stream(response)
+        return self._parse_intent_result(result_text)
+    
+    def _parse_intent_result(self, result_text: str) -> Dict:
+        """解析AI意图分析结果，无法解析时抛出异常"""
+        return self._clean_intent(orjson.loads(result_text))
+    
+    def _clean_intent(self, result: Dict) -> Dict:
+        """清理意图结果中的空值"""
+        for key, value in result.items():
+            if value == "null" or value == "None":
+                result[key] = None
+            elif isinstance(value, list):
+                result[key] = [v for v in value if v and v != "null"]
+        
+        return result
+    
+    def _fulltext_result(self, user_query: str, candidates: List[Pose], explanation: str) -> Dict:
+        """不调用AI，按全文索引返回的顺序输出候选；已缓存的意图分析结果照常返回"""
+        cached = _intent_cache.get(user_query.strip().lower())
+        if cached is not None:
+            search_intent = copy.deepcopy(cached)
+        else:
+            search_intent = {"intent_type": "fulltext", "keywords": [user_query], "explanation": explanation}
+        ranked_poses = [self._pose_to_dict(pose, "全文相关度排序") for pose in candidates]
+        return {
+            "poses": ranked_poses,
+            "total": len(ranked_poses),
+            "search_intent": search_intent,
+            "sql_conditions": None,
+            "ai_explanation": search_intent.get("explanation", "")
+        }
+    
+    def _fetch_candidates(self, db: Session, user_query: str) -> Tuple[List[Pose], float]:
+        """用全文索引按相关度取出候选姿势，返回候选和最高的全文相关度"""
+        try:
+            rows = db.execute(_CANDIDATE_STMT, {"query": user_query, "limit": CANDIDATE_LIMIT}).fetchall()
+        except Exception as e:
+            logger.error(f"全文预筛失败: {e}")
+            return [], 0.0
+        top_relevance = float(rows[0].relevance or 0.0) if rows else 0.0
+        return self._load_poses(db, [row.id for row in rows]), top_relevance
+    
+    def _load_poses(self, db: Session, ids: List[int]) -> List[Pose]:
+        """一次查询加载全部Pose对象，并保持 ids 的顺序"""
+        if not ids:
+            return []
+        poses_by_id = {pose.id: pose for pose in db.query(Pose).filter(Pose.id.in_(ids)).all()}
+        return [poses_by_id[i] for i in ids if i in poses_by_id]
+    
+    def _pose_info(self, poses: List[Pose]) -> str:
+        """提示词中的姿势列表：每行一个，字段以 | 分隔，比JSON少用大量令牌"""
+        def field(value) -> str:
+            return str(value or "").replace("|", "/").replace("\n", " ")
+        
+        return "\n".join(
+            f"{pose.id}|{field(pose.title)}|{field(pose.scene_category)}|{field(pose.angle)}"
+            f"|{field(pose.ai_tags)}|{pose.view_count or 0}"
+            for pose in poses
+        )
+    
+    def _analyze_and_rank(self, user_query: str, candidates: List[Pose]) -> Optional[Dict]:
+        """一次调用完成意图分析和候选排序，返回 {intent, ranked_ids, explanations}，失败返回None"""
+        prompt = f"""
+分析以下摄影姿势搜索查询的意图，并对候选姿势按相关性排序：
+
+用户查询："{user_query}"
+
+候选姿势（每行一个，字段：{_POSE_INFO_FIELDS}）：
+{self._pose_info(candidates)}
+
+请以JSON格式返回：
+{{
+    "intent": {_INTENT_SCHEMA},
+    "ranked_ids": [1, 3, 2, ...],
+    "explanations": {{
+        "1": "最相关原因",
+        "3": "次相关原因"
+    }}
+}}
+
+说明：
+1. intent 识别查询类型（具体姿势、场景、情绪、风格等）并提取场景、角度和分类标签
+2. ranked_ids 只包含与查询相关的候选ID，按相关性从高到低排列
+3. 排序依据：与查询意图的匹配度、标题、场景和角度、标签、流行度（浏览量）
 """
         
         try:
+            max_tokens = settings.openai_intent_max_tokens + self._rank_max_tokens(len(candidates))
+            openai_limiter.acquire_sync(estimate_tokens(prompt, max_tokens))
             response = self.ai_analyzer.client.chat.completions.create(
                 model="gpt-4.1-2025-04-14",
                 messages=[
-                    {"role": "system", "content": "你是专业的摄影搜索分析师，精通数据库查询优化。"},
+                    {"role": "system", "content": "你是专业的摄影搜索分析师，同时负责搜索结果的相关性排序。"},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=800,
-                temperature=0.2
+                max_tokens=max_tokens,
+                temperature=0.1,
+                response_format={"type": "json_object"}
             )
             
-            result_text = response.choices[0].message.content
-            return self._parse_intent_result(result_text)
-            
-        except Exception as e:
-            logger.error(f"意图分析失败: {e}")
-            return {
-                "intent_type": "mixed",
-                "keywords": [user_query],
-                "explanation": "AI分析失败，使用关键词搜索"
-            }
-    
-    def _parse_intent_result(self, result_text: str) -> Dict:
-        """解析AI意图分析结果"""
-        try:
-            # 提取JSON
-            if "```json" in result_text:
-                json_start = result_text.find("```json") + 7
-                json_end = result_text.find("```", json_start)
-                result_text = result_text[json_start:json_end].strip()
-            elif "```" in result_text:
-                json_start = result_text.find("```") + 3
-                json_end = result_text.rfind("```")
-                result_text = result_text[json_start:json_end].strip()
-            
-            result = json.loads(result_text)
-            
-            # 清理空值
-            for key, value in result.items():
-                if value == "null" or value == "None":
-                    result[key] = None
-                elif isinstance(value, list):
-                    result[key] = [v for v in value if v and v != "null"]
-            
+            result = orjson.loads(response.choices[0].message.content)
+            if not isinstance(result.get("intent"), dict) or not isinstance(result.get("ranked_ids"), list):
+                raise ValueError("缺少 intent 或 ranked_ids")
+            result["intent"] = self._clean_intent(result["intent"])
             return result
             
         except Exception as e:
-            logger.error(f"解析意图结果失败: {e}")
-            return {"intent_type": "mixed", "keywords": ["搜索"]}
+            logger.error(f"合并意图分析和排序失败，改为分步调用: {e}")
+            return None
     
     def _generate_sql_conditions(self, search_intent: Dict) -> Dict:
         """根据搜索意图生成SQL查询条件"""
@@ -135,26 +282,26 @@ class AIDatabaseSearchService:
             "where_clauses": [],
             "join_clauses": [],
             "having_clauses": [],
-            "order_by": []
+            "order_by": [],
+            # 条件中的取值一律通过绑定参数传入，SQL文本只随条件结构变化
+            "params": {}
         }
+        params = conditions["params"]
         
         # 基础条件
         conditions["where_clauses"].append("p.status = 'active'")
         
         # 场景分类条件
         if search_intent.get("scene_category"):
-            conditions["where_clauses"].append(
-                f"p.scene_category = '{search_intent['scene_category']}'"
-            )
+            conditions["where_clauses"].append("p.scene_category = :scene_category")
+            params["scene_category"] = search_intent["scene_category"]
         
         # 角度条件
         if search_intent.get("angle"):
-            conditions["where_clauses"].append(
-                f"p.angle = '{search_intent['angle']}'"
-            )
+            conditions["where_clauses"].append("p.angle = :angle")
+            params["angle"] = search_intent["angle"]
         
         # 标签条件
-        tag_conditions = []
         all_tags = (
             search_intent.get("mood_tags", []) + 
             search_intent.get("pose_tags", []) + 
@@ -173,13 +320,13 @@ class AIDatabaseSearchService:
             
             # 标签匹配条件
             tag_like_conditions = []
-            for tag in all_tags:
-                tag_like_conditions.append(f"t.name LIKE '%{tag}%'")
+            for i, tag in enumerate(all_tags):
+                tag_like_conditions.append(f"t.name LIKE :tag_{i}")
+                params[f"tag_{i}"] = f"%{tag}%"
             
-            if tag_like_conditions:
-                conditions["where_clauses"].append(
-                    f"({' OR '.join(tag_like_conditions)})"
-                )
+            conditions["where_clauses"].append(
+                f"({' OR '.join(tag_like_conditions)})"
+            )
         
         # 关键词条件（全文搜索）
         keywords = search_intent.get("keywords", [])
@@ -190,32 +337,41 @@ class AIDatabaseSearchService:
         
         if fulltext_terms:
             fulltext_conditions = []
-            for term in fulltext_terms:
+            for i, term in enumerate(fulltext_terms):
                 fulltext_conditions.extend([
-                    f"MATCH(p.title, p.description, p.ai_tags) AGAINST('{term}' IN NATURAL LANGUAGE MODE)",
-                    f"p.title LIKE '%{term}%'",
-                    f"p.description LIKE '%{term}%'",
-                    f"p.ai_tags LIKE '%{term}%'"
+                    f"MATCH(p.title, p.description, p.ai_tags) AGAINST(:term_{i} IN NATURAL LANGUAGE MODE)",
+                    f"p.title LIKE :term_like_{i}",
+                    f"p.description LIKE :term_like_{i}",
+                    f"p.ai_tags LIKE :term_like_{i}"
                 ])
+                params[f"term_{i}"] = term
+                params[f"term_like_{i}"] = f"%{term}%"
             
-            if fulltext_conditions:
-                conditions["where_clauses"].append(
-                    f"({' OR '.join(fulltext_conditions)})"
-                )
+            conditions["where_clauses"].append(
+                f"({' OR '.join(fulltext_conditions)})"
+            )
         
         # 排序：相关性 + 浏览量 + 时间
         conditions["order_by"] = [
             "p.view_count DESC",
             "p.created_at DESC"
         ]
+        if fulltext_terms:
+            # 全文相关度作为首要排序，并随结果返回供判断是否还需要AI排序
+            conditions["relevance"] = "MATCH(p.title, p.description, p.ai_tags) AGAINST(:ft_query IN NATURAL LANGUAGE MODE)"
+            params["ft_query"] = " ".join(fulltext_terms)
+            conditions["order_by"].insert(0, "relevance DESC")
         
         return conditions
     
-    def _execute_smart_search(self, db: Session, sql_conditions: Dict) -> List[Pose]:
-        """执行智能搜索"""
+    def _execute_smart_search(self, db: Session, sql_conditions: Dict) -> Tuple[List[Pose], float]:
+        """执行智能搜索，返回按排序排列的姿势和最高的全文相关度（无全文条件时为0）"""
         try:
             # 构建基础查询
-            base_select = "SELECT DISTINCT p.*"
+            # 只取ID，完整记录随后一次性加载
+            base_select = "SELECT DISTINCT p.id, p.view_count, p.created_at"
+            if sql_conditions.get("relevance"):
+                base_select += f", {sql_conditions['relevance']} AS relevance"
             base_from = "FROM poses p"
             
             # 添加JOIN
@@ -247,53 +403,38 @@ class AIDatabaseSearchService:
             logger.info(f"执行AI生成的SQL查询: {sql_query}")
             
             # 执行查询
-            result = db.execute(text(sql_query))
+            result = db.execute(text(sql_query), sql_conditions.get("params", {}))
             pose_data = result.fetchall()
             
-            # 转换为Pose对象
-            poses = []
-            for row in pose_data:
-                pose = db.query(Pose).filter(Pose.id == row.id).first()
-                if pose:
-                    poses.append(pose)
-            
-            return poses
+            # 按相关度降序排列，第一行即最高相关度
+            top_relevance = 0.0
+            if sql_conditions.get("relevance") and pose_data:
+                top_relevance = float(pose_data[0].relevance or 0.0)
+            return self._load_poses(db, [row.id for row in pose_data]), top_relevance
             
         except Exception as e:
             logger.error(f"执行智能搜索失败: {e}")
             # 回退到简单查询
-            return db.query(Pose).filter(Pose.status == 'active').limit(20).all()
+            return db.query(Pose).filter(Pose.status == 'active').limit(20).all(), 0.0
     
     def _ai_relevance_ranking(self, poses: List[Pose], user_query: str, search_intent: Dict) -> List[Dict]:
         """使用AI对搜索结果进行相关性排序"""
+        # 结果很少或意图分析失败时，AI排序意义不大，保留数据库排序（浏览量、时间）
+        if len(poses) <= settings.min_ai_rank_size or search_intent.get("intent_type") == "fallback":
+            return [self._pose_to_dict(pose, "默认排序") for pose in poses]
+        
         try:
-            if not poses:
-                return []
-            
-            # 准备姿势信息用于AI排序
-            pose_info = []
-            for pose in poses[:20]:  # 限制数量以控制AI调用成本
-                pose_info.append({
-                    "id": pose.id,
-                    "title": pose.title or "",
-                    "description": pose.description or "",
-                    "scene_category": pose.scene_category or "",
-                    "angle": pose.angle or "",
-                    "ai_tags": pose.ai_tags or "",
-                    "view_count": pose.view_count
-                })
-            
-            # AI相关性评分
+            # AI相关性评分，最多取前20个以控制AI调用成本
             ranking_prompt = f"""
 根据用户查询对以下摄影姿势进行相关性排序：
 
 用户查询："{user_query}"
 搜索意图：{search_intent.get('explanation', '')}
 
-姿势列表：
-{json.dumps(pose_info, ensure_ascii=False, indent=2)}
+姿势列表（每行一个，字段：{_POSE_INFO_FIELDS}）：
+{self._pose_info(poses[:20])}
 
-请返回按相关性排序的姿势ID列表：
+请以JSON格式返回按相关性排序的姿势ID列表：
 {{
     "ranked_ids": [1, 3, 2, ...],
     "explanations": {{
@@ -304,96 +445,76 @@ class AIDatabaseSearchService:
 
 排序规则：
 1. 与查询意图的匹配度
-2. 标题和描述的相关性
+2. 标题的相关性
 3. 场景和角度的匹配
 4. 标签的相关性
 5. 流行度（浏览量）
 """
             
+            max_tokens = self._rank_max_tokens(min(len(poses), 20))
+            openai_limiter.acquire_sync(estimate_tokens(ranking_prompt, max_tokens))
             response = self.ai_analyzer.client.chat.completions.create(
-                model="gpt-4.1-2025-04-14",
+                model=settings.openai_rank_model,
                 messages=[
                     {"role": "system", "content": "你是专业的搜索相关性分析师。"},
                     {"role": "user", "content": ranking_prompt}
                 ],
-                max_tokens=1000,
-                temperature=0.1
+                max_tokens=max_tokens,
+                temperature=0.1,
+                response_format={"type": "json_object"}
             )
             
             result_text = response.choices[0].message.content
             ranking_result = self._parse_ranking_result(result_text)
             
-            # 根据AI排序重新排列结果
-            ranked_poses = []
-            pose_dict = {pose.id: pose for pose in poses}
-            
-            for pose_id in ranking_result.get("ranked_ids", []):
-                if pose_id in pose_dict:
-                    pose = pose_dict[pose_id]
-                    ranked_poses.append({
-                        "id": pose.id,
-                        "oss_url": pose.oss_url,
-                        "thumbnail_url": pose.thumbnail_url,
-                        "title": pose.title,
-                        "description": pose.description,
-                        "scene_category": pose.scene_category,
-                        "angle": pose.angle,
-                        "view_count": pose.view_count,
-                        "created_at": pose.created_at.isoformat() if pose.created_at else None,
-                        "ai_relevance_explanation": ranking_result.get("explanations", {}).get(str(pose_id), "")
-                    })
-            
-            # 添加未被AI排序的结果
-            ranked_ids = set(ranking_result.get("ranked_ids", []))
-            for pose in poses:
-                if pose.id not in ranked_ids:
-                    ranked_poses.append({
-                        "id": pose.id,
-                        "oss_url": pose.oss_url,
-                        "thumbnail_url": pose.thumbnail_url,
-                        "title": pose.title,
-                        "description": pose.description,
-                        "scene_category": pose.scene_category,
-                        "angle": pose.angle,
-                        "view_count": pose.view_count,
-                        "created_at": pose.created_at.isoformat() if pose.created_at else None,
-                        "ai_relevance_explanation": "标准匹配"
-                    })
-            
-            return ranked_poses
+            return self._apply_ranking(poses, ranking_result)
             
         except Exception as e:
             logger.error(f"AI相关性排序失败: {e}")
             # 回退到原始结果
-            return [
-                {
-                    "id": pose.id,
-                    "oss_url": pose.oss_url,
-                    "thumbnail_url": pose.thumbnail_url,
-                    "title": pose.title,
-                    "description": pose.description,
-                    "scene_category": pose.scene_category,
-                    "angle": pose.angle,
-                    "view_count": pose.view_count,
-                    "created_at": pose.created_at.isoformat() if pose.created_at else None,
-                    "ai_relevance_explanation": "默认排序"
-                } for pose in poses
-            ]
+            return [self._pose_to_dict(pose, "默认排序") for pose in poses]
+    
+    @staticmethod
+    def _rank_max_tokens(count: int) -> int:
+        """排序结果（ID列表和说明）的输出令牌预算，最多1000"""
+        return min(settings.openai_rank_tokens_per_item * count + 200, 1000)
+    
+    def _apply_ranking(self, poses: List[Pose], ranking_result: Dict) -> List[Dict]:
+        """根据AI排序重新排列结果，未被排序的结果追加在后面"""
+        ranked_poses = []
+        pose_dict = {pose.id: pose for pose in poses}
+        explanations = ranking_result.get("explanations", {})
+        
+        for pose_id in ranking_result.get("ranked_ids", []):
+            if pose_id in pose_dict:
+                ranked_poses.append(self._pose_to_dict(pose_dict.pop(pose_id), explanations.get(str(pose_id), "")))
+        
+        # 添加未被AI排序的结果
+        for pose in poses:
+            if pose.id in pose_dict:
+                ranked_poses.append(self._pose_to_dict(pose, "标准匹配"))
+        
+        return ranked_poses
+    
+    def _pose_to_dict(self, pose: Pose, explanation: str) -> Dict:
+        """搜索结果中单个姿势的返回格式"""
+        return {
+            "id": pose.id,
+            "oss_url": pose.oss_url,
+            "thumbnail_url": pose.thumbnail_url,
+            "title": pose.title,
+            "description": pose.description,
+            "scene_category": pose.scene_category,
+            "angle": pose.angle,
+            "view_count": pose.view_count,
+            "created_at": pose.created_at.isoformat() if pose.created_at else None,
+            "ai_relevance_explanation": explanation
+        }
     
     def _parse_ranking_result(self, result_text: str) -> Dict:
         """解析AI排序结果"""
         try:
-            if "```json" in result_text:
-                json_start = result_text.find("```json") + 7
-                json_end = result_text.find("```", json_start)
-                result_text = result_text[json_start:json_end].strip()
-            elif "```" in result_text:
-                json_start = result_text.find("```") + 3
-                json_end = result_text.rfind("```")
-                result_text = result_text[json_start:json_end].strip()
-            
-            result = json.loads(result_text)
-            return result
+            return orjson.loads(result_text)
             
         except Exception as e:
             logger.error(f"解析排序结果失败: {e}")
@@ -413,18 +534,7 @@ class AIDatabaseSearchService:
         
         return {
             "poses": [
-                {
-                    "id": pose.id,
-                    "oss_url": pose.oss_url,
-                    "thumbnail_url": pose.thumbnail_url,
-                    "title": pose.title,
-                    "description": pose.description,
-                    "scene_category": pose.scene_category,
-                    "angle": pose.angle,
-                    "view_count": pose.view_count,
-                    "created_at": pose.created_at.isoformat() if pose.created_at else None,
-                    "ai_relevance_explanation": "关键词匹配"
-                } for pose in poses
+                self._pose_to_dict(pose, "关键词匹配") for pose in poses
             ],
             "total": len(poses),
             "search_intent": {"intent_type": "fallback"},
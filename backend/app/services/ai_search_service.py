@@ -1,56 +1,36 @@
 from typing import Dict, List, Optional
 from ..config import settings
-from .ai_analyzer import AIAnalyzer
-import json
+from .ai_analyzer import get_ai_analyzer, read_json_stream
+from ..utils.rate_limiter import openai_limiter, estimate_tokens
+from ..utils.redis_client import get_raw_redis
+from ..utils.ttl_cache import TTLCache
+import copy
+import hashlib
 import logging
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
-class AISearchService:
-    """AI搜索服务"""
-    
-    def __init__(self):
-        self.ai_analyzer = AIAnalyzer()
-    
-    def optimize_search_query(self, user_query: str) -> Dict:
-        """使用AI优化搜索查询"""
-        try:
-            prompt = self._build_search_optimization_prompt(user_query)
-            
-            response = self.ai_analyzer.client.chat.completions.create(
-                model="gpt-4.1-2025-04-14",  # 使用更快的模型进行搜索优化
-                messages=[
-                    {"role": "system", "content": "你是一个专业的摄影姿势搜索助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.3
-            )
-            
-            result_text = response.choices[0].message.content
-            return self._parse_optimization_result(result_text, user_query)
-            
-        except Exception as e:
-            logger.error(f"AI搜索优化失败: {e}")
-            return {
-                "optimized_query": user_query,
-                "expanded_queries": [user_query],
-                "suggestions": [],
-                "explanation": "AI搜索暂时不可用，使用原始查询"
-            }
-    
-    def _build_search_optimization_prompt(self, user_query: str) -> str:
-        """构建搜索优化提示词"""
-        return f"""
-请分析并优化以下摄影姿势搜索查询："{user_query}"
+# 查询优化结果在Redis中的缓存时间（秒），进程重启后仍可复用
+OPTIMIZATION_CACHE_TTL = 7 * 86400
+# 进程内缓存，热门查询无需访问Redis
+OPTIMIZATION_LOCAL_CACHE_SIZE = 4096
+OPTIMIZATION_LOCAL_CACHE_TTL = 3600
+_optimization_cache = TTLCache(OPTIMIZATION_LOCAL_CACHE_SIZE, OPTIMIZATION_LOCAL_CACHE_TTL)
+
+# 搜索优化提示词，查询词拼接在前后两段之间
+_OPTIMIZATION_PROMPT_PREFIX = '''
+请分析并优化以下摄影姿势搜索查询："'''
+_OPTIMIZATION_PROMPT_SUFFIX = '''"
 
 请以JSON格式返回优化建议：
-{{
+{
     "optimized_query": "优化后的主要搜索词",
     "expanded_queries": ["相关搜索词1", "相关搜索词2", "相关搜索词3"],
     "suggestions": ["建议词1", "建议词2", "建议词3"],
     "explanation": "优化说明"
-}}
+}
 
 优化规则：
 1. 理解用户意图：是想要特定姿势、场景、风格还是情绪表达？
@@ -64,40 +44,87 @@ class AISearchService:
 - "咖啡厅" → "咖啡厅拍照", ["室内拍摄", "文艺范", "日系风格"]
 
 请确保返回有效的JSON格式。
-"""
+'''
+
+class AISearchService:
+    """AI搜索服务"""
     
-    def _parse_optimization_result(self, result_text: str, original_query: str) -> Dict:
-        """解析AI优化结果"""
+    def __init__(self):
+        self.ai_analyzer = get_ai_analyzer()
+    
+    def optimize_search_query(self, user_query: str) -> Dict:
+        """使用AI优化搜索查询"""
+        key = user_query.strip().lower()
         try:
-            # 尝试解析JSON
-            if "```json" in result_text:
-                json_start = result_text.find("```json") + 7
-                json_end = result_text.find("```", json_start)
-                result_text = result_text[json_start:json_end].strip()
-            elif "```" in result_text:
-                json_start = result_text.find("```") + 3
-                json_end = result_text.rfind("```")
-                result_text = result_text[json_start:json_end].strip()
-            
-            result = json.loads(result_text)
-            
-            # 验证必要字段
-            if not result.get("optimized_query"):
-                result["optimized_query"] = original_query
-            
-            if not result.get("expanded_queries"):
-                result["expanded_queries"] = [result["optimized_query"]]
-            
-            if not result.get("suggestions"):
-                result["suggestions"] = []
-                
-            return result
-            
+            result = _optimization_cache.get(key)
+            if result is None:
+                result = self._request_optimization(user_query, key)
+                _optimization_cache.set(key, result)
+            # 缓存中的结果为共享对象，返回副本
+            return copy.deepcopy(result)
         except Exception as e:
-            logger.error(f"解析AI优化结果失败: {e}")
+            logger.error(f"AI搜索优化失败: {e}")
             return {
-                "optimized_query": original_query,
-                "expanded_queries": [original_query],
+                "optimized_query": user_query,
+                "expanded_queries": [user_query],
                 "suggestions": [],
-                "explanation": "AI解析失败，使用原始查询"
-            }
\ No newline at end of file
+                "explanation": "AI搜索暂时不可用，使用原始查询"
+            }
+    
+    def _request_optimization(self, user_query: str, key: str) -> Dict:
+        """调用AI优化查询；结果按标准化查询 key 缓存在Redis中，失败时抛出异常（不缓存）"""
+        client = get_raw_redis()
+        cache_key = "ai:opt:" + hashlib.sha1(key.encode("utf-8")).hexdigest()
+        if client is not None:
+            try:
+                cached = client.get(cache_key)
+                if cached:
+                    return orjson.loads(cached)
+            except Exception as e:
+                logger.warning(f"读取搜索优化缓存失败: {e}")
+        
+        prompt = self._build_search_optimization_prompt(user_query)
+        
+        openai_limiter.acquire_sync(estimate_tokens(prompt, settings.openai_optimize_max_tokens))
+        response = self.ai_analyzer.client.chat.completions.create(
+            model=settings.openai_rank_model,  # 使用更快的模型进行搜索优化
+            messages=[
+                {"role": "system", "content": "你是一个专业的摄影姿势搜索助手。"},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=settings.openai_optimize_max_tokens,
+            temperature=0.3,
+            response_format={"type": "json_object"},
+            stream=True
+        )
+        
+        # 流式读取，JSON对象闭合即可解析
+        result_text = read_json_stream(response)
+        result = self._parse_optimization_result(result_text, user_query)
+        
+        if client is not None:
+            try:
+                client.set(cache_key, orjson.dumps(result), ex=OPTIMIZATION_CACHE_TTL)
+            except Exception as e:
+                logger.warning(f"写入搜索优化缓存失败: {e}")
+        return result
+    
+    def _build_search_optimization_prompt(self, user_query: str) -> str:
+        """构建搜索优化提示词"""
+        return _OPTIMIZATION_PROMPT_PREFIX + user_query + _OPTIMIZATION_PROMPT_SUFFIX
+    
+    def _parse_optimization_result(self, result_text: str, original_query: str) -> Dict:
+        """解析AI优化结果，无法解析时抛出异常"""
+        result = orjson.loads(result_text)
+        
+        # 验证必要字段
+        if not result.get("optimized_query"):
+            result["optimized_query"] = original_query
+        
+        if not result.get("expanded_queries"):
+            result["expanded_queries"] = [result["optimized_query"]]
+        
+        if not result.get("suggestions"):
+            result["suggestions"] = []
+            
+        return result
\ No newline at end of file
@@ -0,0 +1,53 @@
+import logging
+import os
+import threading
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# 交叉编码器重排序（默认关闭），开启后替代启发式重排序对前N个结果打分
+ENABLE_CE_RERANK = os.getenv("ENABLE_CE_RERANK", "0") == "1"
+CE_RERANK_MODEL = os.getenv("CE_RERANK_MODEL", "BAAI/bge-reranker-v2-m3")
+CE_RERANK_TOP_N = int(os.getenv("CE_RERANK_TOP_N", "50"))
+CE_MAX_LENGTH = 128
+
+_model = None
+_load_failed = False
+_load_lock = threading.Lock()
+
+
+def get_cross_encoder():
+    """懒加载交叉编码器模型，加载失败后不再重试"""
+    global _model, _load_failed
+    if _model is not None or _load_failed:
+        return _model
+
+    with _load_lock:
+        if _model is None and not _load_failed:
+            try:
+                from sentence_transformers import CrossEncoder
+                _model = CrossEncoder(CE_RERANK_MODEL, max_length=CE_MAX_LENGTH)
+                logger.info(f"交叉编码器加载成功: {CE_RERANK_MODEL}")
+            except Exception as e:
+                _load_failed = True
+                logger.warning(f"交叉编码器加载失败，使用启发式重排序: {e}")
+    return _model
+
+
+def cross_encoder_rerank(query: str, poses: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    """用交叉编码器对前N个结果重排序，其余结果保持原顺序；模型不可用时返回None"""
+    model = get_cross_encoder()
+    if model is None:
+        return None
+
+    head = poses[:CE_RERANK_TOP_N]
+    pairs = [(query, f"{p.get('title') or ''} {p.get('ai_tags') or ''}") for p in head]
+
+    try:
+        logits = model.predict(pairs, show_progress_bar=False)
+    except Exception as e:
+        logger.warning(f"交叉编码器打分失败: {e}")
+        return None
+
+    order = sorted(range(len(head)), key=lambda i: logits[i], reverse=True)
+    return [head[i] for i in order] + poses[CE_RERANK_TOP_N:]
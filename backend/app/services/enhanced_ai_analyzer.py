@@ -4,13 +4,79 @@ import re
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from ..utils.keyword_matcher import KeywordMatcher
+from ..utils.ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
+# 查询分析结果缓存：成功结果缓存1小时，失败结果缓存60秒避免反复重试
+ANALYSIS_CACHE_SIZE = 10_000
+ANALYSIS_CACHE_TTL = 3600
+ANALYSIS_NEGATIVE_TTL = 60
+
+# 增强版图片分析提示词（针对向量搜索优化）
+_ENHANCED_ANALYSIS_PROMPT = """
+你是一个专业的摄影作品分析专家。请仔细分析这张图片，重点关注以下几个方面来生成高质量的标签和描述，以便用户能够准确搜索到相关内容。
+
+请按照以下JSON格式返回分析结果：
+
+{
+    "title": "简洁的标题",
+    "description": "详细的姿势描述",
+    "scene_category": "场景分类",
+    "angle": "拍摄角度",
+    "primary_tags": ["核心标签1", "核心标签2"],
+    "semantic_tags": ["语义标签1", "语义标签2"],
+    "style_tags": ["风格标签1", "风格标签2"],
+    "emotion_tags": ["情感标签1", "情感标签2"],
+    "clothing_tags": ["服装标签1", "服装标签2"],
+    "props": ["道具1", "道具2"],
+    "color_scheme": ["主色调1", "主色调2"],
+    "lighting": "光线描述",
+    "composition": "构图描述",
+    "shooting_tips": "拍摄建议",
+    "search_keywords": ["搜索关键词1", "搜索关键词2"],
+    "confidence": 0.95
+}
+
+**详细分析要求：**
+
+1. **title**: 3-8个字，突出最显著特征
+
+2. **description**: 80-150字，包含：
+   - 人物状态和动作
+   - 环境和背景
+   - 整体氛围感受
+
+3. **分层标签系统**：
+   - **primary_tags**: 3-5个核心标签，最重要的特征
+   - **semantic_tags**: 5-8个语义标签，描述场景含义
+   - **style_tags**: 3-5个风格标签（日系、韩系、欧美、复古等）
+   - **emotion_tags**: 2-4个情感标签（温柔、活泼、忧郁、俏皮等）
+   - **clothing_tags**: 3-6个服装标签（具体服装类型、颜色、风格）
+
+4. **视觉元素**：
+   - **color_scheme**: 主要颜色调性
+   - **lighting**: 光线类型和效果
+   - **composition**: 构图特点
+
+5. **search_keywords**: 10-15个用户可能搜索的关键词，包括：
+   - 同义词和近义词
+   - 通俗表达
+   - 专业术语
+   - 相关概念
+
+6. **场景和角度**：严格按照预设选项选择
+
+重点：生成的标签要考虑中文用户的搜索习惯，包含多种表达方式。
+"""
+
 class EnhancedAIAnalyzer:
     """增强版AI分析器 - 用于查询分析和内容理解"""
     
     def __init__(self):
         self.available = True
+        self._analysis_cache = TTLCache(ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_TTL)
         self.scene_keywords = {
             "室内": ["室内", "房间", "卧室", "客厅", "书房", "办公室", "家里"],
             "咖啡馆": ["咖啡馆", "咖啡店", "café", "cafe", "星巴克", "咖啡厅"],
@@ -46,72 +112,104 @@ class EnhancedAIAnalyzer:
             "商务": ["商务", "正式", "职业", "专业", "严肃"],
             "休闲": ["休闲", "随意", "自然", "舒适", "轻松"]
         }
+        
+        # 四组关键词合并为一个匹配器，分类以 (组名, 分类) 区分，一次扫描文本即可找出各组的全部命中分类
+        self._keyword_groups = {
+            "scene": self.scene_keywords,
+            "pose": self.pose_keywords,
+            "angle": self.angle_keywords,
+            "style": self.style_keywords,
+        }
+        self._keyword_matcher = KeywordMatcher({
+            (group, category): keywords
+            for group, keyword_dict in self._keyword_groups.items()
+            for category, keywords in keyword_dict.items()
+        })
     
     def is_available(self) -> bool:
         """检查分析器是否可用"""
         return self.available
     
     def analyze_search_query(self, query: str) -> Dict[str, Any]:
-        """分析搜索查询，提取意图和关键词"""
+        """分析搜索查询，提取意图和关键词（按标准化查询缓存）"""
+        key = query.strip().lower()
+        cached = self._analysis_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            query_lower = query.lower().strip()
-            
-            # 提取关键词
-            scene_related = self._extract_keywords(query_lower, self.scene_keywords)
-            pose_related = self._extract_keywords(query_lower, self.pose_keywords)
-            angle_related = self._extract_keywords(query_lower, self.angle_keywords)
-            style_related = self._extract_keywords(query_lower, self.style_keywords)
-            
-            # 分析查询意图
-            intent = self._analyze_intent(query_lower, scene_related, pose_related, angle_related, style_related)
-            
-            # 生成增强查询
-            enhanced_query = self._generate_enhanced_query(
-                query, scene_related, pose_related, angle_related, style_related
-            )
-            
-            # 计算置信度
-            confidence = self._calculate_confidence(scene_related, pose_related, angle_related, style_related)
-            
-            return {
-                "analysis": {
-                    "intent": intent,
-                    "confidence": confidence,
-                    "scene_related": scene_related,
-                    "pose_related": pose_related,
-                    "angle_related": angle_related,
-                    "style_related": style_related,
-                    "keywords_count": len(scene_related) + len(pose_related) + len(angle_related) + len(style_related)
-                },
-                "enhanced_query": enhanced_query,
-                "suggestions": self._generate_suggestions(intent, scene_related, pose_related, angle_related, style_related)
-            }
-            
+            result = self._analyze_search_query(query)
+            ttl = ANALYSIS_CACHE_TTL
         except Exception as e:
             logger.error(f"查询分析失败: {e}")
-            return {
-                "analysis": {
-                    "intent": "未知",
-                    "confidence": 0.0,
-                    "scene_related": [],
-                    "pose_related": [],
-                    "angle_related": [],
-                    "style_related": [],
-                    "keywords_count": 0
-                },
-                "enhanced_query": query,
-                "suggestions": ["请尝试使用更具体的关键词"]
-            }
+            result = self._fallback_query_analysis(query)
+            ttl = ANALYSIS_NEGATIVE_TTL
+
+        self._analysis_cache.set(key, result, ttl)
+        return result
+
+    def _analyze_search_query(self, query: str) -> Dict[str, Any]:
+        """执行查询分析（不带缓存）"""
+        query_lower = query.lower().strip()
+        
+        # 提取关键词
+        matched = self._match_keyword_groups(query_lower)
+        scene_related = matched["scene"]
+        pose_related = matched["pose"]
+        angle_related = matched["angle"]
+        style_related = matched["style"]
+        
+        # 分析查询意图
+        intent = self._analyze_intent(query_lower, scene_related, pose_related, angle_related, style_related)
+        
+        # 生成增强查询
+        enhanced_query = self._generate_enhanced_query(
+            query, scene_related, pose_related, angle_related, style_related
+        )
+        
+        # 计算置信度
+        confidence = self._calculate_confidence(scene_related, pose_related, angle_related, style_related)
+        
+        return {
+            "analysis": {
+                "intent": intent,
+                "confidence": confidence,
+                "scene_related": scene_related,
+                "pose_related": pose_related,
+                "angle_related": angle_related,
+                "style_related": style_related,
+                "keywords_count": len(scene_related) + len(pose_related) + len(angle_related) + len(style_related)
+            },
+            "enhanced_query": enhanced_query,
+            "suggestions": self._generate_suggestions(intent, scene_related, pose_related, angle_related, style_related)
+        }
+
+    def _fallback_query_analysis(self, query: str) -> Dict[str, Any]:
+        """分析失败时的默认结果"""
+        return {
+            "analysis": {
+                "intent": "未知",
+                "confidence": 0.0,
+                "scene_related": [],
+                "pose_related": [],
+                "angle_related": [],
+                "style_related": [],
+                "keywords_count": 0
+            },
+            "enhanced_query": query,
+            "suggestions": ["请尝试使用更具体的关键词"]
+        }
+    
+    def _match_keyword_groups(self, text: str) -> Dict[str, List[str]]:
+        """一次扫描文本，返回各关键词组命中的分类（顺序与关键词表一致）"""
+        matched: Dict[str, List[str]] = {group: [] for group in self._keyword_groups}
+        for group, category in self._keyword_matcher.find(text):
+            matched[group].append(category)
+        return matched
     
     def _extract_keywords(self, query: str, keyword_dict: Dict[str, List[str]]) -> List[str]:
-        """从查询中提取相关关键词"""
-        found_keywords = []
-        for category, keywords in keyword_dict.items():
-            for keyword in keywords:
-                if keyword in query:
-                    found_keywords.append(category)
-                    break
-        return found_keywords
+        """从查询中提取相关关键词（任意关键词表，热路径请直接使用预建的匹配器）"""
+        return KeywordMatcher(keyword_dict).find(query)
     
     def _analyze_intent(self, query: str, scene_related: List[str], pose_related: List[str], 
                        angle_related: List[str], style_related: List[str]) -> str:
@@ -211,13 +309,14 @@ class EnhancedAIAnalyzer:
             angle = pose_data.get("angle", "")
             
             # 提取内容特征
+            matched = self._match_keyword_groups((title + " " + description).lower())
             content_features = {
                 "scene_type": scene_category,
                 "angle_type": angle,
-                "extracted_scenes": self._extract_keywords(title.lower() + " " + description.lower(), self.scene_keywords),
-                "extracted_poses": self._extract_keywords(title.lower() + " " + description.lower(), self.pose_keywords),
-                "extracted_angles": self._extract_keywords(title.lower() + " " + description.lower(), self.angle_keywords),
-                "extracted_styles": self._extract_keywords(title.lower() + " " + description.lower(), self.style_keywords),
+                "extracted_scenes": matched["scene"],
+                "extracted_poses": matched["pose"],
+                "extracted_angles": matched["angle"],
+                "extracted_styles": matched["style"],
                 "tag_count": len(ai_tags.split(",")) if ai_tags else 0
             }
             
@@ -229,58 +328,4 @@ class EnhancedAIAnalyzer:
 
     def _build_enhanced_analysis_prompt(self) -> str:
         """构建增强版分析提示词 - 针对向量搜索优化"""
-        return """
-你是一个专业的摄影作品分析专家。请仔细分析这张图片，重点关注以下几个方面来生成高质量的标签和描述，以便用户能够准确搜索到相关内容。
-
-请按照以下JSON格式返回分析结果：
-
-{
-    "title": "简洁的标题",
-    "description": "详细的姿势描述",
-    "scene_category": "场景分类",
-    "angle": "拍摄角度",
-    "primary_tags": ["核心标签1", "核心标签2"],
-    "semantic_tags": ["语义标签1", "语义标签2"],
-    "style_tags": ["风格标签1", "风格标签2"],
-    "emotion_tags": ["情感标签1", "情感标签2"],
-    "clothing_tags": ["服装标签1", "服装标签2"],
-    "props": ["道具1", "道具2"],
-    "color_scheme": ["主色调1", "主色调2"],
-    "lighting": "光线描述",
-    "composition": "构图描述",
-    "shooting_tips": "拍摄建议",
-    "search_keywords": ["搜索关键词1", "搜索关键词2"],
-    "confidence": 0.95
-}
-
-**详细分析要求：**
-
-1. **title**: 3-8个字，突出最显著特征
-
-2. **description**: 80-150字，包含：
-   - 人物状态和动作
-   - 环境和背景
-   - 整体氛围感受
-
-3. **分层标签系统**：
-   - **primary_tags**: 3-5个核心标签，最重要的特征
-   - **semantic_tags**: 5-8个语义标签，描述场景含义
-   - **style_tags**: 3-5个风格标签（日系、韩系、欧美、复古等）
-   - **emotion_tags**: 2-4个情感标签（温柔、活泼、忧郁、俏皮等）
-   - **clothing_tags**: 3-6个服装标签（具体服装类型、颜色、风格）
-
-4. **视觉元素**：
-   - **color_scheme**: 主要颜色调性
-   - **lighting**: 光线类型和效果
-   - **composition**: 构图特点
-
-5. **search_keywords**: 10-15个用户可能搜索的关键词，包括：
-   - 同义词和近义词
-   - 通俗表达
-   - 专业术语
-   - 相关概念
-
-6. **场景和角度**：严格按照预设选项选择
-
-重点：生成的标签要考虑中文用户的搜索习惯，包含多种表达方式。
-"""
\ No newline at end of file
+        return _ENHANCED_ANALYSIS_PROMPT
\ No newline at end of file
@@ -1,6 +1,7 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, Query
 from sqlalchemy import text, and_, or_, func, desc
-from typing import List, Tuple, Optional, Dict, Set
+from typing import Any, Callable, List, Tuple, Optional, Dict, Set
+import asyncio
 import re
 import time
 import jieba
@@ -9,9 +10,24 @@ from fuzzywuzzy import fuzz, process
 from collections import defaultdict, Counter
 import json
 import redis
+from ..database import SessionLocal
 from ..models.pose import Pose
 from ..models.tag import Tag, PoseTag
 from ..models.search_history import SearchHistory
+from ..schemas.pose import PoseResponse
+from ..utils.search_history_writer import record_search
+
+# 列表接口只查询响应模型需要的列，结果以映射行返回，无需构造ORM对象
+_RESPONSE_COLUMNS = tuple(getattr(Pose, name) for name in PoseResponse.model_fields)
+
+
+def _run_in_own_session(query: Query, fn: Callable[[Query], Any]) -> Any:
+    """在独立会话中执行查询；Session 不能跨线程共享，并发查询各自占用一个连接"""
+    session = SessionLocal()
+    try:
+        return fn(query.with_session(session))
+    finally:
+        session.close()
 
 class EnhancedSearchService:
     def __init__(self, redis_client=None):
@@ -180,7 +196,7 @@ class EnhancedSearchService:
         
         return filtered_terms
     
-    def search_poses_enhanced(
+    async def search_poses_enhanced(
         self, 
         db: Session, 
         query: str, 
@@ -189,8 +205,11 @@ class EnhancedSearchService:
         page: int = 1, 
         per_page: int = 20,
         enable_fuzzy: bool = True
-    ) -> Tuple[List[Pose], int, Dict]:
-        """增强的搜索功能"""
+    ) -> Tuple[List[Dict], int, Dict]:
+        """增强的搜索功能，姿势以映射行（列名 -> 值）返回
+
+        总数统计与分页查询互不依赖，分别在线程中并发执行。
+        """
         start_time = time.time()
         search_info = {
             'original_query': query,
@@ -203,7 +222,7 @@ class EnhancedSearchService:
         normalized_query = self._normalize_query(query)
         
         # 拼写纠正和模糊匹配
-        available_terms = self._get_available_terms(db)
+        available_terms = await asyncio.to_thread(self._get_available_terms, db)
         corrections = self._fuzzy_match_correction(query, available_terms)
         
         if corrections and enable_fuzzy:
@@ -218,46 +237,20 @@ class EnhancedSearchService:
         # 构建搜索查询
         base_query = db.query(Pose).filter(Pose.status == 'active')
         
-        # 多重搜索策略
-        search_conditions = []
-        
-        # 1. 精确匹配（权重最高）
-        for q in expanded_queries:
-            search_conditions.append(
-                text("MATCH(title, description) AGAINST(:query IN BOOLEAN MODE)")
-                .params(query=f'"{q}"')
-            )
-        
-        # 2. 自然语言匹配
-        for q in expanded_queries:
-            search_conditions.append(
-                text("MATCH(title, description, ai_tags) AGAINST(:query IN NATURAL LANGUAGE MODE)")
-                .params(query=q)
-            )
-        
-        # 3. LIKE 模糊匹配（兜底策略）
-        for q in expanded_queries:
-            search_conditions.extend([
-                Pose.title.like(f"%{q}%"),
-                Pose.description.like(f"%{q}%"),
-                Pose.ai_tags.like(f"%{q}%")
-            ])
-        
-        # 4. 标签搜索
-        tag_conditions = []
-        for q in expanded_queries:
-            tag_subquery = (
-                db.query(PoseTag.pose_id)
-                .join(Tag, PoseTag.tag_id == Tag.id)
-                .filter(Tag.name.like(f"%{q}%"))
-                .subquery()
-            )
-            tag_conditions.append(Pose.id.in_(tag_subquery))
-        
-        # 组合所有搜索条件
-        all_conditions = search_conditions + tag_conditions
-        if all_conditions:
-            base_query = base_query.filter(or_(*all_conditions))
+        # 全文索引匹配：所有扩展查询合并为一次布尔模式 MATCH，走倒排索引而非 LIKE 全表扫描
+        ft_query = self._build_fulltext_query(expanded_queries)
+        relevance = text(
+            "MATCH(poses.title, poses.description, poses.ai_tags) AGAINST(:ft_query IN BOOLEAN MODE)"
+        ).bindparams(ft_query=ft_query)
+        
+        # 标签搜索
+        tag_subquery = (
+            db.query(PoseTag.pose_id)
+            .join(Tag, PoseTag.tag_id == Tag.id)
+            .filter(or_(*[Tag.name.like(f"%{q}%") for q in expanded_queries]))
+            .subquery()
+        )
+        base_query = base_query.filter(or_(relevance, Pose.id.in_(tag_subquery)))
         
         # 分类和角度筛选
         if category:
@@ -265,30 +258,54 @@ class EnhancedSearchService:
         if angle:
             base_query = base_query.filter(Pose.angle == angle)
         
-        # 获取总数
-        total = base_query.count()
-        
         # 排序：优先显示更相关的结果
-        poses = (
+        page_query = (
             base_query
+            .with_entities(*_RESPONSE_COLUMNS)
             .order_by(
+                desc(relevance),        # 全文相关度
                 desc(Pose.view_count),  # 浏览量
                 desc(Pose.created_at)   # 创建时间
             )
             .offset((page - 1) * per_page)
             .limit(per_page)
-            .all()
         )
         
-        # 记录搜索历史
-        response_time = int((time.time() - start_time) * 1000)
-        self._record_search_history(
-            db, search_info['original_query'], normalized_query, 
-            total, response_time, category
+        # 总数与当前页并发查询
+        total, rows = await asyncio.gather(
+            asyncio.to_thread(_run_in_own_session, base_query, Query.count),
+            asyncio.to_thread(_run_in_own_session, page_query, Query.all),
         )
+        poses = [row._mapping for row in rows]
+        
+        # 记录搜索历史：交给后台任务批量写入，未启动写入任务时同步写入
+        response_time = int((time.time() - start_time) * 1000)
+        if not record_search({
+            'query': search_info['original_query'],
+            'normalized_query': normalized_query,
+            'results_count': total,
+            'response_time_ms': response_time,
+            'filter_category': category,
+        }):
+            await asyncio.to_thread(
+                self._record_search_history,
+                db, search_info['original_query'], normalized_query,
+                total, response_time, category
+            )
         
         return poses, total, search_info
     
+    _FULLTEXT_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+    
+    def _build_fulltext_query(self, queries: List[str]) -> str:
+        """将扩展查询转换为布尔模式的短语列表（任一短语命中即可），并去除布尔运算符"""
+        phrases = []
+        for q in queries:
+            cleaned = self._FULLTEXT_OPERATORS.sub(" ", q).strip()
+            if cleaned:
+                phrases.append(f'"{cleaned}"')
+        return " ".join(phrases)
+    
     def get_smart_suggestions(self, db: Session, prefix: str, limit: int = 10) -> List[Dict]:
         """智能搜索建议"""
         suggestions = []
@@ -296,15 +313,16 @@ class EnhancedSearchService:
         if len(prefix) < 1:
             return []
         
-        # 1. 基于搜索历史的建议
-        history_suggestions = self._get_history_suggestions(db, prefix, limit // 2)
-        suggestions.extend(history_suggestions)
-        
-        # 2. 基于标签的建议
-        tag_suggestions = self._get_tag_suggestions(db, prefix, limit // 2)
-        suggestions.extend(tag_suggestions)
+        # 1. 基于搜索历史和标签的建议：优先查预先汇总的建议词表（索引范围扫描）
+        try:
+            suggestions.extend(self._get_term_suggestions(db, prefix, limit))
+        except Exception as e:
+            db.rollback()
+            print(f"查询建议词表失败，改为实时汇总: {e}")
+            suggestions.extend(self._get_history_suggestions(db, prefix, limit // 2))
+            suggestions.extend(self._get_tag_suggestions(db, prefix, limit // 2))
         
-        # 3. 基于同义词的建议
+        # 2. 基于同义词的建议
         synonym_suggestions = self._get_synonym_suggestions(prefix, limit // 2)
         suggestions.extend(synonym_suggestions)
         
@@ -327,6 +345,37 @@ class EnhancedSearchService:
         
         return sorted_suggestions[:limit]
     
+    def _get_term_suggestions(self, db: Session, prefix: str, limit: int) -> List[Dict]:
+        """基于 autocomplete_terms 表的建议，ASCII前缀同时匹配拼音列"""
+        params = {"prefix": f"{prefix.lower()}%", "limit": limit}
+        if prefix.isascii():
+            sql = """
+                (SELECT term, term_type, freq FROM autocomplete_terms
+                 WHERE term LIKE :prefix ORDER BY freq DESC LIMIT :limit)
+                UNION
+                (SELECT term, term_type, freq FROM autocomplete_terms
+                 WHERE pinyin LIKE :prefix ORDER BY freq DESC LIMIT :limit)
+                ORDER BY freq DESC
+                LIMIT :limit
+            """
+        else:
+            sql = """
+                SELECT term, term_type, freq FROM autocomplete_terms
+                WHERE term LIKE :prefix
+                ORDER BY freq DESC
+                LIMIT :limit
+            """
+        result = db.execute(text(sql), params).fetchall()
+        
+        return [
+            {
+                'text': row[0],
+                'type': row[1],
+                'weight': row[2]
+            }
+            for row in result
+        ]
+    
     def _get_history_suggestions(self, db: Session, prefix: str, limit: int) -> List[Dict]:
         """基于搜索历史的建议"""
         result = db.execute(
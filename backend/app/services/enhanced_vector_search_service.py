@@ -1,35 +1,76 @@
 import os
 import json
+import hashlib
+import time
 import faiss
 import numpy as np
 import logging
 from typing import List, Tuple, Dict, Any, Optional
-from openai import OpenAI
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from ..config import settings
+from ..utils.embedding_cache import EmbeddingCache
+from ..utils.ttl_cache import TTLCache
+from ..utils.batching_searcher import BatchingSearcher
+from ..utils.embedding_batcher import EmbeddingBatcher
+from ..utils.faiss_index import returns_exact_distances
+from ..utils.redis_client import get_raw_redis
+from ..database import SessionLocal
+from ..models.pose import Pose
+from .ai_analyzer import get_ai_analyzer
 
 logger = logging.getLogger(__name__)
 
+EMBED_MODEL = "text-embedding-ada-002"
+# IVF索引每次查询探测的倒排列表数
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "16"))
+# HNSW索引查询时的搜索宽度
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))
+# FAISS的OpenMP线程数，0表示使用全部CPU核
+FAISS_OMP_THREADS = int(os.getenv("FAISS_OMP_THREADS", "0"))
+# 量化索引粗召回倍数：先召回 k*倍数 个候选，再用原始向量精排取前k个
+FAISS_RERANK_FACTOR = int(os.getenv("FAISS_RERANK_FACTOR", "4"))
+# 并发请求合并为批量检索（默认关闭）
+FAISS_BATCH_SEARCH = os.getenv("FAISS_BATCH_SEARCH", "0") == "1"
+# 并发查询的嵌入请求合并为一次OpenAI调用（默认关闭，开启后单个查询最多多等20ms）
+EMBED_BATCH = os.getenv("EMBED_BATCH", "0") == "1"
+# GPT重排序结果缓存：同一查询和候选集合的排序结果在进程内和Redis中复用
+RERANK_CACHE_SIZE = 4096
+RERANK_CACHE_TTL = 86400
+# 重排序用的姿势描述在进程内缓存，热门姿势无需每次查询数据库
+POSE_TEXT_CACHE_SIZE = 10000
+POSE_TEXT_CACHE_TTL = 300
+
 class EnhancedVectorSearchService:
     """增强版向量搜索服务 - 支持多阶段检索和GPT重排序"""
     
-    def __init__(self, index_path: str, id_map_path: str):
+    def __init__(self, index_path: str, id_map_path: str, embeddings_path: Optional[str] = None):
         self.index_path = index_path
         self.id_map_path = id_map_path
+        self.embeddings_path = embeddings_path
         self.index = None
         self.id_map = None
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.embeddings = None  # 精排向量(float16 mmap)，仅量化索引精排时使用
+        # 与其他AI服务共用同一个OpenAI客户端及其连接池
+        self.client = get_ai_analyzer().client
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        self.batcher: Optional[BatchingSearcher] = None
+        self.embed_batcher: Optional[EmbeddingBatcher] = None
+        self._rerank_cache = TTLCache(RERANK_CACHE_SIZE, RERANK_CACHE_TTL)
+        self._pose_text_cache = TTLCache(POSE_TEXT_CACHE_SIZE, POSE_TEXT_CACHE_TTL)
+        if EMBED_BATCH:
+            self.embed_batcher = EmbeddingBatcher(self._create_embeddings)
         self.available = False
         self._load_index()
     
     def _load_index(self):
         """加载索引和ID映射"""
         try:
-            if os.path.exists(self.index_path) and os.path.exists(self.id_map_path):
+            npy_path = os.path.splitext(self.id_map_path)[0] + ".npy"
+            if os.path.exists(self.index_path) and (os.path.exists(npy_path) or os.path.exists(self.id_map_path)):
                 self.index = faiss.read_index(self.index_path)
-                with open(self.id_map_path, "r", encoding="utf-8") as f:
-                    self.id_map = json.load(f)
+                self.id_map = self._load_id_map(npy_path)
+                self._configure_index()
                 self.available = True
                 logger.info("增强版向量索引加载成功")
             else:
@@ -38,6 +79,110 @@ class EnhancedVectorSearchService:
         except Exception as e:
             logger.error(f"增强版索引加载失败: {e}")
     
+    def warmup(self):
+        """启动时执行一次空查询，让索引数据和ID映射提前载入内存，首个请求不再承担冷启动开销"""
+        if not self.available:
+            return
+        try:
+            start = time.time()
+            _, indices = self.index.search(np.zeros((1, self.index.d), dtype=np.float32), 10)
+            self._lookup_pose_ids(indices[0])
+            logger.info(f"向量索引预热完成，用时 {(time.time() - start) * 1000:.0f}ms")
+        except Exception as e:
+            logger.warning(f"向量索引预热失败: {e}")
+
+    def _load_id_map(self, npy_path: str) -> np.ndarray:
+        """加载ID映射为int64数组，id_map[faiss_idx] = pose_id，空位为-1
+        
+        优先内存映射构建脚本生成的 .npy 文件，不存在时从JSON映射转换
+        """
+        if os.path.exists(npy_path):
+            return np.load(npy_path, mmap_mode="r")
+        
+        with open(self.id_map_path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        id_map = np.full(max((int(k) for k in raw), default=-1) + 1, -1, dtype=np.int64)
+        for faiss_idx, pose_id in raw.items():
+            id_map[int(faiss_idx)] = int(pose_id)
+        return id_map
+    
+    def _lookup_pose_ids(self, indices: np.ndarray) -> np.ndarray:
+        """将FAISS内部下标批量转换为姿势ID，无效下标返回-1"""
+        indices = np.asarray(indices, dtype=np.int64)
+        valid = (indices >= 0) & (indices < len(self.id_map))
+        pose_ids = np.full(indices.shape, -1, dtype=np.int64)
+        pose_ids[valid] = self.id_map[indices[valid]]
+        return pose_ids
+    
+    def _filter_hits(self, indices: np.ndarray, distances: np.ndarray,
+                     min_similarity: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """将一条查询的FAISS结果转换为 (姿势ID数组, 相似度数组)，去掉无效下标和低于阈值的结果"""
+        pose_ids = self._lookup_pose_ids(indices)
+        similarities = self._distance_to_similarity_vec(distances)
+        keep = pose_ids >= 0
+        if min_similarity is not None:
+            keep &= similarities >= min_similarity
+        return pose_ids[keep], similarities[keep]
+    
+    def _configure_index(self):
+        """配置IVF/HNSW检索参数，并为量化索引加载原始向量用于精排"""
+        faiss.omp_set_num_threads(FAISS_OMP_THREADS or os.cpu_count() or 1)
+        try:
+            ivf = faiss.extract_index_ivf(self.index)
+            ivf.nprobe = FAISS_NPROBE
+            logger.info(f"IVF索引: nlist={ivf.nlist}, nprobe={FAISS_NPROBE}")
+        except Exception:
+            pass  # 非IVF索引
+        
+        hnsw_index = faiss.downcast_index(self.index)
+        if isinstance(hnsw_index, faiss.IndexHNSW):
+            hnsw_index.hnsw.efSearch = FAISS_EF_SEARCH
+            logger.info(f"HNSW索引: efSearch={FAISS_EF_SEARCH}")
+        
+        if FAISS_BATCH_SEARCH:
+            self.batcher = BatchingSearcher(self.index)
+            logger.info("已启用FAISS批量检索合并")
+        
+        if returns_exact_distances(self.index):
+            return  # 精确距离无需精排
+        
+        if self.embeddings_path and os.path.exists(self.embeddings_path):
+            self.embeddings = np.load(self.embeddings_path, mmap_mode="r")
+            logger.info(f"已加载精排向量: {self.embeddings.shape}, {self.embeddings.dtype}")
+        else:
+            logger.warning("未找到原始向量文件，量化索引将不做精排")
+    
+    def _search_index(self, query_vec: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """执行FAISS检索，返回与 index.search 相同形状的 (distances, indices)
+        
+        量化索引先粗召回 k*FAISS_RERANK_FACTOR 个候选，再用原始向量计算精确L2距离重排
+        """
+        query = query_vec.reshape(1, -1)
+        if self.embeddings is None:
+            return self._index_search(query, k)
+        
+        coarse_k = min(k * FAISS_RERANK_FACTOR, self.index.ntotal)
+        _, coarse_indices = self._index_search(query, coarse_k)
+        candidates = coarse_indices[0][coarse_indices[0] >= 0]
+        
+        # 精排向量以float16存储，仅对候选行转换为float32
+        vecs = np.asarray(self.embeddings[candidates], dtype=np.float32)
+        diff = vecs - query
+        exact = np.einsum("ij,ij->i", diff, diff)
+        order = np.argsort(exact)[:k]
+        
+        distances = np.full((1, k), np.inf, dtype=np.float32)
+        indices = np.full((1, k), -1, dtype=np.int64)
+        distances[0, :len(order)] = exact[order]
+        indices[0, :len(order)] = candidates[order]
+        return distances, indices
+    
+    def _index_search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """单条查询检索，启用批量合并时交给后台线程与其他并发查询一起执行"""
+        if self.batcher is not None:
+            return self.batcher.search(query, k)
+        return self.index.search(query, k)
+    
     def is_available(self) -> bool:
         """检查服务是否可用"""
         return self.available
@@ -55,19 +200,11 @@ class EnhancedVectorSearchService:
             
             # 向量搜索 - 搜索更多候选
             search_k = min(top_k * 10, 500)
-            distances, indices = self.index.search(query_vec.reshape(1, -1), search_k)
+            distances, indices = self._search_index(query_vec, search_k)
             
-            results = []
-            for idx, dist in zip(indices[0], distances[0]):
-                if idx < 0 or str(idx) not in self.id_map:
-                    continue
-                
-                pose_id = self.id_map[str(idx)]
-                similarity = self._distance_to_similarity(dist)
-                
-                # 只过滤掉完全无关的结果
-                if similarity >= 0.01:
-                    results.append((pose_id, similarity))
+            # 只过滤掉完全无关的结果
+            pose_ids, similarities = self._filter_hits(indices[0], distances[0], min_similarity=0.01)
+            results = list(zip(pose_ids.tolist(), similarities.tolist()))
             
             # 按相似度排序并返回top_k
             results.sort(key=lambda x: x[1], reverse=True)
@@ -113,21 +250,17 @@ class EnhancedVectorSearchService:
                 return []
             
             # 向量搜索
-            distances, indices = self.index.search(query_vec.reshape(1, -1), top_k)
+            distances, indices = self._search_index(query_vec, top_k)
             
-            results = []
-            for idx, dist in zip(indices[0], distances[0]):
-                if idx < 0 or str(idx) not in self.id_map:
-                    continue
-                
-                pose_id = self.id_map[str(idx)]
-                similarity = self._distance_to_similarity(dist)
-                
-                # 获取姿势描述信息用于重排序
-                pose_info = self._get_pose_description(pose_id)
-                results.append((pose_id, similarity, pose_info))
+            pose_ids, similarities = self._filter_hits(indices[0], distances[0])
+            hits = list(zip(pose_ids.tolist(), similarities.tolist()))
             
-            return results
+            # 一次查询取回全部候选的描述信息用于重排序
+            texts = self._get_pose_texts([pose_id for pose_id, _ in hits])
+            return [
+                (pose_id, similarity, texts.get(pose_id) or f"姿势 {pose_id}")
+                for pose_id, similarity in hits
+            ]
             
         except Exception as e:
             logger.error(f"向量召回失败: {e}")
@@ -140,14 +273,20 @@ class EnhancedVectorSearchService:
             return []
         
         try:
-            # 构建重排序提示
-            candidate_texts = []
-            for i, (pose_id, similarity, description) in enumerate(candidates):
-                candidate_texts.append(f"{i}: {description}")
-            
-            candidates_text = "\n".join(candidate_texts)
-            
-            prompt = f"""
+            cache_key = self._rerank_cache_key(query, candidates, final_k)
+            cached_ids = self._get_cached_rerank(cache_key)
+            if cached_ids is not None:
+                position = {pose_id: i for i, (pose_id, _, _) in enumerate(candidates)}
+                selected_indices = [position[pose_id] for pose_id in cached_ids if pose_id in position]
+            else:
+                # 构建重排序提示
+                candidate_texts = []
+                for i, (pose_id, similarity, description) in enumerate(candidates):
+                    candidate_texts.append(f"{i}: {description}")
+                
+                candidates_text = "\n".join(candidate_texts)
+                
+                prompt = f"""
 你是一个专业的摄影姿势推荐专家。用户查询："{query}"
 
 请从以下候选姿势中选择最相关的{final_k}个，并按相关性排序（最相关的排在前面）：
@@ -156,23 +295,25 @@ class EnhancedVectorSearchService:
 
 只返回选中的候选编号，用逗号分隔，例如：0,3,7,2,9
 """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=200,
-                temperature=0.1
-            )
-            
-            # 解析GPT响应
-            selected_indices = []
-            if response.choices and response.choices[0].message.content:
-                content = response.choices[0].message.content.strip()
-                try:
-                    indices = [int(x.strip()) for x in content.split(',')]
-                    selected_indices = [i for i in indices if 0 <= i < len(candidates)][:final_k]
-                except ValueError:
-                    logger.warning(f"GPT重排序响应解析失败: {content}")
+                
+                response = self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=200,
+                    temperature=0.1
+                )
+                
+                # 解析GPT响应
+                selected_indices = []
+                if response.choices and response.choices[0].message.content:
+                    content = response.choices[0].message.content.strip()
+                    try:
+                        indices = [int(x.strip()) for x in content.split(',')]
+                        selected_indices = [i for i in indices if 0 <= i < len(candidates)][:final_k]
+                    except ValueError:
+                        logger.warning(f"GPT重排序响应解析失败: {content}")
+                if selected_indices:
+                    self._put_cached_rerank(cache_key, [candidates[i][0] for i in selected_indices])
             
             # 如果GPT失败，使用原始顺序
             if not selected_indices:
@@ -194,6 +335,42 @@ class EnhancedVectorSearchService:
             # 降级到基础排序
             return [(pose_id, similarity) for pose_id, similarity, _ in candidates[:final_k]]
     
+    @staticmethod
+    def _rerank_cache_key(query: str, candidates: List[Tuple[int, float, str]], final_k: int) -> str:
+        """排序结果只取决于查询和候选集合，与候选的先后顺序无关"""
+        ids = ",".join(str(pose_id) for pose_id in sorted(pose_id for pose_id, _, _ in candidates))
+        raw = f"{EmbeddingCache.normalize(query)}|{final_k}|{ids}"
+        return "rerank:v1:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    
+    def _get_cached_rerank(self, key: str) -> Optional[List[int]]:
+        pose_ids = self._rerank_cache.get(key)
+        if pose_ids is not None:
+            return pose_ids
+        
+        client = get_raw_redis()
+        if client is None:
+            return None
+        try:
+            raw = client.get(key)
+        except Exception as e:
+            logger.warning(f"读取重排序缓存失败: {e}")
+            return None
+        if not raw:
+            return None
+        pose_ids = json.loads(raw)
+        self._rerank_cache.set(key, pose_ids)
+        return pose_ids
+    
+    def _put_cached_rerank(self, key: str, pose_ids: List[int]):
+        self._rerank_cache.set(key, pose_ids)
+        client = get_raw_redis()
+        if client is None:
+            return
+        try:
+            client.setex(key, RERANK_CACHE_TTL, json.dumps(pose_ids))
+        except Exception as e:
+            logger.warning(f"写入重排序缓存失败: {e}")
+    
     def _quality_filter(self, results: List[Tuple[int, float]], 
                        min_similarity: float) -> List[Tuple[int, float]]:
         """阶段3：质量过滤"""
@@ -201,28 +378,67 @@ class EnhancedVectorSearchService:
         return sorted(filtered, key=lambda x: x[1], reverse=True)
     
     def _embed(self, text: str) -> np.ndarray:
-        """生成文本嵌入向量"""
+        """生成文本嵌入向量（优先读取查询向量缓存）"""
+        if self.embedding_cache is not None:
+            return self.embedding_cache.get_or_compute(text, lambda: self._create_embedding(text))
+        return self._create_embedding(text)
+    
+    def _create_embedding(self, text: str) -> Optional[np.ndarray]:
+        """调用OpenAI生成嵌入向量"""
+        if self.embed_batcher is not None:
+            return self.embed_batcher.embed(text)
         try:
             response = self.client.embeddings.create(
                 input=text,
-                model="text-embedding-ada-002"
+                model=EMBED_MODEL
             )
-            embedding = np.array(response.data[0].embedding, dtype=np.float32)
-            return embedding
+            return np.array(response.data[0].embedding, dtype=np.float32)
         except Exception as e:
             logger.error(f"生成嵌入向量失败: {e}")
             return None
     
+    def _create_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """一次调用为多条文本生成嵌入向量，顺序与 texts 一致"""
+        response = self.client.embeddings.create(input=texts, model=EMBED_MODEL)
+        data = sorted(response.data, key=lambda item: item.index)
+        return [np.array(item.embedding, dtype=np.float32) for item in data]
+    
     def _distance_to_similarity(self, distance: float) -> float:
         """将距离转换为相似度分数 (0-1)"""
         # 使用指数衰减函数，距离越小相似度越高
         return np.exp(-distance)
     
-    def _get_pose_description(self, pose_id: int) -> str:
-        """获取姿势描述信息"""
-        # 这里应该从数据库获取姿势的描述信息
-        # 暂时返回简单的占位符
-        return f"姿势 {pose_id} 的描述信息"
+    def _distance_to_similarity_vec(self, distances: np.ndarray) -> np.ndarray:
+        """批量将距离数组转换为相似度分数，与 _distance_to_similarity 公式一致"""
+        return np.exp(-np.asarray(distances, dtype=np.float32))
+    
+    def _get_pose_texts(self, pose_ids: List[int]) -> Dict[int, str]:
+        """批量获取姿势描述信息（标题、描述、AI标签），未缓存的姿势合并为一次IN查询"""
+        texts: Dict[int, str] = {}
+        for pose_id in pose_ids:
+            text = self._pose_text_cache.get(pose_id)
+            if text is not None:
+                texts[pose_id] = text
+        
+        missing = [pose_id for pose_id in pose_ids if pose_id not in texts]
+        if not missing:
+            return texts
+        
+        try:
+            with SessionLocal() as session:
+                rows = session.execute(
+                    select(Pose.id, Pose.title, Pose.description, Pose.ai_tags)
+                    .where(Pose.id.in_(missing))
+                ).all()
+        except Exception as e:
+            logger.warning(f"获取姿势描述失败: {e}")
+            return texts
+        
+        for row in rows:
+            text = " ".join(part for part in (row.title, row.description, row.ai_tags) if part)
+            texts[row.id] = text
+            self._pose_text_cache.set(row.id, text)
+        return texts
     
     def search_with_pagination(self, query: str, page: int = 1, page_size: int = 20, 
                               similarity_threshold: float = 0.7) -> Dict[str, Any]:
@@ -237,17 +453,17 @@ class EnhancedVectorSearchService:
             
             # 搜索大量候选结果
             search_k = min(page * page_size * 5, 2000)  # 搜索足够多的候选
-            distances, indices = self.index.search(query_vec.reshape(1, -1), search_k)
+            distances, indices = self._search_index(query_vec, search_k)
             
             # 过滤有效结果
+            similarities = self._distance_to_similarity_vec(distances[0])
             valid_results = []
-            for idx, dist in zip(indices[0], distances[0]):
-                if idx < 0 or str(idx) not in self.id_map:
+            pose_ids = self._lookup_pose_ids(indices[0])
+            for pose_id, dist, similarity in zip(pose_ids.tolist(), distances[0].tolist(), similarities.tolist()):
+                if pose_id < 0:
                     continue
                 
                 if dist <= similarity_threshold:  # 距离越小越相似
-                    pose_id = self.id_map[str(idx)]
-                    similarity = self._distance_to_similarity(dist)
                     valid_results.append((pose_id, similarity))
             
             # 排序
@@ -289,18 +505,18 @@ class EnhancedVectorSearchService:
             
             # 搜索更大的候选集
             search_k = min(target_count * 20, 2000)
-            distances, indices = self.index.search(query_vec.reshape(1, -1), search_k)
+            distances, indices = self._search_index(query_vec, search_k)
             
             # 收集所有有效结果，使用更宽松的过滤条件
+            similarities = self._distance_to_similarity_vec(distances[0])
             valid_results = []
-            for idx, dist in zip(indices[0], distances[0]):
-                if idx < 0 or str(idx) not in self.id_map:
+            pose_ids = self._lookup_pose_ids(indices[0])
+            for pose_id, dist, similarity in zip(pose_ids.tolist(), distances[0].tolist(), similarities.tolist()):
+                if pose_id < 0:
                     continue
                 
-                similarity = self._distance_to_similarity(dist)
                 # 只过滤掉完全不相关的结果
                 if similarity >= 0.01:  # 非常宽松的阈值
-                    pose_id = self.id_map[str(idx)]
                     valid_results.append((pose_id, similarity, dist))
             
             if not valid_results:
@@ -4,6 +4,7 @@
 
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from typing import Dict, List, Optional
 from datetime import datetime, timezone
 import json
@@ -14,6 +15,14 @@ from ..database import get_db
 
 logger = logging.getLogger(__name__)
 
+# 批量写入时每条INSERT语句包含的行数
+UPSERT_BATCH_SIZE = 200
+# 重复oss_key时覆盖的AI分析字段
+_ANALYSIS_COLUMNS = (
+    'title', 'description', 'scene_category', 'angle', 'props', 'shooting_tips',
+    'ai_tags', 'processing_status', 'ai_analyzed_at', 'ai_confidence', 'error_message',
+)
+
 class PoseService:
     """姿势服务类 - 处理姿势相关的数据库操作"""
     
@@ -54,6 +63,51 @@ class PoseService:
             db.rollback()
             return None
             
+    def build_analyzed_row(self, oss_key: str, oss_url: str, thumbnail_url: Optional[str], analysis: Dict) -> Dict:
+        """将AI分析结果转换为poses表的一行，供 bulk_upsert_analyzed_poses 使用"""
+        return {
+            'oss_key': oss_key,
+            'oss_url': oss_url,
+            'thumbnail_url': thumbnail_url,
+            'title': analysis.get('title', f'摄影姿势 - {oss_key.split("/")[-1]}'),
+            'description': analysis.get('description', ''),
+            'scene_category': analysis.get('scene_category'),
+            'angle': analysis.get('angle'),
+            'props': json.dumps(analysis['props'], ensure_ascii=False) if analysis.get('props') else None,
+            'shooting_tips': analysis.get('shooting_tips', ''),
+            'ai_tags': ','.join(analysis.get('tags', [])),
+            'processing_status': 'completed',
+            'ai_analyzed_at': datetime.now(timezone.utc),
+            'ai_confidence': analysis.get('confidence', 0.8),
+            'error_message': None,
+            'status': 'active',
+            'created_at': datetime.now(timezone.utc)
+        }
+        
+    def bulk_upsert_analyzed_poses(self, db: Session, rows: List[Dict]) -> int:
+        """批量写入分析结果：每 UPSERT_BATCH_SIZE 行一条 INSERT ... ON DUPLICATE KEY UPDATE
+
+        oss_key已存在时只更新AI分析字段，返回写入的行数。
+        """
+        written = 0
+        try:
+            for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+                batch = rows[start:start + UPSERT_BATCH_SIZE]
+                stmt = mysql_insert(Pose).values(batch)
+                stmt = stmt.on_duplicate_key_update(
+                    {column: stmt.inserted[column] for column in _ANALYSIS_COLUMNS}
+                )
+                db.execute(stmt)
+                written += len(batch)
+            db.commit()
+        except Exception as e:
+            logger.error(f"批量保存姿势数据失败: {e}")
+            db.rollback()
+            return 0
+        
+        logger.info(f"批量保存姿势数据 {written} 条")
+        return written
+            
     def _process_pose_tags(self, db: Session, pose: Pose, tags: List[str]):
         """处理姿势标签关联"""
         # 清除现有标签关联
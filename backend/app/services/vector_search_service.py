@@ -7,24 +7,50 @@ import numpy as np
 import openai
 import faiss
 
+from ..config import settings
+from ..utils.embedding_cache import EmbeddingCache
+from ..utils.faiss_index import returns_exact_distances
+from ..utils.redis_client import get_raw_redis
+
 logger = logging.getLogger(__name__)
 
 EMBED_MODEL = "text-embedding-3-small"
 INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "backend/vector_index/faiss.index")
 ID_MAP_PATH = os.getenv("VECTOR_ID_MAP_PATH", "backend/vector_index/id_map.json")
+# 与FAISS索引同序的向量矩阵（float16），用于候选集检索和量化索引的精排
+EMBEDDINGS_PATH = os.getenv("VECTOR_EMBEDDINGS_PATH", "backend/vector_index/embeddings.npy")
+# IVF索引每次查询探测的倒排列表数
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "16"))
+# HNSW索引查询时的搜索宽度
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))
+# FAISS的OpenMP线程数，0表示使用全部CPU核
+FAISS_OMP_THREADS = int(os.getenv("FAISS_OMP_THREADS", "0"))
+# 量化索引粗召回倍数：先召回 k*倍数 个候选，再用原始向量精排
+FAISS_RERANK_FACTOR = int(os.getenv("FAISS_RERANK_FACTOR", "4"))
 
 
 class VectorSearchService:
     def __init__(self, index_path: str = INDEX_PATH, id_map_path: str = ID_MAP_PATH):
         self.index = None
         self.id_map = None
+        self.embeddings = None
+        self._row_of = None  # pose_id -> 向量矩阵行号
+        self.quantized = False
         self.available = False
+        self.embedding_cache = EmbeddingCache(
+            EMBED_MODEL,
+            maxsize=settings.embedding_cache_size,
+            redis_client=get_raw_redis(),
+            ttl=settings.embedding_cache_ttl,
+        )
         
         try:
             if os.path.exists(index_path) and os.path.exists(id_map_path):
                 self.index = faiss.read_index(index_path)
                 with open(id_map_path, "r", encoding="utf-8") as f:
                     self.id_map = json.load(f)
+                self._configure_index()
+                self._load_embeddings(EMBEDDINGS_PATH)
                 self.available = True
                 logger.info("向量搜索服务初始化成功")
             else:
@@ -33,12 +59,43 @@ class VectorSearchService:
         except Exception as e:
             logger.error(f"向量搜索服务初始化失败: {e}")
 
+    def _configure_index(self):
+        """IVF索引设置探测列表数，HNSW索引设置搜索宽度；PQ/SQ等量化索引的距离为近似值，需要精排"""
+        faiss.omp_set_num_threads(FAISS_OMP_THREADS or os.cpu_count() or 1)
+        try:
+            faiss.extract_index_ivf(self.index).nprobe = FAISS_NPROBE
+        except Exception:
+            pass  # 非IVF索引
+        hnsw_index = faiss.downcast_index(self.index)
+        if isinstance(hnsw_index, faiss.IndexHNSW):
+            hnsw_index.hnsw.efSearch = FAISS_EF_SEARCH
+        self.quantized = not returns_exact_distances(self.index)
+
+    def _load_embeddings(self, embeddings_path: str):
+        """以mmap方式加载向量矩阵；缺失时候选集检索不可用，仍走全量ANN"""
+        if not os.path.exists(embeddings_path):
+            return
+        try:
+            self.embeddings = np.load(embeddings_path, mmap_mode="r")
+            self._row_of = {int(pose_id): int(idx) for idx, pose_id in self.id_map.items()}
+        except Exception as e:
+            self.embeddings = None
+            logger.warning(f"向量矩阵加载失败，候选集检索不可用: {e}")
+
+    def supports_candidates(self) -> bool:
+        """是否支持在给定候选集上检索"""
+        return self.embeddings is not None
+
     def is_available(self) -> bool:
         """检查向量搜索服务是否可用"""
         return self.available
 
     def _embed(self, text: str) -> Optional[np.ndarray]:
-        """获取文本向量表示"""
+        """获取文本向量表示，优先读取查询向量缓存"""
+        return self.embedding_cache.get_or_compute(text, lambda: self._create_embedding(text))
+
+    def _create_embedding(self, text: str) -> Optional[np.ndarray]:
+        """调用OpenAI生成文本向量"""
         try:
             resp = openai.embeddings.create(input=[text], model=EMBED_MODEL)
             vec = np.array(resp.data[0].embedding, dtype="float32")
@@ -47,7 +104,27 @@ class VectorSearchService:
             logger.error(f"文本向量化失败: {e}")
             return None
 
-    def search(self, query: str, top_k: int = 10, similarity_threshold: float = 1.5) -> List[Tuple[int, float]]:
+    def _search_candidates(self, vec: np.ndarray, candidate_ids: List[int], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """在候选集的向量上做一次矩阵乘法求距离，返回与 index.search 相同形状的 (D, I)"""
+        rows = np.fromiter(
+            (self._row_of[pid] for pid in candidate_ids if pid in self._row_of), dtype=np.int64
+        )
+        return self._exact_topk(vec, rows, k)
+
+    def _exact_topk(self, vec: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """用float16原始向量对给定行精确计算距离并取前k个"""
+        if rows.size == 0:
+            return np.empty((1, 0), dtype=np.float32), np.empty((1, 0), dtype=np.int64)
+
+        # 向量已归一化：平方L2距离 = 2 - 2 * 余弦相似度，与 IndexFlatL2 的距离口径一致
+        dists = 2.0 - 2.0 * (np.asarray(self.embeddings[rows], dtype=np.float32) @ vec)
+        k = min(k, rows.size)
+        top = np.argpartition(dists, k - 1)[:k]
+        top = top[np.argsort(dists[top])]
+        return dists[top].reshape(1, -1), rows[top].reshape(1, -1)
+
+    def search(self, query: str, top_k: int = 10, similarity_threshold: float = 1.5,
+               candidate_ids: Optional[List[int]] = None) -> List[Tuple[int, float]]:
         """
         向量搜索
         
@@ -55,6 +132,7 @@ class VectorSearchService:
             query: 搜索查询
             top_k: 最大返回数量
             similarity_threshold: 相似度阈值（L2距离，越小越相似）
+            candidate_ids: 全文预筛选出的候选姿势ID，提供时只在这些姿势的向量上计算距离
         
         Returns:
             [(pose_id, similarity_score), ...] 按相似度排序
@@ -69,11 +147,20 @@ class VectorSearchService:
                 
             # 搜索更多候选结果以便过滤
             search_k = min(top_k * 3, 100)  # 搜索3倍数量的候选
-            D, I = self.index.search(vec.reshape(1, -1), search_k)
+            if candidate_ids and self.supports_candidates():
+                D, I = self._search_candidates(vec, candidate_ids, search_k)
+            elif self.quantized and self.supports_candidates():
+                # 量化索引粗召回更多候选，再用原始向量精排
+                _, I = self.index.search(vec.reshape(1, -1), search_k * FAISS_RERANK_FACTOR)
+                D, I = self._exact_topk(vec, I[0][I[0] >= 0], search_k)
+            else:
+                D, I = self.index.search(vec.reshape(1, -1), search_k)
             
             ids_scores = []
             distances = D[0]
             indices = I[0]
+            if distances.size == 0:
+                return []
             
             logger.info(f"向量搜索原始结果距离范围: {distances.min():.3f} - {distances.max():.3f}")
             
@@ -119,7 +206,8 @@ class VectorSearchService:
         return np.exp(-distance / 2.0)
     
     def search_with_adaptive_threshold(self, query: str, top_k: int = 10, 
-                                     min_results: int = 3) -> List[Tuple[int, float]]:
+                                     min_results: int = 3,
+                                     candidate_ids: Optional[List[int]] = None) -> List[Tuple[int, float]]:
         """
         自适应阈值搜索：动态调整阈值确保返回合适数量的结果
         
@@ -127,6 +215,7 @@ class VectorSearchService:
             query: 搜索查询
             top_k: 期望返回数量
             min_results: 最少返回数量
+            candidate_ids: 全文预筛选出的候选姿势ID
         """
         if not self.available:
             raise RuntimeError("向量搜索服务不可用，索引文件未找到")
@@ -135,7 +224,7 @@ class VectorSearchService:
         thresholds = [0.8, 1.2, 1.5, 2.0, 2.5]
         
         for threshold in thresholds:
-            results = self.search(query, top_k * 2, threshold)
+            results = self.search(query, top_k * 2, threshold, candidate_ids)
             
             if len(results) >= min_results:
                 logger.info(f"使用阈值 {threshold}，找到 {len(results)} 个结果")
@@ -143,4 +232,4 @@ class VectorSearchService:
         
         # 如果所有阈值都无法找到足够结果，使用最宽松的阈值
         logger.warning(f"无法找到足够的相关结果，使用宽松阈值")
-        return self.search(query, top_k, 3.0)
\ No newline at end of file
+        return self.search(query, top_k, 3.0, candidate_ids)
\ No newline at end of file
@@ -0,0 +1,37 @@
+import logging
+from typing import Tuple
+
+import numpy as np
+
+from .micro_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingSearcher(MicroBatcher):
+    """FAISS批量检索合并器
+
+    并发请求各自提交单条查询向量，后台线程在等待窗口内（或凑满批量后）
+    将待处理向量合并为一次 index.search 调用，再把结果分发回各请求。
+    """
+
+    def __init__(self, index, max_batch: int = 32, max_wait_ms: float = 5.0):
+        self.index = index
+        super().__init__(max_batch, max_wait_ms, name="faiss-batcher")
+
+    def search(self, query_vec: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """提交单条查询并阻塞等待结果，返回与 index.search 相同形状的 (distances, indices)"""
+        return self.submit((np.asarray(query_vec, dtype=np.float32).reshape(-1), k)).result()
+
+    def process(self, batch):
+        max_k = max(k for (_, k), _ in batch)
+        try:
+            distances, indices = self.index.search(np.vstack([vec for (vec, _), _ in batch]), max_k)
+        except Exception as e:
+            logger.error(f"批量向量检索失败: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for row, ((_, k), future) in enumerate(batch):
+            future.set_result((distances[row:row + 1, :k], indices[row:row + 1, :k]))
@@ -0,0 +1,48 @@
+import logging
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from .micro_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher(MicroBatcher):
+    """OpenAI嵌入请求合并器
+
+    并发请求各自提交单条文本，后台线程在等待窗口内（或凑满批量后）
+    将待处理文本合并为一次 embeddings.create(input=[...]) 调用，再把向量分发回各请求。
+    整批失败时（如其中一条文本被拒绝）逐条重试，只有出错的那条返回None。
+    """
+
+    def __init__(self, embed_batch: Callable[[List[str]], List[np.ndarray]],
+                 max_batch: int = 64, max_wait_ms: float = 20.0):
+        self.embed_batch = embed_batch
+        super().__init__(max_batch, max_wait_ms, name="embed-batcher")
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """提交单条文本并阻塞等待向量，失败时返回None"""
+        return self.submit(text).result()
+
+    def process(self, batch):
+        texts = [text for text, _ in batch]
+        try:
+            vectors = self.embed_batch(texts)
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error(f"生成嵌入向量失败: {e}")
+                vectors = [None]
+            else:
+                logger.warning(f"批量生成嵌入向量失败，逐条重试 ({len(batch)} 条): {e}")
+                vectors = [self._embed_one(text) for text in texts]
+
+        for (_, future), vec in zip(batch, vectors):
+            future.set_result(vec)
+
+    def _embed_one(self, text: str) -> Optional[np.ndarray]:
+        try:
+            return self.embed_batch([text])[0]
+        except Exception as e:
+            logger.error(f"生成嵌入向量失败: {e}")
+            return None
@@ -0,0 +1,157 @@
+import hashlib
+import logging
+import time
+import unicodedata
+from typing import Callable, Optional
+
+import numpy as np
+
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """查询向量缓存 - 进程内LRU + 可选Redis共享层
+
+    键为 (模型名, 标准化查询) 的哈希，相同或仅大小写/空白不同的查询
+    直接命中缓存，跳过 OpenAI 嵌入调用。Redis中以float16原始字节存储，体积减半。
+    """
+
+    # 多个worker同时未命中同一查询时，只由抢到锁的一方计算，其余等待其写入结果
+    pending_ttl = 5
+    poll_interval = 0.05
+
+    def __init__(
+        self,
+        model: str,
+        maxsize: int = 4096,
+        redis_client=None,
+        ttl: int = 86400,
+        key_prefix: str = "emb:v1:",
+    ):
+        self.model = model
+        self.maxsize = maxsize
+        self.redis = redis_client
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        # 进程内条目与Redis中的副本同样在 ttl 秒后过期
+        self._local = TTLCache(maxsize, ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """标准化查询文本（NFC、去首尾空白、小写）"""
+        return unicodedata.normalize("NFC", text).strip().lower()
+
+    @staticmethod
+    def _decode(raw: bytes) -> np.ndarray:
+        vec = np.frombuffer(raw, dtype=np.float16).astype(np.float32)
+        vec.flags.writeable = False
+        return vec
+
+    def _digest(self, text: str) -> bytes:
+        raw = f"{self.model}\x00{self.normalize(text)}".encode("utf-8")
+        return hashlib.blake2b(raw, digest_size=16).digest()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """读取缓存向量，未命中返回None"""
+        key = self._digest(text)
+
+        vec = self._local.get(key)
+        if vec is not None:
+            self.hits += 1
+            return vec
+
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(self.key_prefix + key.hex())
+            except Exception as e:
+                logger.warning(f"Redis读取向量缓存失败: {e}")
+                raw = None
+            if raw:
+                vec = self._decode(raw)
+                self._local.set(key, vec)
+                self.hits += 1
+                return vec
+
+        self.misses += 1
+        return None
+
+    def put(self, text: str, vec: np.ndarray):
+        """写入缓存向量"""
+        key = self._digest(text)
+        vec = np.ascontiguousarray(vec, dtype=np.float32)
+        # 缓存中的向量是共享引用，设为只读防止被调用方修改
+        vec.flags.writeable = False
+        self._local.set(key, vec)
+
+        if self.redis is not None:
+            try:
+                self.redis.setex(self.key_prefix + key.hex(), self.ttl, vec.astype(np.float16).tobytes())
+            except Exception as e:
+                logger.warning(f"Redis写入向量缓存失败: {e}")
+
+    def get_or_compute(self, text: str, compute: Callable[[], Optional[np.ndarray]]) -> Optional[np.ndarray]:
+        """读取缓存向量，未命中时计算并写入；借助Redis SET NX避免多个worker重复计算"""
+        vec = self.get(text)
+        if vec is not None:
+            return vec
+
+        key = self._digest(text)
+        lock_key = f"{self.key_prefix}lock:{key.hex()}"
+        locked = self._acquire_pending(lock_key)
+        if not locked:
+            vec = self._wait_remote(key)
+            if vec is not None:
+                return vec
+
+        try:
+            vec = compute()
+            if vec is not None:
+                self.put(text, vec)
+            return vec
+        finally:
+            if locked and self.redis is not None:
+                try:
+                    self.redis.delete(lock_key)
+                except Exception:
+                    pass
+
+    def _acquire_pending(self, lock_key: str) -> bool:
+        """尝试占用计算锁；未启用Redis或Redis异常时直接计算"""
+        if self.redis is None:
+            return True
+        try:
+            return bool(self.redis.set(lock_key, b"1", nx=True, ex=self.pending_ttl))
+        except Exception as e:
+            logger.warning(f"Redis获取向量计算锁失败: {e}")
+            return True
+
+    def _wait_remote(self, key: bytes) -> Optional[np.ndarray]:
+        """等待其他worker写入向量，超时返回None"""
+        deadline = time.monotonic() + self.pending_ttl
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            try:
+                raw = self.redis.get(self.key_prefix + key.hex())
+            except Exception:
+                return None
+            if raw:
+                vec = self._decode(raw)
+                self._local.set(key, vec)
+                return vec
+        return None
+
+    def stats(self) -> dict:
+        """缓存统计信息"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._local),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "redis_enabled": self.redis is not None,
+        }
@@ -0,0 +1,15 @@
+import faiss
+
+
+def returns_exact_distances(index: faiss.Index) -> bool:
+    """索引返回的距离是否足够精确、无需再用原始向量精排
+
+    Flat、HNSW-Flat 保存完整float32向量；SQfp16 以半精度保存，误差远小于精排向量（同为float16）本身。
+    PQ、SQ8 等有损压缩的索引返回近似距离，需要精排。
+    """
+    if isinstance(index, faiss.IndexFlat):
+        return True
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSWFlat):
+        return True
+    return isinstance(index, faiss.IndexScalarQuantizer) and index.sq.qtype == faiss.ScalarQuantizer.QT_fp16
@@ -0,0 +1,19 @@
+import hashlib
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+from .result_cache import _json_default
+
+
+def cacheable_json(request: Request, payload: Any, max_age: int = 300) -> Response:
+    """返回带 ETag / Cache-Control 的JSON响应；客户端缓存仍有效时返回304，不再传输响应体"""
+    body = orjson.dumps(payload, default=_json_default)
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    headers = {"Cache-Control": f"public, max-age={max_age}", "ETag": etag}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=ORJSONResponse.media_type, headers=headers)
@@ -0,0 +1,72 @@
+from typing import Dict, List
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import re2 as re
+except ImportError:
+    import re
+
+
+class KeywordMatcher:
+    """按分类组织的多关键词匹配器
+
+    安装了 pyahocorasick 时用 Aho-Corasick 自动机一次扫描文本找出全部命中（含重叠），
+    否则把全部关键词编译为一个正则多选分支（安装了 re2 时为线性时间的DFA），
+    在每个可能的起始位置各匹配一次最长关键词，同样不遗漏重叠的命中。
+    返回命中的分类，顺序与 keyword_dict 一致。
+    """
+
+    def __init__(self, keyword_dict: Dict[str, List[str]]):
+        self.keyword_dict = keyword_dict
+        self.categories = list(keyword_dict)
+        self.automaton = None
+        self.pattern = None
+
+        keyword_to_categories: Dict[str, tuple] = {}
+        for category, keywords in keyword_dict.items():
+            for keyword in keywords:
+                # 同一关键词属于多个分类时全部保留
+                existing = keyword_to_categories.get(keyword, ())
+                keyword_to_categories[keyword] = existing + (category,)
+
+        if AHOCORASICK_AVAILABLE:
+            self.automaton = ahocorasick.Automaton()
+            for keyword, categories in keyword_to_categories.items():
+                self.automaton.add_word(keyword, categories)
+            self.automaton.make_automaton()
+            return
+
+        # 多选分支长关键词优先，每个位置只返回最长的命中；
+        # 同一位置命中的更短关键词都是它的前缀，一并计入这些前缀关键词的分类
+        keywords = sorted((k for k in keyword_to_categories if k), key=len, reverse=True)
+        self.keyword_to_categories = {
+            keyword: tuple({
+                category
+                for other in keywords if keyword.startswith(other)
+                for category in keyword_to_categories[other]
+            })
+            for keyword in keywords
+        }
+        # 只在关键词首字符出现的位置尝试匹配
+        self.first_chars = frozenset(k[0] for k in keywords)
+        if keywords:
+            self.pattern = re.compile("|".join(re.escape(k) for k in keywords))
+
+    def find(self, text: str) -> List[str]:
+        found = set()
+        if self.automaton is not None:
+            for _, categories in self.automaton.iter(text):
+                found.update(categories)
+        elif self.pattern is not None:
+            for pos, char in enumerate(text):
+                if char not in self.first_chars:
+                    continue
+                match = self.pattern.match(text, pos)
+                if match:
+                    found.update(self.keyword_to_categories[match.group(0)])
+        return [category for category in self.categories if category in found]
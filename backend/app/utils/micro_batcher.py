@@ -0,0 +1,48 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Tuple
+
+
+class MicroBatcher:
+    """并发请求合并器基类
+
+    各请求通过 submit 提交单个条目并得到 Future，后台线程在等待窗口内（或凑满批量后）
+    取出待处理条目交给子类的 process 一次处理，由 process 为每个 Future 设置结果。
+    """
+
+    def __init__(self, max_batch: int, max_wait_ms: float, name: str):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while len(batch) < self.max_batch:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                pass
+            try:
+                self.process(batch)
+            except Exception as e:
+                # 子类未处理的异常交给尚未完成的请求，后台线程继续运行
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def process(self, batch: List[Tuple[Any, Future]]):
+        raise NotImplementedError
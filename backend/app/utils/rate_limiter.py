@@ -0,0 +1,101 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+
+from ..config import settings
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """OpenAI请求的令牌桶限流（按每分钟请求数 RPM 和每分钟令牌数 TPM）
+
+    每次调用前预先扣除 1 个请求和预估的令牌数，额度不足时等待额度恢复，
+    避免触发429后进入指数退避。rpm/tpm 为0表示不限制对应维度。
+    同步调用（线程中）和异步调用共用同一个桶。
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.available_requests = float(rpm)
+        self.available_tokens = float(tpm)
+        self.last_update_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, est_tokens: int) -> float:
+        """额度足够时扣除并返回0，否则返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self.last_update_time
+            self.last_update_time = now
+            if self.rpm:
+                self.available_requests = min(self.rpm, self.available_requests + elapsed * self.rpm / 60)
+            if self.tpm:
+                # 单次预估超过桶容量时按容量计，否则永远等不到
+                est_tokens = min(est_tokens, self.tpm)
+                self.available_tokens = min(self.tpm, self.available_tokens + elapsed * self.tpm / 60)
+
+            wait = 0.0
+            if self.rpm and self.available_requests < 1:
+                wait = (1 - self.available_requests) * 60 / self.rpm
+            if self.tpm and self.available_tokens < est_tokens:
+                wait = max(wait, (est_tokens - self.available_tokens) * 60 / self.tpm)
+            if wait:
+                return wait
+
+            if self.rpm:
+                self.available_requests -= 1
+            if self.tpm:
+                self.available_tokens -= est_tokens
+            return 0.0
+
+    def acquire_sync(self, est_tokens: int):
+        while True:
+            wait = self._reserve(est_tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire(self, est_tokens: int):
+        while True:
+            wait = self._reserve(est_tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+# 进程内所有OpenAI调用共享的限流器
+openai_limiter = TokenBucket(settings.openai_rpm, settings.openai_tpm)
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    # 编码表首次使用时可能需要下载，失败后退回粗略估算
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"加载tiktoken编码失败，改用粗略估算: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=512)
+def count_tokens(text: str) -> int:
+    """计算文本的令牌数；固定提示词只计算一次。未安装tiktoken时按UTF-8字节数/3估算（中文约每字1个令牌）"""
+    encoding = _encoding() if TIKTOKEN_AVAILABLE else None
+    if encoding is None:
+        return len(text.encode("utf-8")) // 3
+    return len(encoding.encode(text))
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """预估一次调用消耗的令牌数：提示词令牌数加上最大输出令牌数"""
+    return max_tokens + count_tokens(prompt)
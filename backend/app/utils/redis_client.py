@@ -1,6 +1,8 @@
 import redis
+import redis.asyncio as aioredis
 import json
 import logging
+import time
 from typing import Any, Optional, Dict, List
 from ..config import settings
 
@@ -131,4 +133,66 @@ class RedisClient:
     def update_popular_searches(self, searches: List[Dict]):
         """更新热门搜索"""
         cache_key = "popular_searches"
-        self.setex(cache_key, 3600, searches)  # 缓存1小时
\ No newline at end of file
+        self.setex(cache_key, 3600, searches)  # 缓存1小时
+
+REDIS_MAX_CONNECTIONS = 50
+REDIS_POOL_TIMEOUT = 1  # 连接池耗尽时最多等待的秒数
+REDIS_CONNECT_TIMEOUT = 1  # 建立连接的超时秒数，Redis宕机时不让请求长时间挂起
+REDIS_RETRY_INTERVAL = 30  # 连接失败后间隔多少秒再重试
+
+_raw_redis_client = None
+_raw_redis_last_failure: Optional[float] = None
+
+
+def get_raw_redis() -> Optional[redis.Redis]:
+    """获取进程内共享的二进制模式Redis客户端（直接返回原始字节，便于orjson/numpy解析），不可用时返回None"""
+    global _raw_redis_client, _raw_redis_last_failure
+    if _raw_redis_client is not None:
+        return _raw_redis_client
+    if (
+        _raw_redis_last_failure is not None
+        and time.monotonic() - _raw_redis_last_failure < REDIS_RETRY_INTERVAL
+    ):
+        return None
+    try:
+        # 阻塞式连接池：连接数封顶，高峰期短暂排队而不是不断新建连接
+        pool = redis.BlockingConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+            decode_responses=False,
+        )
+        client = redis.Redis(connection_pool=pool)
+        client.ping()
+        _raw_redis_client = client
+        _raw_redis_last_failure = None
+        logger.info("Redis(二进制)连接成功")
+    except Exception as e:
+        # 只有连接成功才固定下来；失败时记录时间，REDIS_RETRY_INTERVAL 秒后再尝试
+        _raw_redis_last_failure = time.monotonic()
+        logger.warning(f"Redis不可用，{REDIS_RETRY_INTERVAL}秒内仅使用进程内缓存: {e}")
+    return _raw_redis_client
+
+
+_async_redis_client = None
+
+
+def get_async_redis() -> Optional[aioredis.Redis]:
+    """获取进程内共享的异步二进制模式Redis客户端，供 async 接口直接 await，不阻塞事件循环
+
+    可用性沿用 get_raw_redis 的连接检查，Redis不可用时返回None。
+    """
+    global _async_redis_client
+    if get_raw_redis() is None:
+        return None
+    if _async_redis_client is None:
+        pool = aioredis.BlockingConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+            decode_responses=False,
+        )
+        _async_redis_client = aioredis.Redis(connection_pool=pool)
+    return _async_redis_client
@@ -0,0 +1,176 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import event
+
+from ..config import settings
+from .redis_client import get_async_redis, get_raw_redis
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# 重建索引后提升版本号即可让旧缓存全部失效
+CACHE_VERSION = "v1"
+
+_KEY_TYPES = (str, int, float, bool, type(None))
+
+
+def _build_cache_key(prefix: str, func_name: str, kwargs: dict) -> str:
+    """由请求参数生成缓存键；数据库会话、服务实例等依赖对象不参与计算"""
+    parts = [func_name]
+    for name in sorted(kwargs):
+        value = kwargs[name]
+        if isinstance(value, BaseModel):
+            parts.append(f"{name}={value.model_dump_json()}")
+        elif isinstance(value, _KEY_TYPES):
+            parts.append(f"{name}={value!r}")
+    digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+    return f"{prefix}:{CACHE_VERSION}:{digest}"
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson不支持的类型：数据库聚合返回的Decimal按FastAPI的方式转为float"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def _to_jsonable(result: Any) -> Any:
+    if isinstance(result, BaseModel):
+        return result.model_dump(mode="json")
+    if isinstance(result, list):
+        return [_to_jsonable(item) for item in result]
+    return result
+
+
+def cache_result(
+    prefix: str,
+    ttl: Optional[int] = None,
+    should_cache: Optional[Callable[[Any], bool]] = None,
+):
+    """缓存异步接口的返回结果到Redis（orjson序列化，使用异步客户端），Redis不可用时直接执行原函数
+
+    缓存命中时返回反序列化后的字典，由FastAPI按 response_model 输出。
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            client = get_async_redis()
+            if client is None:
+                return await func(*args, **kwargs)
+
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            key = _build_cache_key(prefix, func.__name__, arguments)
+            try:
+                cached = await client.get(key)
+                if cached:
+                    return orjson.loads(cached)
+            except Exception as e:
+                logger.warning(f"读取结果缓存失败 {key}: {e}")
+
+            result = await func(*args, **kwargs)
+
+            if should_cache is None or should_cache(result):
+                try:
+                    await client.setex(
+                        key,
+                        ttl or settings.search_cache_expire_time,
+                        orjson.dumps(_to_jsonable(result), default=_json_default),
+                    )
+                except Exception as e:
+                    logger.warning(f"写入结果缓存失败 {key}: {e}")
+            return result
+        return wrapper
+    return decorator
+
+
+# 聚合结果重建锁的有效期（秒），未抢到锁的请求在此期间等待重建结果
+REBUILD_LOCK_TTL = 2
+_REBUILD_POLL_INTERVAL = 0.05
+# 进程内短期缓存（秒），吸收热点键的高频读取，不必每次访问Redis
+LOCAL_TTL = 5
+LOCAL_CACHE_SIZE = 256
+_local_cache = TTLCache(LOCAL_CACHE_SIZE, LOCAL_TTL)
+
+
+async def _rebuild(fn: Callable[[], Any]) -> Any:
+    value = fn()
+    if inspect.isawaitable(value):
+        value = await value
+    return value
+
+
+async def cached_json(key: str, ttl: int, fn: Callable[[], Any]) -> Any:
+    """读取Redis中缓存的聚合结果，未命中时调用 fn 重建（fn 可以是普通函数或协程函数）
+
+    过期瞬间只有抢到 `<key>:lock` 的请求执行重建，其余请求短暂等待结果写入，避免同时打到数据库。
+    Redis读写均使用异步客户端，等待期间不阻塞事件循环。结果另在进程内保留 LOCAL_TTL 秒。
+    """
+    value = _local_cache.get(key)
+    if value is not None:
+        return value
+
+    client = get_async_redis()
+    if client is None:
+        # Redis不可用时仅依靠进程内缓存
+        value = await _rebuild(fn)
+        _local_cache.set(key, value)
+        return value
+
+    lock_key = f"{key}:lock"
+    locked = False
+    try:
+        cached = await client.get(key)
+        if cached:
+            value = orjson.loads(cached)
+            _local_cache.set(key, value)
+            return value
+
+        locked = await client.set(lock_key, b"1", nx=True, ex=REBUILD_LOCK_TTL)
+        if not locked:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + REBUILD_LOCK_TTL
+            while loop.time() < deadline:
+                await asyncio.sleep(_REBUILD_POLL_INTERVAL)
+                cached = await client.get(key)
+                if cached:
+                    return orjson.loads(cached)
+    except Exception as e:
+        logger.warning(f"读取聚合缓存失败 {key}: {e}")
+        return await _rebuild(fn)
+
+    value = await _rebuild(fn)
+    _local_cache.set(key, value)
+    try:
+        await client.set(key, orjson.dumps(value, default=_json_default), ex=ttl)
+        if locked:
+            await client.delete(lock_key)
+    except Exception as e:
+        logger.warning(f"写入聚合缓存失败 {key}: {e}")
+    return value
+
+
+def invalidate_on_change(model, *keys: str):
+    """模型数据写入后删除相关聚合缓存（在同步的ORM事件中执行，使用同步客户端）"""
+    def _invalidate(mapper, connection, target):
+        for key in keys:
+            _local_cache.pop(key)
+        client = get_raw_redis()
+        if client is None:
+            return
+        try:
+            client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"清除聚合缓存失败 {keys}: {e}")
+
+    for event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, event_name, _invalidate)
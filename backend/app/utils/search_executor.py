@@ -0,0 +1,17 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+# 向量检索专用线程池：FAISS/NumPy计算会释放GIL，线程数与CPU核数一致即可跑满；
+# 与 asyncio.to_thread 使用的默认线程池分开，数据库等I/O任务不必与之排队
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", str(os.cpu_count() or 4)))
+
+_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="vector-search")
+
+
+async def run_search(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """在向量检索线程池中执行阻塞调用，不阻塞事件循环"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
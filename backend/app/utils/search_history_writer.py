@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+
+from ..database import AsyncSessionLocal
+from ..models.search_history import SearchHistory
+
+logger = logging.getLogger(__name__)
+
+# 搜索历史每隔 FLUSH_INTERVAL 秒批量写入一次，每批最多 BATCH_SIZE 条
+FLUSH_INTERVAL = 0.2
+BATCH_SIZE = 500
+QUEUE_MAXSIZE = 10000
+
+_history_q: Optional[asyncio.Queue] = None
+_stopping: Optional[asyncio.Event] = None
+_writer_task: Optional[asyncio.Task] = None
+
+
+def record_search(entry: Dict) -> bool:
+    """把一条搜索历史放入写入队列，不等待数据库
+
+    写入任务未启动（如在脚本中调用）时返回False，由调用方自行同步写入；
+    队列已满时丢弃该条记录。
+    """
+    if _history_q is None:
+        return False
+    try:
+        _history_q.put_nowait(entry)
+    except asyncio.QueueFull:
+        logger.warning("搜索历史队列已满，丢弃记录")
+    return True
+
+
+async def _write_batch(rows: List[Dict]):
+    try:
+        async with AsyncSessionLocal() as session:
+            # 传入参数列表时执行 executemany，MySQL驱动会合并为多行INSERT
+            await session.execute(insert(SearchHistory), rows)
+            await session.commit()
+    except Exception as e:
+        logger.warning(f"批量写入搜索历史失败 ({len(rows)} 条): {e}")
+
+
+def _drain(queue: asyncio.Queue, first: Dict) -> List[Dict]:
+    rows = [first]
+    while len(rows) < BATCH_SIZE:
+        try:
+            rows.append(queue.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+    return rows
+
+
+async def _history_writer(queue: asyncio.Queue, stopping: asyncio.Event):
+    # 收到停止信号后写完队列中剩余的记录再退出
+    while not (stopping.is_set() and queue.empty()):
+        try:
+            first = await asyncio.wait_for(queue.get(), FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            continue
+        if not stopping.is_set():
+            await asyncio.sleep(FLUSH_INTERVAL)
+        await _write_batch(_drain(queue, first))
+
+
+def start_history_writer():
+    """在应用启动时调用，创建队列和后台写入任务"""
+    global _history_q, _stopping, _writer_task
+    if _writer_task is not None:
+        return
+    _history_q = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
+    _stopping = asyncio.Event()
+    _writer_task = asyncio.create_task(_history_writer(_history_q, _stopping))
+
+
+async def stop_history_writer():
+    """在应用关闭时调用：不再接收新记录，等待后台任务写完队列中剩余的记录"""
+    global _history_q, _writer_task
+    if _writer_task is None:
+        return
+    task, _history_q, _writer_task = _writer_task, None, None
+    _stopping.set()
+    await task
@@ -1,5 +1,5 @@
 import oss2
-from typing import List, Optional
+from typing import Dict, List, Optional
 from urllib.parse import urlparse
 from ..config import settings
 import logging
@@ -18,6 +18,8 @@ class OSSClient:
         )
         self.custom_domain = settings.oss_custom_domain
         self.bucket_name = settings.oss_bucket
+        # 列举时记录的对象ETag（由内容计算），供AI分析按图片内容复用缓存
+        self.object_etags: Dict[str, str] = {}
         
         logger.info(f"OSS客户端初始化完成")
         logger.info(f"OSS Endpoint: {settings.oss_endpoint}")
@@ -53,6 +55,7 @@ class OSSClient:
                         # 排除缩略图等处理后的图片
                         if not any(x in key.lower() for x in ['_thumb', '_thumbnail', '_small', '_medium']):
                             images.append(key)
+                            self.object_etags[key] = obj.etag
                 
                 # 检查是否还有更多对象
                 if not result.is_truncated:
@@ -66,6 +69,10 @@ class OSSClient:
             logger.error(f"列出OSS图片失败: {e}")
             raise
     
+    def get_etag(self, key: str) -> Optional[str]:
+        """返回 list_images 列举到的对象ETag，未列举过的对象返回None"""
+        return self.object_etags.get(key)
+    
     def get_public_url(self, key: str) -> str:
         """获取图片的公开访问URL"""
         if self.custom_domain:
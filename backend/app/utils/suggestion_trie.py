@@ -0,0 +1,108 @@
+import heapq
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .redis_client import get_raw_redis
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "suggest:trie:v1"
+SNAPSHOT_TTL = 3600
+TOP_K = 10
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.top: List[Tuple[int, str]] = []  # 该前缀下权重最高的词条 (weight, term)
+
+
+class SuggestionTrie:
+    """搜索建议前缀树
+
+    每个节点保存该前缀下权重最高的前 TOP_K 个词条，查询只需沿前缀走 O(m) 步，
+    与词条总数无关。
+    """
+
+    def __init__(self, entries: List[Tuple[str, int]]):
+        self.root = _Node()
+        self.size = len(entries)
+        for term, weight in entries:
+            node = self.root
+            for ch in term.lower():
+                node = node.children.setdefault(ch, _Node())
+                self._offer(node, weight, term)
+
+    @staticmethod
+    def _offer(node: _Node, weight: int, term: str):
+        if len(node.top) < TOP_K:
+            heapq.heappush(node.top, (weight, term))
+        elif weight > node.top[0][0]:
+            heapq.heapreplace(node.top, (weight, term))
+
+    def suggest(self, prefix: str, limit: int = TOP_K) -> List[str]:
+        """返回以 prefix 开头、按权重降序的词条"""
+        node = self.root
+        for ch in prefix.strip().lower():
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return [term for _, term in sorted(node.top, reverse=True)[:limit]]
+
+
+def _load_entries(db: Session) -> List[Tuple[str, int]]:
+    """汇总标题、标签和热门搜索词及其权重"""
+    weights: Dict[str, int] = {}
+
+    def add(term: Optional[str], weight: int):
+        if term:
+            term = term.strip()
+            if term:
+                weights[term] = weights.get(term, 0) + weight
+
+    for title, views in db.execute(text(
+        "SELECT title, view_count FROM poses WHERE status = 'active' AND title IS NOT NULL"
+    )):
+        add(title, 1 + (views or 0))
+
+    for name, usage in db.execute(text("SELECT name, usage_count FROM tags")):
+        add(name, 1 + (usage or 0))
+
+    for query, cnt in db.execute(text("""
+        SELECT query, COUNT(*) AS cnt FROM search_history
+        WHERE results_count > 0
+        GROUP BY query ORDER BY cnt DESC LIMIT 5000
+    """)):
+        add(query, cnt)
+
+    return list(weights.items())
+
+
+def load_suggestion_trie(db: Session) -> SuggestionTrie:
+    """构建搜索建议前缀树；词条快照缓存在Redis中，热重启时无需重新查询数据库"""
+    client = get_raw_redis()
+    entries = None
+
+    if client is not None:
+        try:
+            raw = client.get(SNAPSHOT_KEY)
+            if raw:
+                entries = [tuple(e) for e in orjson.loads(raw)]
+        except Exception as e:
+            logger.warning(f"读取搜索建议快照失败: {e}")
+
+    if entries is None:
+        entries = _load_entries(db)
+        if client is not None:
+            try:
+                client.setex(SNAPSHOT_KEY, SNAPSHOT_TTL, orjson.dumps(entries))
+            except Exception as e:
+                logger.warning(f"写入搜索建议快照失败: {e}")
+
+    return SuggestionTrie(entries)
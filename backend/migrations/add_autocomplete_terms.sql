@@ -0,0 +1,10 @@
+-- 搜索建议词表：由 scripts/refresh_autocomplete_terms.py 定期重建
+-- 前缀查询 term LIKE 'xx%' 直接在主键上做范围扫描，pinyin 列供拼音前缀查询
+CREATE TABLE IF NOT EXISTS autocomplete_terms (
+    term VARCHAR(200) NOT NULL COMMENT '建议词',
+    term_type VARCHAR(20) NOT NULL COMMENT '来源：history/tag',
+    freq INT NOT NULL DEFAULT 0 COMMENT '权重',
+    pinyin VARCHAR(500) COMMENT '拼音（无分隔符）',
+    PRIMARY KEY (term),
+    INDEX idx_pinyin_freq (pinyin, freq)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='搜索建议词表';
@@ -0,0 +1,31 @@
+-- 全文索引改用 ngram 分词（中文检索需要），供 MATCH(title, description, ai_tags) 使用
+-- 使用 add_search_indexes.sql 创建过默认分词全文索引的库，先删除旧索引：
+-- ALTER TABLE poses DROP INDEX title;
+-- 旧版 init_database.sql 建的库已有同列的 ngram 索引 idx_fulltext，直接重命名为 ft_poses，
+-- 不再重复创建（两个相同的全文索引会使写入时的分词开销翻倍）
+SET @has_old := (SELECT COUNT(*) FROM information_schema.statistics
+                 WHERE table_schema = DATABASE() AND table_name = 'poses' AND index_name = 'idx_fulltext');
+SET @has_new := (SELECT COUNT(*) FROM information_schema.statistics
+                 WHERE table_schema = DATABASE() AND table_name = 'poses' AND index_name = 'ft_poses');
+SET @sql := CASE
+    WHEN @has_old > 0 AND @has_new = 0 THEN 'ALTER TABLE poses RENAME INDEX idx_fulltext TO ft_poses'
+    WHEN @has_old > 0 THEN 'ALTER TABLE poses DROP INDEX idx_fulltext'
+    WHEN @has_new = 0 THEN 'ALTER TABLE poses ADD FULLTEXT INDEX ft_poses (title, description, ai_tags) WITH PARSER ngram'
+    ELSE 'DO 0'
+END;
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 搜索建议只匹配标题和标签，使用更小的 ngram 索引，供 MATCH(title, ai_tags) 使用
+-- 两个汉字的查询词正好是一个 ngram 词元（ngram_token_size=2，需与 mysqld 配置一致）
+-- init_database.sql 建的库已包含该索引，此时跳过
+SET @sql := IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = DATABASE() AND table_name = 'poses' AND index_name = 'ft_title_tags') = 0,
+    'ALTER TABLE poses ADD FULLTEXT INDEX ft_title_tags (title, ai_tags) WITH PARSER ngram',
+    'DO 0'
+);
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
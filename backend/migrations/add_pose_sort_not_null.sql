@@ -0,0 +1,8 @@
+-- 姿势列表按 (created_at, id) / (view_count, id) 游标翻页，排序列不允许为空：
+-- NULL 无法参与 < 比较，含 NULL 的行在游标翻页时会被跳过
+UPDATE poses SET view_count = 0 WHERE view_count IS NULL;
+UPDATE poses SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL;
+
+ALTER TABLE poses
+    MODIFY view_count INT NOT NULL DEFAULT 0 COMMENT '浏览次数',
+    MODIFY created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间';
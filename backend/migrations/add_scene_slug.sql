@@ -0,0 +1,11 @@
+-- 场景分类ID在写入时由数据库生成，/api/v1/scenes 直接读取，无需每次请求在Python中转换
+-- 存储生成列对已有数据自动回填
+ALTER TABLE poses
+    ADD COLUMN scene_slug VARCHAR(64)
+        GENERATED ALWAYS AS (LOWER(REPLACE(REPLACE(REPLACE(scene_category, ' ', '_'), '拍摄', ''), '摄影', ''))) STORED
+        COMMENT '场景分类ID（由scene_category生成）' AFTER scene_category;
+
+-- 场景统计覆盖索引加入 scene_slug
+ALTER TABLE poses
+    DROP INDEX idx_status_category,
+    ADD INDEX idx_status_category (status, scene_category, scene_slug);
@@ -12,4 +12,9 @@ CREATE INDEX idx_pose_tags_pose_tag ON pose_tags(pose_id, tag_id);
 
 -- 搜索历史分析索引
 CREATE INDEX idx_search_history_query ON search_history(normalized_query);
-CREATE INDEX idx_search_history_created ON search_history(created_at);
\ No newline at end of file
+CREATE INDEX idx_search_history_created ON search_history(created_at);
+-- 场景分类统计覆盖索引（init_database.sql 建库时已包含，旧库补建）
+CREATE INDEX idx_status_category ON poses(status, scene_category);
+-- 姿势列表游标翻页：WHERE status = 'active' AND (排序列, id) < (...) 走索引范围扫描
+CREATE INDEX idx_status_created_id ON poses(status, created_at, id);
+CREATE INDEX idx_status_views_id ON poses(status, view_count, id);
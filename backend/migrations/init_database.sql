@@ -18,6 +18,7 @@ CREATE TABLE poses (
     title VARCHAR(200) COMMENT '标题',
     description TEXT COMMENT '描述',
     scene_category VARCHAR(50) COMMENT '场景分类',
+    scene_slug VARCHAR(64) GENERATED ALWAYS AS (LOWER(REPLACE(REPLACE(REPLACE(scene_category, ' ', '_'), '拍摄', ''), '摄影', ''))) STORED COMMENT '场景分类ID（由scene_category生成）',
     angle VARCHAR(50) COMMENT '拍摄角度',
     props JSON COMMENT '道具列表',
     shooting_tips TEXT COMMENT '拍摄建议',
@@ -30,11 +31,11 @@ CREATE TABLE poses (
     error_message TEXT COMMENT '处理错误信息',
     
     -- 统计字段
-    view_count INT DEFAULT 0 COMMENT '浏览次数',
+    view_count INT NOT NULL DEFAULT 0 COMMENT '浏览次数',
     search_count INT DEFAULT 0 COMMENT '搜索命中次数',
     
     -- 时间字段
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
     
     -- 状态字段
@@ -48,10 +49,14 @@ CREATE TABLE poses (
     INDEX idx_ai_analyzed (ai_analyzed_at),
     INDEX idx_processing_status (processing_status),
     INDEX idx_scene_angle (scene_category, angle),
-    INDEX idx_status_category (status, scene_category),
+    INDEX idx_status_category (status, scene_category, scene_slug),
+    INDEX idx_status_created_id (status, created_at, id),
+    INDEX idx_status_views_id (status, view_count, id),
     
     -- 全文搜索索引
-    FULLTEXT idx_fulltext (title, description, ai_tags) WITH PARSER ngram
+    FULLTEXT ft_poses (title, description, ai_tags) WITH PARSER ngram,
+    -- 搜索建议只匹配标题和标签
+    FULLTEXT ft_title_tags (title, ai_tags) WITH PARSER ngram
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='姿势图片表';
 
 -- 创建标签表
@@ -15,6 +15,7 @@ import uuid
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+import asyncio
 
 # 添加项目路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -22,7 +23,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.database import get_db, engine
 from app.models import Pose, Tag, PoseTag
 from app.utils.storage_client import OSSClient
-from app.services.ai_analyzer import AIAnalyzer
+from app.services.ai_analyzer import get_ai_analyzer
+from app.services.pose_service import PoseService, UPSERT_BATCH_SIZE
 from app.config import settings
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy import text
@@ -67,7 +69,7 @@ class ImageProcessor:
     
     def __init__(self):
         self.oss_client = OSSClient()
-        self.ai_analyzer = AIAnalyzer()
+        self.ai_analyzer = get_ai_analyzer()
         self.db = next(get_db())
         self.stats = {
             'total': 0,
@@ -76,7 +78,7 @@ class ImageProcessor:
             'skipped': 0
         }
         
-    def scan_and_process_oss_images(self):
+    def scan_and_process_oss_images(self, bulk: bool = False, images_per_request: int = 1):
         """扫描OSS并处理新图片"""
         logger.info("开始扫描OSS中的图片...")
         
@@ -103,6 +105,10 @@ class ImageProcessor:
                 
             self.stats['total'] = len(new_images)
             
+            if bulk:
+                self.process_images_bulk(new_images, images_per_request)
+                return
+            
             # 减少并发数，避免数据库死锁
             max_workers = 1  # 暂时使用单线程处理，避免死锁
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
@@ -168,7 +174,7 @@ class ImageProcessor:
             
             # AI分析
             logger.info(f"开始AI分析...")
-            analysis = self.ai_analyzer.analyze_pose_image(oss_url)
+            analysis = self.ai_analyzer.analyze_pose_image(oss_url, etag=self.oss_client.get_etag(oss_key))
             
             if analysis:
                 # 更新AI分析结果
@@ -227,6 +233,52 @@ class ImageProcessor:
         finally:
             db.close()
     
+    def process_images_bulk(self, oss_keys: List[str], images_per_request: int = 1):
+        """批量处理：每批并发完成AI分析后，用一条 INSERT ... ON DUPLICATE KEY UPDATE 入库
+
+        images_per_request 大于1时每次OpenAI请求打包分析多张图片。
+        """
+        # 异步客户端绑定事件循环，所有批次在同一个事件循环中执行
+        asyncio.run(self._process_images_bulk(oss_keys, images_per_request))
+    
+    async def _process_images_bulk(self, oss_keys: List[str], images_per_request: int):
+        pose_service = PoseService()
+        
+        for start in range(0, len(oss_keys), UPSERT_BATCH_SIZE):
+            batch = oss_keys[start:start + UPSERT_BATCH_SIZE]
+            urls = [self.oss_client.get_public_url(key) for key in batch]
+            etags = [self.oss_client.get_etag(key) for key in batch]
+            logger.info(f"批量AI分析 {start + 1}-{start + len(batch)}/{len(oss_keys)}")
+            if images_per_request > 1:
+                analyses = await self.ai_analyzer.analyze_pose_images_batch(
+                    urls, batch_size=images_per_request, etags=etags
+                )
+            else:
+                analyses = await self.ai_analyzer.analyze_pose_images(urls, etags=etags)
+            
+            rows = []
+            for oss_key, oss_url, analysis in zip(batch, urls, analyses):
+                if analysis:
+                    rows.append(pose_service.build_analyzed_row(
+                        oss_key, oss_url, self.oss_client.get_thumbnail_url(oss_key), analysis
+                    ))
+                else:
+                    logger.error(f"[ERROR] AI分析失败: {oss_key}")
+            
+            db = SessionLocal()
+            try:
+                written = pose_service.bulk_upsert_analyzed_poses(db, rows)
+                self.stats['success'] += written
+                self.stats['failed'] += len(batch) - written
+                
+                # 标签关联需要pose.id，入库后逐条处理
+                if written:
+                    tags_by_key = {row['oss_key']: row['ai_tags'].split(',') for row in rows}
+                    for pose in db.query(Pose).filter(Pose.oss_key.in_(tags_by_key)).all():
+                        self.process_tags_with_session_safe(db, pose, tags_by_key[pose.oss_key])
+            finally:
+                db.close()
+    
     def process_tags_with_session_safe(self, db: Session, pose: Pose, tags: List[str]):
         """安全地处理图片标签 - 避免死锁"""
         with tag_processing_lock:  # 使用全局锁
@@ -429,10 +481,12 @@ def main():
     parser = argparse.ArgumentParser(description='自动化图片处理工具 - 最终版本')
     parser.add_argument('--scan-oss', action='store_true', help='扫描OSS中的新图片')
     parser.add_argument('--retry-failed', action='store_true', help='重试失败的图片')
+    parser.add_argument('--bulk', action='store_true', help='扫描OSS时并发分析并批量入库')
+    parser.add_argument('--images-per-request', type=int, default=1, help='批量模式下每次AI请求分析的图片数')
     
     args = parser.parse_args()
     
-    if not any(vars(args).values()):
+    if not (args.scan_oss or args.retry_failed):
         parser.print_help()
         return
         
@@ -440,7 +494,7 @@ def main():
     
     try:
         if args.scan_oss:
-            processor.scan_and_process_oss_images()
+            processor.scan_and_process_oss_images(bulk=args.bulk, images_per_request=args.images_per_request)
         elif args.retry_failed:
             processor.retry_failed_images()
             
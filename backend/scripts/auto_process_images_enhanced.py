@@ -23,7 +23,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.database import get_db, engine
 from app.models import Pose, Tag, PoseTag
 from app.utils.storage_client import OSSClient
-from app.services.ai_analyzer import AIAnalyzer
+from app.services.ai_analyzer import get_ai_analyzer
 from app.config import settings
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy import text
@@ -68,7 +68,7 @@ class ImageProcessor:
     
     def __init__(self):
         self.oss_client = OSSClient()
-        self.ai_analyzer = AIAnalyzer()
+        self.ai_analyzer = get_ai_analyzer()
         self.db = next(get_db())
         self.stats = {
             'total': 0,
@@ -230,7 +230,7 @@ class ImageProcessor:
             
             # AI分析
             logger.info(f"开始AI分析...")
-            analysis = self.ai_analyzer.analyze_pose_image(oss_url)
+            analysis = self.ai_analyzer.analyze_pose_image(oss_url, etag=self.oss_client.get_etag(oss_key))
             
             if analysis:
                 # 更新AI分析结果
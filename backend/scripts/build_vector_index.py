@@ -22,6 +22,23 @@ from app.database import SessionLocal
 EMBED_MODEL = "text-embedding-3-small"
 INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "backend/vector_index/faiss.index")
 ID_MAP_PATH = os.getenv("VECTOR_ID_MAP_PATH", "backend/vector_index/id_map.json")
+EMBEDDINGS_PATH = os.getenv("VECTOR_EMBEDDINGS_PATH", "backend/vector_index/embeddings.npy")
+# ID映射数组（int64，下标为FAISS内部ID），服务端以mmap方式加载
+ID_MAP_NPY_PATH = os.path.splitext(ID_MAP_PATH)[0] + ".npy"
+# 索引结构：为空时按数据量自动选择（小数据量用Flat精确检索，大数据量用IVF+PQ压缩）
+INDEX_FACTORY = os.getenv("VECTOR_INDEX_FACTORY", "")
+HNSW_MIN_VECTORS = 20_000  # 达到该数量改用HNSW图索引，查询只访问少量向量而非全量扫描
+IVFPQ_MIN_VECTORS = 100_000  # 达到该数量才启用IVF-PQ，保证聚类和PQ码本训练样本充足
+# HNSW每个节点的邻居数和构建时的搜索宽度
+HNSW_M = int(os.getenv("VECTOR_HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("VECTOR_HNSW_EF_CONSTRUCTION", "200"))
+IVF_MAX_LISTS = 4096
+# PQ子量化器个数（每个8bit），1536维下64个子量化器即每条向量64字节
+PQ_SUBQUANTIZERS = int(os.getenv("VECTOR_PQ_SUBQUANTIZERS", "64"))
+# 小数据量时全量扫描索引的向量编码：fp32（Flat）、fp16（SQfp16，内存带宽减半）、8bit（SQ8，减为1/4，需精排）
+FLAT_ENCODING = os.getenv("VECTOR_FLAT_ENCODING", "fp16")
+FLAT_FACTORIES = {"fp32": "Flat", "fp16": "SQfp16", "8bit": "SQ8"}
+TRAIN_SAMPLE_SIZE = 200_000
 BATCH_SIZE = 100  # OpenAI API批量处理限制
 MAX_RETRIES = 3  # 重试次数
 
@@ -83,6 +100,39 @@ def embed_text_batch(texts: List[str], client: OpenAI) -> List[List[float]]:
                 raise e
 
 
+def choose_index_factory(num_vectors: int, dimension: int) -> str:
+    """根据数据规模选择FAISS索引结构"""
+    if INDEX_FACTORY:
+        return INDEX_FACTORY
+    if num_vectors < HNSW_MIN_VECTORS:
+        return FLAT_FACTORIES.get(FLAT_ENCODING, "Flat")
+    if num_vectors < IVFPQ_MIN_VECTORS or dimension % PQ_SUBQUANTIZERS != 0:
+        return f"HNSW{HNSW_M}"
+    # 每个倒排列表至少约39个训练样本
+    nlist = min(IVF_MAX_LISTS, num_vectors // 39)
+    return f"IVF{nlist},PQ{PQ_SUBQUANTIZERS}x8"
+
+
+def create_faiss_index(embeddings_array: np.ndarray) -> faiss.Index:
+    """创建并训练FAISS索引"""
+    num_vectors, dimension = embeddings_array.shape
+    factory = choose_index_factory(num_vectors, dimension)
+    print(f"索引结构: {factory}")
+    
+    index = faiss.index_factory(dimension, factory)
+    hnsw = getattr(faiss.downcast_index(index), "hnsw", None)
+    if hnsw is not None:
+        hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    if not index.is_trained:
+        sample_size = min(num_vectors, TRAIN_SAMPLE_SIZE)
+        rng = np.random.default_rng(42)
+        sample = embeddings_array[rng.choice(num_vectors, sample_size, replace=False)]
+        print(f"训练索引，样本数: {sample_size}")
+        index.train(sample)
+    index.add(embeddings_array)
+    return index
+
+
 def build_index():
     """构建向量索引"""
     print("开始构建向量索引...")
@@ -146,8 +196,7 @@ def build_index():
         embeddings_array = np.array(all_embeddings, dtype="float32")
         dimension = embeddings_array.shape[1]
         
-        index = faiss.IndexFlatL2(dimension)
-        index.add(embeddings_array)
+        index = create_faiss_index(embeddings_array)
         
         print(f"FAISS索引创建完成，维度: {dimension}")
         
@@ -158,12 +207,18 @@ def build_index():
         faiss.write_index(index, INDEX_PATH)
         print(f"✅ FAISS索引已保存到: {INDEX_PATH}")
         
+        # 保存精排用向量（float16，体积减半，服务端以mmap方式加载后转回float32计算）
+        np.save(EMBEDDINGS_PATH, embeddings_array.astype(np.float16))
+        print(f"✅ 原始向量已保存到: {EMBEDDINGS_PATH}")
+        
         # 保存ID映射（使用字符串键以匹配vector_search_service.py）
         id_map = {str(i): pose_id for i, pose_id in enumerate(ids)}
         with open(ID_MAP_PATH, "w", encoding="utf-8") as f:
             json.dump(id_map, f, ensure_ascii=False, indent=2)
         
-        print(f"✅ ID映射已保存到: {ID_MAP_PATH}")
+        np.save(ID_MAP_NPY_PATH, np.asarray(ids, dtype=np.int64))
+        
+        print(f"✅ ID映射已保存到: {ID_MAP_PATH}, {ID_MAP_NPY_PATH}")
         print(f"✅ 向量索引构建完成! 包含 {len(ids)} 条记录")
         
         return True
@@ -216,6 +271,7 @@ def main():
     print(f"嵌入模型: {EMBED_MODEL}")
     print(f"索引路径: {INDEX_PATH}")
     print(f"映射路径: {ID_MAP_PATH}")
+    print(f"向量路径: {EMBEDDINGS_PATH}")
     print(f"批次大小: {BATCH_SIZE}")
     print()
     
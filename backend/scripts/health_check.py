@@ -20,7 +20,7 @@ from app.config import settings
 from app.database import SessionLocal
 from app.utils.redis_client import RedisClient
 from app.utils.storage_client import OSSClient
-from app.services.ai_analyzer import AIAnalyzer
+from app.services.ai_analyzer import get_ai_analyzer
 from sqlalchemy import text
 
 class HealthChecker:
@@ -89,7 +89,7 @@ class HealthChecker:
         """检查OpenAI API"""
         print("检查OpenAI API...", end="")
         try:
-            ai_analyzer = AIAnalyzer()
+            ai_analyzer = get_ai_analyzer()
             # 简单的API测试
             response = ai_analyzer.client.chat.completions.create(
                 model="gpt-3.5-turbo",
@@ -24,7 +24,7 @@ from app.models.tag import Tag, PoseTag
 from app.models.search_history import SearchHistory
 from app.utils.redis_client import RedisClient
 from app.services.pose_service import PoseService
-from app.services.ai_analyzer import AIAnalyzer
+from app.services.ai_analyzer import get_ai_analyzer
 from sqlalchemy import text, func
 import json
 
@@ -35,7 +35,7 @@ class ManagementTool:
         self.db = SessionLocal()
         self.redis_client = RedisClient()
         self.pose_service = PoseService()
-        self.ai_analyzer = AIAnalyzer()
+        self.ai_analyzer = get_ai_analyzer()
     
     def show_stats(self):
         """显示统计信息"""
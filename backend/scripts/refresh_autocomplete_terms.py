@@ -0,0 +1,104 @@
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.database import SessionLocal
+
+# 与原建议接口一致的权重：搜索历史每次计10分，标签每次使用计5分
+HISTORY_WEIGHT = 10
+TAG_WEIGHT = 5
+HISTORY_DAYS = 30
+HISTORY_LIMIT = 5000
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # 未安装 pypinyin 时不生成拼音列
+    lazy_pinyin = None
+
+
+def _to_pinyin(term: str) -> Optional[str]:
+    if lazy_pinyin is None:
+        return None
+    pinyin = "".join(lazy_pinyin(term)).lower()
+    return pinyin if pinyin != term.lower() else None
+
+
+def collect_terms(db: Session) -> List[Tuple[str, str, int]]:
+    """汇总近期搜索词和标签，返回 (term, term_type, freq)"""
+    terms: Dict[str, Tuple[str, int]] = {}
+
+    history = db.execute(
+        text("""
+            SELECT normalized_query, COUNT(*) AS cnt
+            FROM search_history
+            WHERE normalized_query IS NOT NULL AND normalized_query != ''
+            AND created_at >= DATE_SUB(NOW(), INTERVAL :days DAY)
+            GROUP BY normalized_query
+            ORDER BY cnt DESC
+            LIMIT :limit
+        """),
+        {"days": HISTORY_DAYS, "limit": HISTORY_LIMIT},
+    )
+    for term, cnt in history:
+        terms[term.strip()] = ("history", cnt * HISTORY_WEIGHT)
+
+    tags = db.execute(text("""
+        SELECT t.name, COUNT(pt.pose_id) AS usage_count
+        FROM tags t
+        LEFT JOIN pose_tags pt ON t.id = pt.tag_id
+        GROUP BY t.id, t.name
+    """))
+    for term, usage in tags:
+        term = term.strip()
+        term_type, freq = terms.get(term, ("tag", 0))
+        terms[term] = (term_type, freq + usage * TAG_WEIGHT)
+
+    return [(term, term_type, freq) for term, (term_type, freq) in terms.items() if term]
+
+
+def refresh_autocomplete_terms(db: Session) -> int:
+    """重建 autocomplete_terms 表，返回写入的词条数"""
+    rows = [
+        {"term": term, "term_type": term_type, "freq": freq, "pinyin": _to_pinyin(term)}
+        for term, term_type, freq in collect_terms(db)
+    ]
+    db.execute(text("DELETE FROM autocomplete_terms"))
+    if rows:
+        db.execute(
+            text("""
+                INSERT INTO autocomplete_terms (term, term_type, freq, pinyin)
+                VALUES (:term, :term_type, :freq, :pinyin)
+                ON DUPLICATE KEY UPDATE freq = GREATEST(freq, VALUES(freq))
+            """),
+            rows,
+        )
+    db.commit()
+    return len(rows)
+
+
+def main():
+    """主函数"""
+    print("=== 搜索建议词表重建 ===")
+    db = SessionLocal()
+    try:
+        count = refresh_autocomplete_terms(db)
+        print(f"写入建议词 {count} 条")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"重建失败: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.exit(exit_code)
@@ -22,6 +22,9 @@ export async function GET(request) {
     if (searchParams.get('sort')) {
       params.append('sort', searchParams.get('sort'))
     }
+    if (searchParams.get('cursor')) {
+      params.append('cursor', searchParams.get('cursor'))
+    }
     
     // 请求后端API，增加超时控制
     const controller = new AbortController()
@@ -13,6 +13,7 @@ function PosesPageContent() {
   const [loading, setLoading] = useState(true)
   const [hasMore, setHasMore] = useState(true)
   const [page, setPage] = useState(1)
+  const [nextCursor, setNextCursor] = useState(null) // 后端返回的下一页游标
   const [viewMode, setViewMode] = useState('grid')
   const [searchQuery, setSearchQuery] = useState(searchParams.get('search') || '')
   const [selectedPose, setSelectedPose] = useState(null)
@@ -66,6 +67,10 @@ function PosesPageContent() {
         per_page: 20,
         ...filters
       });
+      // 加载更多时按游标翻页，后端无需跳过前面的行
+      if (!reset && nextCursor) {
+        queryParams.set('cursor', nextCursor);
+      }
 
       console.log('发起普通搜索请求:', queryParams.toString());
       
@@ -84,6 +89,7 @@ function PosesPageContent() {
           setPage(prev => prev + 1);
         }
         
+        setNextCursor(data.next_cursor || null);
         setHasMore(data.hasMore !== false && (data.poses || []).length === 20);
       }
     } catch (error) {
@@ -91,7 +97,7 @@ function PosesPageContent() {
     } finally {
       setLoading(false);
     }
-  }, [page, filters, isAISearch, searchType]);
+  }, [page, nextCursor, filters, isAISearch, searchType]);
 
   // loadMore 也需要更新依赖
   const loadMore = useCallback(() => {
@@ -18,6 +18,7 @@ export interface SearchResponse {
   total: number;
   page: number;
   per_page: number;
+  next_cursor?: string | null;
   suggestions?: string[];
 }
 